@@ -0,0 +1,43 @@
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
+
+import polars as pl
+import pytest
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def make_flows() -> Callable[..., pl.DataFrame]:
+    """A factory of `SubstationFlows`-like DataFrames, shared by every package's tests.
+
+    `make_flows(n_rows, start=START, **columns)` makes `n_rows` rows, 5 minutes apart, from `start`.
+    Pass a list of minutes (after `start`) instead of `n_rows` to choose each row's timestamp. Each
+    flow column is a constant, or a sequence of one value per row, and is cast to `Float32`.
+    """
+
+    def make_flows(
+        n_rows_or_minutes: int | Sequence[int],
+        start: datetime = START,
+        **columns: float | Sequence[float | None],
+    ) -> pl.DataFrame:
+        minutes = (
+            range(0, 5 * n_rows_or_minutes, 5)
+            if isinstance(n_rows_or_minutes, int)
+            else n_rows_or_minutes
+        )
+        return pl.DataFrame(
+            {
+                "timestamp": [start + timedelta(minutes=m) for m in minutes],
+                **{
+                    column: values if isinstance(values, Sequence) else [values] * len(minutes)
+                    for column, values in columns.items()
+                },
+            },
+            schema={
+                "timestamp": pl.Datetime(time_zone="UTC"),
+                **dict.fromkeys(columns, pl.Float32),
+            },
+        )
+
+    return make_flows
@@ -0,0 +1,66 @@
+"""Benchmark `SubstationFlows.validate` (single pass) against patito's own validation.
+
+Validates one year of 5-minutely flows for each of `--n-substations` substations, one substation at
+a time (as the pipeline does: one `validate` per CSV). Each substation's flows are generated before
+the clock starts, and then validated by both validators.
+
+Run with:
+    uv run python packages/contracts/benchmarks/bench_fast_validation.py --n-substations 1500
+"""
+
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+import patito as pt
+import polars as pl
+from contracts.data_schemas import SubstationFlows
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def substation_flows(seed: int, days: int) -> pl.DataFrame:
+    n_rows = days * 24 * 12
+    index = pl.int_range(n_rows, dtype=pl.UInt64)
+    return pl.select(
+        timestamp=pl.datetime_range(
+            START, START + timedelta(minutes=5 * (n_rows - 1)), "5m", time_zone="UTC"
+        ),
+        **{
+            column: (index.hash(seed * 3 + i) % 20_000 / 100 - 100).cast(pl.Float32)
+            for i, column in enumerate(("MW", "MVA", "MVAr"))
+        },
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-substations", type=int, default=1_500)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    one_pass_seconds = patito_seconds = 0.0
+    for seed in range(args.n_substations):
+        df = substation_flows(seed, args.days)
+
+        t0 = time.perf_counter()
+        SubstationFlows.validate(df)
+        t1 = time.perf_counter()
+        pt.Model.validate.__func__(SubstationFlows, df)  # type: ignore[attr-defined]
+        t2 = time.perf_counter()
+
+        one_pass_seconds += t1 - t0
+        patito_seconds += t2 - t1
+
+    n_rows = args.n_substations * df.height
+    print(f"{args.n_substations:,} substations x {args.days} days ({n_rows:,} rows):")
+    print(f"  patito:      {patito_seconds:6.2f} s ({n_rows / patito_seconds / 1e6:6.1f} M rows/s)")
+    print(
+        f"  single pass: {one_pass_seconds:6.2f} s"
+        f" ({n_rows / one_pass_seconds / 1e6:6.1f} M rows/s),"
+        f" {patito_seconds / one_pass_seconds:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
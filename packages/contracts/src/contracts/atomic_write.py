@@ -0,0 +1,30 @@
+"""Replace files atomically, so readers (in any process) never see a partial file.
+
+The new file is written to a temporary file beside the old one, and then renamed over it. A rename
+within one directory is atomic, so readers see either the whole old file or the whole new one. If
+the write fails then the old file is left untouched, and the temporary file is deleted.
+"""
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_write(path: str | Path) -> Iterator[Path]:
+    """Yield a temporary path to write to, which is moved to `path` if the block succeeds.
+
+    The parent directory of `path` is created if need be. The temporary file's name includes the
+    process and thread IDs, so concurrent writers don't write to the same temporary file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    tmp_path.replace(path)
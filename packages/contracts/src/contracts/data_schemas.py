@@ -1,13 +1,24 @@
 """Data schemas for the NGED substation forecast project."""
 
 from collections.abc import Sequence
+from datetime import date as date_type
 from datetime import datetime
+from pathlib import Path
+from typing import Any, ClassVar, Final
 
 import patito as pt
 import polars as pl
+from patito.exceptions import DataFrameValidationError, ErrorWrapper, RowValueError
+
+from contracts.expressions import out_of_order
+from contracts.fast_validation import validate_in_one_pass
+from contracts.lazy_validation import sink_parquet_validated, validate_lazy
+from contracts.parquet import ParquetSettings
 
 
 class SubstationFlows(pt.Model):
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(sort_by=("timestamp",))
+
     timestamp: datetime = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
 
     # Primary substations usually have flows in the tens of MW.
@@ -33,12 +44,13 @@ class SubstationFlows(pt.Model):
         allow_superfluous_columns: bool = False,
         drop_superfluous_columns: bool = False,
     ) -> pt.DataFrame["SubstationFlows"]:
-        """Validate the given dataframe, ensuring either MW or MVA is present."""
-        if "MW" not in dataframe.columns and "MVA" not in dataframe.columns:
-            raise ValueError(
-                "SubstationFlows dataframe must contain at least one of 'MW' or 'MVA' columns."
-            )
-        return super().validate(
+        """Validate the given dataframe, ensuring either MW or MVA is present.
+
+        All the column constraints are checked in a single pass (see `contracts.fast_validation`).
+        """
+        cls._check_has_mw_or_mva(dataframe.columns)
+        return validate_in_one_pass(
+            cls,
             dataframe=dataframe,
             columns=columns,
             allow_missing_columns=allow_missing_columns,
@@ -46,8 +58,66 @@ class SubstationFlows(pt.Model):
             drop_superfluous_columns=drop_superfluous_columns,
         )
 
+    @classmethod
+    def validate_lazy(
+        cls,
+        lf: pl.LazyFrame,
+        allow_missing_columns: bool = False,
+        allow_superfluous_columns: bool = False,
+        drop_superfluous_columns: bool = False,
+    ) -> pl.LazyFrame:
+        """Validate a `LazyFrame` in one streaming pass (see `contracts.lazy_validation`)."""
+        cls._check_has_mw_or_mva(lf.collect_schema().names())
+        return validate_lazy(
+            cls,
+            lf,
+            allow_missing_columns=allow_missing_columns,
+            allow_superfluous_columns=allow_superfluous_columns,
+            drop_superfluous_columns=drop_superfluous_columns,
+        )
+
+    @classmethod
+    def sink_parquet(
+        cls,
+        lf: pl.LazyFrame,
+        path: str | Path,
+        allow_missing_columns: bool = False,
+        allow_superfluous_columns: bool = False,
+        **sink_options: Any,
+    ) -> None:
+        """Stream a `LazyFrame` into a parquet file, validating it in the same streaming pass.
+
+        `path` is only written if the data is valid (see `contracts.lazy_validation`).
+        """
+        cls._check_has_mw_or_mva(lf.collect_schema().names())
+        sink_parquet_validated(
+            cls,
+            lf,
+            path,
+            allow_missing_columns=allow_missing_columns,
+            allow_superfluous_columns=allow_superfluous_columns,
+            **sink_options,
+        )
+
+    @staticmethod
+    def _check_has_mw_or_mva(columns: Sequence[str]) -> None:
+        if "MW" not in columns and "MVA" not in columns:
+            raise ValueError(
+                "SubstationFlows dataframe must contain at least one of 'MW' or 'MVA' columns."
+            )
+
+
+FLOW_COLUMNS: Final[tuple[str, ...]] = tuple(
+    column for column in SubstationFlows.columns if column != "timestamp"
+)
+"""The power flow columns of `SubstationFlows`: all of its columns except `timestamp`."""
+
 
 class SubstationLocations(pt.Model):
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(
+        sort_by=("substation_number",), dictionary_columns=("substation_type",)
+    )
+
     # NGED has 192,000 substations.
     substation_number: int = pt.Field(dtype=pl.Int32, unique=True, gt=0, lt=1_000_000)
 
@@ -59,3 +129,176 @@ class SubstationLocations(pt.Model):
     substation_type: str = pt.Field(dtype=pl.Categorical)
     latitude: float | None = pt.Field(dtype=pl.Float32, ge=49, le=61)  # UK latitude range
     longitude: float | None = pt.Field(dtype=pl.Float32, ge=-9, le=2)  # UK longitude range
+
+    @classmethod
+    def validate_lazy(
+        cls,
+        lf: pl.LazyFrame,
+        allow_missing_columns: bool = False,
+        allow_superfluous_columns: bool = False,
+        drop_superfluous_columns: bool = False,
+    ) -> pl.LazyFrame:
+        """Validate a `LazyFrame` in one streaming pass (see `contracts.lazy_validation`)."""
+        return validate_lazy(
+            cls,
+            lf,
+            allow_missing_columns=allow_missing_columns,
+            allow_superfluous_columns=allow_superfluous_columns,
+            drop_superfluous_columns=drop_superfluous_columns,
+        )
+
+
+class MultiSubstationFlows(pt.Model):
+    """The 5-minutely flows of many substations, in one long-format table.
+
+    Sorted by `sort_by` (i.e. by substation, then time), with unique (`substation_number`,
+    `timestamp`) pairs, so that parquet's row-group statistics can skip the substations and times
+    that a query doesn't need. Every flow column is present, but is null for the substations which
+    don't report that flow.
+    """
+
+    sort_by: ClassVar[tuple[str, ...]] = ("substation_number", "timestamp")
+    # Each substation number is repeated on ~100,000 rows a year, so it dictionary-encodes to
+    # almost nothing.
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(
+        sort_by=sort_by, dictionary_columns=("substation_number",)
+    )
+
+    # The same substation numbers as `SubstationLocations`.
+    substation_number: int = pt.Field(dtype=pl.Int32, gt=0, lt=1_000_000)
+    timestamp: datetime = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
+    MW: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVA: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVAr: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+
+    @classmethod
+    def validate(  # type: ignore[invalid-method-override]
+        cls,
+        dataframe: pl.DataFrame,
+        columns: Sequence[str] | None = None,
+        allow_missing_columns: bool = False,
+        allow_superfluous_columns: bool = False,
+        drop_superfluous_columns: bool = False,
+    ) -> pt.DataFrame["MultiSubstationFlows"]:
+        """Validate the given dataframe, including that it is strictly sorted by `sort_by`."""
+        validated = validate_in_one_pass(
+            cls,
+            dataframe=dataframe,
+            columns=columns,
+            allow_missing_columns=allow_missing_columns,
+            allow_superfluous_columns=allow_superfluous_columns,
+            drop_superfluous_columns=drop_superfluous_columns,
+        )
+        n_out_of_order = dataframe.select(cls.out_of_order().sum()).item()
+        if n_out_of_order:
+            raise DataFrameValidationError(
+                errors=[
+                    ErrorWrapper(
+                        RowValueError(
+                            f"{n_out_of_order} rows are not in strictly increasing order."
+                        ),
+                        loc=", ".join(cls.sort_by),
+                    )
+                ],
+                model=cls,
+            )
+        return validated
+
+    @classmethod
+    def out_of_order(cls) -> pl.Expr:
+        """True for each row which isn't strictly after the previous row, in the `sort_by` order."""
+        return out_of_order(cls.sort_by, strict=True)
+
+
+class HalfHourlySubstationFlows(pt.Model):
+    """The 5-minutely `SubstationFlows` of many substations, rolled up into 30-minute windows.
+
+    Sorted by `substation` and `timestamp`. Every flow column is present, but is null for the
+    substations which don't report that flow.
+    """
+
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(
+        sort_by=("substation", "timestamp"), dictionary_columns=("substation",)
+    )
+
+    # Identifies the substation. For live primaries, this is the stem of the parquet filename.
+    substation: str = pt.Field(dtype=pl.String, min_length=1)
+
+    # The start of the 30-minute window. A window includes its start, but not its end.
+    timestamp: datetime = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
+
+    # The number of 5-minutely rows in this window. Up to 6, unless there are duplicate timestamps.
+    n_samples: int = pt.Field(dtype=pl.UInt32, ge=1)
+
+    MW_mean: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MW_min: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MW_max: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MW_last: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)  # The last non-null.
+
+    MVA_mean: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVA_min: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVA_max: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVA_last: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+
+    MVAr_mean: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVAr_min: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVAr_max: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVAr_last: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+
+
+class DailySubstationPeaks(pt.Model):
+    """The daily maximum of each 5-minutely flow of many substations, and when it occurred.
+
+    Sorted by `substation` and `date`. Days are UTC days.
+    """
+
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(
+        sort_by=("substation", "date"), dictionary_columns=("substation",)
+    )
+
+    substation: str = pt.Field(dtype=pl.String, min_length=1)
+    date: date_type = pt.Field(dtype=pl.Date)
+
+    MW_peak: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MW_peak_timestamp: datetime | None = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
+
+    MVA_peak: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVA_peak_timestamp: datetime | None = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
+
+    MVAr_peak: float | None = pt.Field(dtype=pl.Float32, ge=-1_000, le=1_000)
+    MVAr_peak_timestamp: datetime | None = pt.Field(dtype=pl.Datetime(time_zone="UTC"))
+
+
+class SubstationDailyQuality(pt.Model):
+    """Data-quality indicators of the 5-minutely `SubstationFlows` of each substation, per UTC day.
+
+    Sorted by `substation` and `date`. A gap or sign flip is counted on the day of the later row.
+    """
+
+    parquet: ClassVar[ParquetSettings] = ParquetSettings(
+        sort_by=("substation", "date"), dictionary_columns=("substation",)
+    )
+
+    substation: str = pt.Field(dtype=pl.String, min_length=1)
+    date: date_type = pt.Field(dtype=pl.Date)
+    n_rows: int = pt.Field(dtype=pl.UInt32, ge=1)
+
+    # Rows with the same timestamp as the previous row.
+    n_duplicate_timestamps: int = pt.Field(dtype=pl.UInt32)
+
+    # 5-minute intervals missing between consecutive rows. Excludes any before the first row.
+    n_missing_intervals: int = pt.Field(dtype=pl.UInt32)
+
+    # For each flow: The number of nulls; the number of rows in a run of identical values which is
+    # long enough to suggest that the telemetry is stuck; and the number of sudden sign flips.
+    MW_n_null: int = pt.Field(dtype=pl.UInt32)
+    MW_n_stuck: int = pt.Field(dtype=pl.UInt32)
+    MW_n_sign_flips: int = pt.Field(dtype=pl.UInt32)
+
+    MVA_n_null: int = pt.Field(dtype=pl.UInt32)
+    MVA_n_stuck: int = pt.Field(dtype=pl.UInt32)
+    MVA_n_sign_flips: int = pt.Field(dtype=pl.UInt32)
+
+    MVAr_n_null: int = pt.Field(dtype=pl.UInt32)
+    MVAr_n_stuck: int = pt.Field(dtype=pl.UInt32)
+    MVAr_n_sign_flips: int = pt.Field(dtype=pl.UInt32)
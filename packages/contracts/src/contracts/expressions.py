@@ -0,0 +1,26 @@
+"""Polars expressions shared by the data contracts.
+
+The column constraints of a contract are compiled to expressions by
+`contracts.fast_validation.bound_checks`, which both the eager and the lazy validators use.
+"""
+
+from collections.abc import Sequence
+
+import polars as pl
+
+
+def out_of_order(columns: Sequence[str], strict: bool = False) -> pl.Expr:
+    """True for the rows which sort before the previous row, when sorting by `columns` in order.
+
+    Args:
+        columns: The sort order, e.g. `["substation_number", "timestamp"]`.
+        strict: Also flag rows which are equal to the previous row (in all of `columns`).
+    """
+    before = pl.lit(False)
+    equal = pl.lit(True)
+    for column in columns:
+        value, previous = pl.col(column), pl.col(column).shift()
+        before = before | (equal & (value < previous))
+        equal = equal & (value == previous)
+    # The first row has no previous row, so the comparisons are null.
+    return (before | equal if strict else before).fill_null(False)
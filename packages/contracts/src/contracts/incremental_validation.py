@@ -0,0 +1,144 @@
+"""Validate only the rows appended to a table since it was last validated.
+
+A table that grows by appending (e.g. the flows of one substation, sorted by timestamp) only needs
+its new rows validated. A `ValidationWatermark`, stored in the parquet file's key-value metadata,
+records how far the table has been validated, and against which version of the contract (a
+fingerprint of the model's schema and constraints). `validate_appended` then checks the rows after
+the watermark, plus the invariants which span the boundary: the sort column must be strictly
+increasing (i.e. sorted and unique) across the old and new rows. The cost grows with the size of
+the update, not the size of the history.
+"""
+
+import functools
+import hashlib
+import json
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any, Final, Self
+
+import patito as pt
+import polars as pl
+from patito.exceptions import DataFrameValidationError, ErrorWrapper, RowValueError
+from pydantic import BaseModel
+
+VALIDATION_METADATA_KEY: Final[str] = "contracts.validation_watermark"
+
+_EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class ValidationWatermark(BaseModel):
+    """How much of a table has been validated, and against which version of its contract."""
+
+    fingerprint: str  # See `schema_fingerprint`.
+    columns: list[str]  # The table's columns when it was validated.
+    # The table's rows up to and including this value of the sort column have been validated.
+    validated_up_to: datetime
+    n_rows: int  # The number of rows up to and including `validated_up_to`.
+
+    def to_parquet_metadata(self) -> dict[str, str]:
+        return {VALIDATION_METADATA_KEY: self.model_dump_json()}
+
+    @classmethod
+    def of_validated_table(
+        cls, model: type[pt.Model], df: pl.DataFrame, sort_column: str = "timestamp"
+    ) -> Self:
+        """The watermark of a non-empty table whose rows have all been validated against `model`."""
+        return cls(
+            fingerprint=schema_fingerprint(model),
+            columns=df.columns,
+            validated_up_to=df[sort_column][-1],
+            n_rows=df.height,
+        )
+
+    @classmethod
+    def from_parquet_metadata(cls, metadata: Mapping[str, str]) -> Self | None:
+        value = metadata.get(VALIDATION_METADATA_KEY)
+        return None if value is None else cls.model_validate_json(value)
+
+
+def read_watermark(path: str | Path) -> ValidationWatermark | None:
+    """Read the watermark of a parquet file (from its footer, without reading any data)."""
+    return ValidationWatermark.from_parquet_metadata(pl.read_parquet_metadata(path))
+
+
+@functools.cache
+def schema_fingerprint(model: type[pt.Model]) -> str:
+    """A hash of the model's columns, dtypes and constraints. Changes if the contract changes."""
+    schema = {
+        "model": model.__name__,
+        "dtypes": {column: str(dtype) for column, dtype in model.dtypes.items()},
+        "properties": model._schema_properties(),
+    }
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def validate_appended(
+    model: type[pt.Model],
+    df: pl.DataFrame,
+    watermark: ValidationWatermark | None,
+    sort_column: str = "timestamp",
+    rows_already_validated: bool = False,
+    **validate_kwargs: Any,
+) -> ValidationWatermark | None:
+    """Validate the rows of `df` after `watermark`, and return the new watermark.
+
+    The whole of `df` is validated if there is no watermark, if the contract or the table's columns
+    have changed since the watermark was written, or if the number of rows up to the watermark has
+    changed (i.e. rows were inserted into, or removed from, the validated part of the table).
+
+    Args:
+        model: The data contract.
+        df: The whole table, sorted by `sort_column`. The rows up to the watermark must not have
+            been modified since they were validated.
+        watermark: The watermark of the table before the new rows were appended (e.g. from
+            `read_watermark`).
+        sort_column: The column which the table is sorted by, which must be unique.
+        rows_already_validated: True if the rows after the watermark have already been validated
+            one by one (e.g. by the parser which produced them), so only the invariants which
+            span rows need checking. If the watermark can't be used then every row is validated
+            regardless.
+        **validate_kwargs: Passed to `model.validate`.
+
+    Returns:
+        The watermark to store with `df`. None if `df` is empty.
+
+    Raises:
+        patito.exceptions.DataFrameValidationError: If the new rows break the contract, or
+            `sort_column` isn't strictly increasing.
+    """
+    start = 0
+    if (
+        watermark is not None
+        and watermark.fingerprint == schema_fingerprint(model)
+        and watermark.columns == df.columns
+    ):
+        n_validated = _search_sorted(df[sort_column], watermark.validated_up_to)
+        if n_validated == watermark.n_rows:
+            start = n_validated
+    if start == df.height:
+        return watermark if df.height else None
+
+    if not (rows_already_validated and start):
+        model.validate(df.slice(start), **validate_kwargs)
+    # Include the last validated row, to check the order across the boundary.
+    keys = df[sort_column].slice(max(start - 1, 0))
+    n_out_of_order = (keys.slice(1) <= keys.head(-1)).sum()
+    if n_out_of_order:
+        message = f"{n_out_of_order} rows are not in strictly increasing order."
+        raise DataFrameValidationError(
+            errors=[ErrorWrapper(RowValueError(message), loc=sort_column)], model=model
+        )
+    return ValidationWatermark.of_validated_table(model, df, sort_column)
+
+
+def _search_sorted(keys: pl.Series, value: datetime) -> int:
+    """The number of `keys` which are at most `value`."""
+    dtype = keys.dtype
+    if isinstance(dtype, pl.Datetime):
+        # Search the integers, because converting a timezone-aware `datetime` to Polars is slow.
+        us = (value - _EPOCH) // timedelta(microseconds=1)
+        physical = {"ms": us // 1_000, "us": us, "ns": us * 1_000}[dtype.time_unit]
+        n_keys = keys.to_physical().search_sorted(physical, side="right")
+        return n_keys  # type: ignore[return-value]
+    return keys.search_sorted(value, side="right")  # type: ignore[return-value]
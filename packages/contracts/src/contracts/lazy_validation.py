@@ -0,0 +1,180 @@
+"""Validate `LazyFrame`s against the data contracts, without collecting them into memory.
+
+The schema of a `LazyFrame` is checked straight away (`collect_schema` doesn't read any data). The
+rows are checked by one aggregation, which counts the failures of every check of every column in a
+single pass of Polars' streaming engine. The errors are the same as patito's, except that schema
+errors (missing, superfluous or wrongly-typed columns) are raised on their own, before any rows are
+read.
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import patito as pt
+import polars as pl
+from patito.exceptions import (
+    ColumnDTypeError,
+    DataFrameValidationError,
+    ErrorWrapper,
+    MissingColumnsError,
+    MissingValuesError,
+    RowValueError,
+    SuperfluousColumnsError,
+)
+
+from contracts.atomic_write import atomic_write
+from contracts.fast_validation import bound_checks, is_compilable
+from contracts.parquet import parquet_settings
+
+# The column, an expression counting the rows which fail the check, and the error for those rows.
+type _Check = tuple[str, pl.Expr, Callable[[int], Exception]]
+
+
+def validate_lazy(
+    model: type[pt.Model],
+    lf: pl.LazyFrame,
+    allow_missing_columns: bool = False,
+    allow_superfluous_columns: bool = False,
+    drop_superfluous_columns: bool = False,
+) -> pl.LazyFrame:
+    """Validate `lf` in one streaming pass. The arguments are the same as `pt.Model.validate`.
+
+    `lf` is evaluated here, and again when the returned `LazyFrame` is collected. To write the
+    data, use `sink_parquet_validated`, which validates and writes in the same pass.
+
+    Returns:
+        `lf` (without the columns that aren't in `model`, if `drop_superfluous_columns`).
+
+    Raises:
+        patito.exceptions.DataFrameValidationError: If `lf` doesn't match `model`.
+    """
+    lf, checks = _plan(
+        model, lf, allow_missing_columns, allow_superfluous_columns, drop_superfluous_columns
+    )
+    if checks:
+        n_failures = lf.select(expr for _, expr, _ in checks).collect(engine="streaming")
+        _raise_for_failures(model, checks, n_failures.row(0))
+    return lf
+
+
+def sink_parquet_validated(
+    model: type[pt.Model],
+    lf: pl.LazyFrame,
+    path: str | Path,
+    allow_missing_columns: bool = False,
+    allow_superfluous_columns: bool = False,
+    drop_superfluous_columns: bool = False,
+    **sink_options: Any,
+) -> None:
+    """Stream `lf` into a parquet file, validating the rows in the same pass.
+
+    The rows are streamed into a temporary file, and the file is only moved to `path` if all the
+    checks pass, so `path` never holds invalid data.
+
+    Args:
+        model: The data contract.
+        lf: The data.
+        path: The parquet file to write.
+        allow_missing_columns: As for `pt.Model.validate`.
+        allow_superfluous_columns: As for `pt.Model.validate`.
+        drop_superfluous_columns: As for `pt.Model.validate`.
+        **sink_options: Passed to `pl.LazyFrame.sink_parquet`. Defaults to the model's
+            `ParquetSettings`.
+
+    Raises:
+        patito.exceptions.DataFrameValidationError: If `lf` doesn't match `model`.
+    """
+    lf, checks = _plan(
+        model, lf, allow_missing_columns, allow_superfluous_columns, drop_superfluous_columns
+    )
+    with atomic_write(path) as tmp_path:
+        sink_options = {**parquet_settings(model).polars_options(), **sink_options}
+        sink = lf.sink_parquet(tmp_path, lazy=True, **sink_options)
+        if checks:
+            # Both queries share `lf`, so Polars evaluates it once.
+            _, n_failures = pl.collect_all(
+                [sink, lf.select(expr for _, expr, _ in checks)], engine="streaming"
+            )
+            _raise_for_failures(model, checks, n_failures.row(0))
+        else:
+            sink.collect(engine="streaming")
+
+
+def _plan(
+    model: type[pt.Model],
+    lf: pl.LazyFrame,
+    allow_missing_columns: bool,
+    allow_superfluous_columns: bool,
+    drop_superfluous_columns: bool,
+) -> tuple[pl.LazyFrame, list[_Check]]:
+    """Check the schema of `lf`, and plan the checks of its rows."""
+    if not is_compilable(model):
+        raise TypeError(f"{model.__name__} has constraints which can't be validated lazily.")
+    schema = lf.collect_schema()
+    if drop_superfluous_columns:
+        superfluous = [column for column in schema if column not in model.columns]
+        lf = lf.drop(superfluous)
+        schema = lf.collect_schema()
+
+    errors: list[ErrorWrapper] = []
+    if not allow_missing_columns:
+        for column in set(model.columns) - set(schema):
+            if not model.column_infos[column].allow_missing:
+                errors.append(ErrorWrapper(MissingColumnsError("Missing column"), loc=column))
+    if not (allow_superfluous_columns or model.model_config.get("extra") == "allow"):
+        for column in set(schema) - set(model.columns):
+            errors.append(ErrorWrapper(SuperfluousColumnsError("Superfluous column"), loc=column))
+    for column in model.columns:
+        if column in schema and schema[column] not in model.valid_dtypes[column]:
+            message = f"Polars dtype {schema[column]} does not match model field type."
+            errors.append(ErrorWrapper(ColumnDTypeError(message), loc=column))
+    if errors:
+        raise DataFrameValidationError(errors=errors, model=model)
+
+    # The same checks, in the same order, as `patito.validators._find_errors`.
+    checks: list[_Check] = []
+    for column in model.non_nullable_columns.intersection(schema):
+        checks.append(
+            (
+                column,
+                pl.col(column).null_count(),
+                lambda n: MissingValuesError(f"{n} missing {'value' if n == 1 else 'values'}"),
+            )
+        )
+    for column in model.columns:
+        if column not in schema:
+            continue
+        if model.column_infos[column].unique:
+            checks.append(
+                (
+                    column,
+                    pl.col(column).is_duplicated().sum(),
+                    lambda n: RowValueError(f"{n} rows with duplicated values."),
+                )
+            )
+        if column_bound_checks := bound_checks(model, column):
+            checks.append(
+                (
+                    column,
+                    pl.sum_horizontal((~check).sum() for check in column_bound_checks),
+                    lambda n: RowValueError(
+                        f"{n} row{'' if n == 1 else 's'} with out of bound values."
+                    ),
+                )
+            )
+    return lf, [
+        (column, expr.alias(str(i)), error) for i, (column, expr, error) in enumerate(checks)
+    ]
+
+
+def _raise_for_failures(
+    model: type[pt.Model], checks: list[_Check], n_failures: tuple[int, ...]
+) -> None:
+    errors = [
+        ErrorWrapper(error(n), loc=column)
+        for (column, _, error), n in zip(checks, n_failures, strict=True)
+        if n
+    ]
+    if errors:
+        raise DataFrameValidationError(errors=errors, model=model)
@@ -0,0 +1,139 @@
+"""The Arrow schema, and the recommended parquet writer settings, of each data contract.
+
+Every writer of a data contract shares these, so that every file of a contract:
+
+- has exactly the contract's dtypes (and nullability), so readers never need to cast.
+- records its sort order as the parquet "sorting columns", and has min/max statistics, so scans can
+  skip row groups.
+- dictionary-encodes the repetitive columns (e.g. substation names), and uses row groups sized for
+  the way the contract is queried.
+"""
+
+import functools
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+import patito as pt
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from contracts.expressions import out_of_order
+
+
+class ParquetSettings(BaseModel, frozen=True):
+    """Recommended parquet writer settings for a data contract."""
+
+    # The order of the rows. `write_parquet` checks it, and records it in the file's metadata.
+    sort_by: tuple[str, ...] = ()
+    row_group_size: int = 128 * 1024
+    # Columns with few distinct values, which are much smaller dictionary-encoded.
+    dictionary_columns: tuple[str, ...] = ()
+    compression: str = "zstd"
+    compression_level: int = 3
+    statistics: bool = True
+
+    def polars_options(self) -> dict[str, Any]:
+        """Keyword arguments for `pl.DataFrame.write_parquet` and `pl.LazyFrame.sink_parquet`.
+
+        Polars dictionary-encodes categorical columns (only), and can't record the sort order.
+        """
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "statistics": self.statistics,
+            "row_group_size": self.row_group_size,
+        }
+
+    def pyarrow_options(self, column_names: Sequence[str]) -> dict[str, Any]:
+        """Keyword arguments for `pyarrow.parquet.write_table`, for a table with these columns."""
+        return {
+            "compression": self.compression,
+            "compression_level": self.compression_level,
+            "write_statistics": self.statistics,
+            "row_group_size": self.row_group_size,
+            "use_dictionary": [c for c in self.dictionary_columns if c in column_names],
+            "sorting_columns": self.sorting_columns(column_names),
+        }
+
+    def sorting_columns(self, column_names: Sequence[str]) -> list[pq.SortingColumn]:
+        """The parquet sorting columns of `sort_by`, for a table with these columns."""
+        return [pq.SortingColumn(list(column_names).index(column)) for column in self.sort_by]
+
+
+def parquet_settings(model: type[pt.Model]) -> ParquetSettings:
+    """The model's `parquet` settings, or the defaults if it doesn't declare any."""
+    return getattr(model, "parquet", None) or ParquetSettings()
+
+
+@functools.cache
+def arrow_schema(model: type[pt.Model], columns: tuple[str, ...] | None = None) -> pa.Schema:
+    """The Arrow schema of the model (or of a subset of its columns, in the model's order).
+
+    The Arrow types are those which Polars reads back as the model's dtypes. Non-nullable columns
+    are non-nullable Arrow fields.
+    """
+    dtypes = {
+        column: dtype
+        for column, dtype in model.dtypes.items()
+        if columns is None or column in columns
+    }
+    schema = pl.DataFrame(schema=dtypes).to_arrow().schema
+    return pa.schema(field.with_nullable(field.name in model.nullable_columns) for field in schema)
+
+
+def write_parquet(
+    model: type[pt.Model],
+    df: pl.DataFrame,
+    path: str | Path,
+    metadata: Mapping[str, str] | None = None,
+    **overrides: Any,
+) -> None:
+    """Write `df` with the model's Arrow schema and parquet settings.
+
+    `df` is cast to the model's dtypes. Its columns which aren't in the model are dropped. It
+    isn't validated.
+
+    Args:
+        model: The data contract.
+        df: The data, sorted by the model's `parquet.sort_by`.
+        path: The parquet file to write.
+        metadata: Extra key-value metadata for the file.
+        **overrides: Override the model's `ParquetSettings`, e.g. `row_group_size`.
+
+    Raises:
+        ValueError: If `df` isn't sorted by the model's `parquet.sort_by`.
+    """
+    settings = parquet_settings(model).model_copy(update=overrides)
+    columns = tuple(column for column in model.columns if column in df.columns)
+    if settings.sort_by and df.select(out_of_order(settings.sort_by).any()).item():
+        raise ValueError(f"The rows of {model.__name__} must be sorted by {settings.sort_by}.")
+    table = df.select(columns).to_arrow().cast(arrow_schema(model, columns))
+    write_arrow(table, path, settings, metadata=metadata)
+
+
+def write_arrow(
+    table: pa.Table,
+    path: str | Path,
+    settings: ParquetSettings,
+    metadata: Mapping[str, str] | None = None,
+    **pyarrow_options: Any,
+) -> None:
+    """Write an Arrow table with the given parquet settings.
+
+    Unlike `write_parquet`, the table needn't have a contract's columns (e.g. it could be an
+    encoding of them), and it isn't checked or cast.
+
+    Args:
+        table: The data, already sorted by `settings.sort_by`.
+        path: The parquet file to write.
+        settings: E.g. a contract's `ParquetSettings`, with `sort_by` adapted to `table`'s columns.
+        metadata: Extra key-value metadata for the file.
+        **pyarrow_options: Override the keyword arguments for `pyarrow.parquet.write_table`.
+    """
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    options = settings.pyarrow_options(table.column_names) | pyarrow_options
+    pq.write_table(table, path, **options)
@@ -0,0 +1,21 @@
+import pytest
+from contracts.atomic_write import atomic_write
+
+
+def test_atomic_write(tmp_path):
+    path = tmp_path / "dir" / "file.txt"
+    with atomic_write(path) as tmp:
+        tmp.write_text("new")
+        assert not path.exists()
+    assert path.read_text() == "new"
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_atomic_write_keeps_the_old_file_on_error(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_text("old")
+    with pytest.raises(RuntimeError), atomic_write(path) as tmp:
+        tmp.write_text("partial")
+        raise RuntimeError
+    assert path.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,14 @@
+import polars as pl
+from contracts.expressions import out_of_order
+
+
+def test_out_of_order():
+    # Nulls are never out of order.
+    df = pl.DataFrame({"a": [1, 1, 1, 2, 2, None], "b": [1, 2, 2, 0, None, 0]})
+
+    def flagged(expr: pl.Expr) -> list[int]:
+        return df.with_row_index().filter(expr)["index"].to_list()
+
+    assert flagged(out_of_order(["a", "b"])) == []
+    assert flagged(out_of_order(["a", "b"], strict=True)) == [2]
+    assert flagged(out_of_order(["b", "a"])) == [3]
@@ -0,0 +1,92 @@
+from datetime import UTC, datetime
+
+import patito as pt
+import polars as pl
+import pytest
+from contracts.data_schemas import SubstationFlows, SubstationLocations
+from contracts.fast_validation import validate_in_one_pass
+from polars.testing import assert_frame_equal
+
+FLOWS = pl.DataFrame(
+    {
+        "timestamp": [datetime(2026, 1, 1, hour, tzinfo=UTC) for hour in range(3)],
+        "MW": [1.0, None, 3.0],
+        "MVA": [1.5, 2.5, 3.5],
+    },
+    schema_overrides={"MW": pl.Float32, "MVA": pl.Float32},
+)
+
+LOCATIONS = pl.DataFrame(
+    {
+        "substation_number": [1, 2],
+        "substation_name": ["Abington", "Albrighton"],
+        "substation_type": ["Primary", "Primary"],
+        "latitude": [52.2, 52.6],
+        "longitude": [-0.9, -2.3],
+    },
+    schema_overrides={
+        "substation_number": pl.Int32,
+        "substation_type": pl.Categorical,
+        "latitude": pl.Float32,
+        "longitude": pl.Float32,
+    },
+)
+
+
+def patito_validate(model: type[pt.Model], df: pl.DataFrame, **kwargs) -> pl.DataFrame:
+    """Validate with patito's own (multi-pass) validation."""
+    return pt.Model.validate.__func__(model, df, **kwargs)  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize(
+    ("model", "df", "kwargs"),
+    [
+        (SubstationFlows, FLOWS, {"allow_missing_columns": True}),
+        (
+            SubstationFlows,
+            FLOWS.with_columns(Volts=pl.lit(11.0)),
+            {"allow_missing_columns": True, "drop_superfluous_columns": True},
+        ),
+        (SubstationLocations, LOCATIONS, {}),
+    ],
+)
+def test_valid_data_matches_patito(model, df, kwargs):
+    assert_frame_equal(
+        validate_in_one_pass(model, df, **kwargs), patito_validate(model, df, **kwargs)
+    )
+
+
+@pytest.mark.parametrize(
+    ("model", "df", "kwargs"),
+    [
+        (
+            SubstationFlows,
+            FLOWS.with_columns(MW=pl.col("MW") * 1_000),
+            {"allow_missing_columns": True},
+        ),
+        (
+            SubstationFlows,
+            FLOWS.with_columns(MVA=pl.lit(float("nan"), pl.Float32)),
+            {"allow_missing_columns": True},
+        ),
+        (
+            SubstationFlows,
+            FLOWS.with_columns(pl.col("MW").cast(pl.Float64)),
+            {"allow_missing_columns": True},
+        ),
+        (SubstationFlows, FLOWS.with_columns(timestamp=None, Volts=pl.lit(11.0)), {}),
+        (SubstationLocations, LOCATIONS.with_columns(substation_number=pl.lit(1, pl.Int32)), {}),
+        (
+            SubstationLocations,
+            LOCATIONS.with_columns(substation_name=pl.lit("A"), latitude=None),
+            {},
+        ),
+    ],
+)
+def test_errors_are_identical_to_patito(model, df, kwargs):
+    with pytest.raises(pt.exceptions.DataFrameValidationError) as expected:
+        patito_validate(model, df, **kwargs)
+    with pytest.raises(pt.exceptions.DataFrameValidationError) as actual:
+        validate_in_one_pass(model, df, **kwargs)
+
+    assert str(actual.value) == str(expected.value)
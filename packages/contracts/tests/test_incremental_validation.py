@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import patito as pt
+import polars as pl
+import pytest
+from contracts.data_schemas import SubstationFlows, SubstationLocations
+from contracts.incremental_validation import (
+    ValidationWatermark,
+    read_watermark,
+    schema_fingerprint,
+    validate_appended,
+)
+
+
+def test_only_appended_rows_are_validated(make_flows, tmp_path):
+    old = make_flows(10, MW=1.0)
+    watermark = validate_appended(SubstationFlows, old, None, allow_missing_columns=True)
+    assert watermark is not None
+    assert (watermark.validated_up_to, watermark.n_rows) == (old["timestamp"][-1], 10)
+
+    # Invalid *old* rows aren't re-checked, because they're before the watermark...
+    invalid_old = old.with_columns(MW=pl.lit(5_000.0, pl.Float32))
+    new = make_flows(5, old["timestamp"][-1] + timedelta(minutes=5), MW=1.0)
+    appended = pl.concat([invalid_old, new])
+    new_watermark = validate_appended(
+        SubstationFlows, appended, watermark, allow_missing_columns=True
+    )
+    assert new_watermark is not None
+    assert (new_watermark.validated_up_to, new_watermark.n_rows) == (new["timestamp"][-1], 15)
+
+    # ...but appended rows are, and so are all the rows if the watermark doesn't match the table.
+    invalid_new = pl.concat([old, new.with_columns(MW=pl.lit(5_000.0, pl.Float32))])
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="5 rows with out of bound"):
+        validate_appended(SubstationFlows, invalid_new, watermark, allow_missing_columns=True)
+    for stale_watermark in [
+        watermark.model_copy(update={"fingerprint": schema_fingerprint(SubstationLocations)}),
+        watermark.model_copy(update={"n_rows": 9}),
+        watermark.model_copy(update={"columns": ["timestamp", "MVA"]}),
+    ]:
+        with pytest.raises(
+            pt.exceptions.DataFrameValidationError, match="10 rows with out of bound"
+        ):
+            validate_appended(
+                SubstationFlows, appended, stale_watermark, allow_missing_columns=True
+            )
+
+
+def test_rows_already_validated(make_flows):
+    old = make_flows(10, MW=1.0)
+    watermark = validate_appended(SubstationFlows, old, None, allow_missing_columns=True)
+    invalid_new = make_flows(5, old["timestamp"][-1] + timedelta(minutes=5), MW=5_000.0)
+    appended = pl.concat([old, invalid_new])
+
+    # The rows after the watermark aren't validated again...
+    new_watermark = validate_appended(
+        SubstationFlows, appended, watermark, rows_already_validated=True
+    )
+    assert new_watermark is not None and new_watermark.n_rows == 15
+    # ...but the order across the boundary is checked...
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="1 rows are not in strictly"):
+        validate_appended(
+            SubstationFlows, pl.concat([old, old.tail(1)]), watermark, rows_already_validated=True
+        )
+    # ...and every row is validated if there's no watermark.
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="5 rows with out of bound"):
+        validate_appended(
+            SubstationFlows,
+            appended,
+            None,
+            rows_already_validated=True,
+            allow_missing_columns=True,
+        )
+
+
+def test_order_is_checked_across_the_boundary(make_flows):
+    old = make_flows(10, MW=1.0)
+    watermark = validate_appended(SubstationFlows, old, None, allow_missing_columns=True)
+
+    # The first appended row duplicates the last validated row.
+    appended = pl.concat([old, make_flows(3, old["timestamp"][-1], MW=1.0)])
+
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="1 rows are not in strictly"):
+        validate_appended(SubstationFlows, appended, watermark, allow_missing_columns=True)
+
+
+def test_watermark_round_trips_through_parquet_metadata(make_flows, tmp_path):
+    df = make_flows(3, MW=1.0)
+    watermark = validate_appended(SubstationFlows, df, None, allow_missing_columns=True)
+    assert watermark is not None
+    path = tmp_path / "flows.parquet"
+
+    df.write_parquet(path, metadata=watermark.to_parquet_metadata())
+
+    assert read_watermark(path) == watermark
+    df.write_parquet(path)
+    assert read_watermark(path) is None
+    assert ValidationWatermark.from_parquet_metadata({}) is None
@@ -0,0 +1,97 @@
+from datetime import UTC, datetime
+
+import patito as pt
+import polars as pl
+import pytest
+from contracts.data_schemas import SubstationFlows, SubstationLocations
+from contracts.lazy_validation import sink_parquet_validated
+from polars.testing import assert_frame_equal
+
+FLOWS = pl.DataFrame(
+    {
+        "timestamp": [datetime(2026, 1, 1, hour, tzinfo=UTC) for hour in range(3)],
+        "MW": [1.0, None, 3.0],
+        "MVA": [1.5, 2.5, 3.5],
+    },
+    schema_overrides={"MW": pl.Float32, "MVA": pl.Float32},
+)
+
+LOCATIONS = pl.DataFrame(
+    {
+        "substation_number": [1, 2],
+        "substation_name": ["Abington", "Albrighton"],
+        "substation_type": ["Primary", "Primary"],
+        "latitude": [52.2, 52.6],
+        "longitude": [-0.9, -2.3],
+    },
+    schema_overrides={
+        "substation_number": pl.Int32,
+        "substation_type": pl.Categorical,
+        "latitude": pl.Float32,
+        "longitude": pl.Float32,
+    },
+)
+
+
+def test_validate_lazy_returns_the_lazy_frame():
+    lf = FLOWS.lazy().with_columns(Volts=pl.lit(11.0))
+
+    validated = SubstationFlows.validate_lazy(
+        lf, allow_missing_columns=True, drop_superfluous_columns=True
+    )
+
+    assert isinstance(validated, pl.LazyFrame)
+    assert_frame_equal(validated.collect(), FLOWS)
+    assert_frame_equal(SubstationLocations.validate_lazy(LOCATIONS.lazy()).collect(), LOCATIONS)
+
+
+@pytest.mark.parametrize(
+    ("model", "df"),
+    [
+        (
+            SubstationFlows,
+            FLOWS.with_columns(
+                MW=pl.col("MW") * 1_000, timestamp=pl.lit(None, FLOWS.schema["timestamp"])
+            ),
+        ),
+        (SubstationFlows, FLOWS.with_columns(MVA=pl.lit(float("nan"), pl.Float32))),
+        (SubstationLocations, LOCATIONS.with_columns(substation_number=pl.lit(1, pl.Int32))),
+        (
+            SubstationLocations,
+            LOCATIONS.with_columns(substation_name=pl.lit("A"), latitude=pl.lit(0.0, pl.Float32)),
+        ),
+    ],
+)
+def test_lazy_errors_are_identical_to_eager_errors(model, df):
+    with pytest.raises(pt.exceptions.DataFrameValidationError) as eager:
+        model.validate(df, allow_missing_columns=True)
+    with pytest.raises(pt.exceptions.DataFrameValidationError) as lazy:
+        model.validate_lazy(df.lazy(), allow_missing_columns=True)
+
+    assert str(lazy.value) == str(eager.value)
+
+
+def test_schema_is_checked_without_reading_the_data():
+    def read_data(df: pl.DataFrame) -> pl.DataFrame:
+        raise AssertionError("The data was read.")
+
+    schema = {**FLOWS.schema, "MW": pl.Float64}
+    lf = FLOWS.lazy().map_batches(read_data, schema=schema)
+
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="Polars dtype Float64"):
+        SubstationFlows.validate_lazy(lf, allow_missing_columns=True)
+    with pytest.raises(ValueError, match="at least one of 'MW' or 'MVA'"):
+        SubstationFlows.validate_lazy(lf.select("timestamp"))
+
+
+def test_sink_parquet_validated(tmp_path):
+    path = tmp_path / "flows.parquet"
+
+    sink_parquet_validated(SubstationFlows, FLOWS.lazy(), path, allow_missing_columns=True)
+    assert_frame_equal(pl.read_parquet(path), FLOWS)
+
+    invalid = FLOWS.lazy().with_columns(MVA=pl.col("MVA") * 1_000)
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="3 rows with out of bound"):
+        SubstationFlows.sink_parquet(invalid, path, allow_missing_columns=True)
+    assert_frame_equal(pl.read_parquet(path), FLOWS)  # The valid file is untouched.
+    assert [p.name for p in tmp_path.iterdir()] == ["flows.parquet"]
@@ -0,0 +1,77 @@
+from datetime import UTC, datetime
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+from contracts.data_schemas import (
+    MultiSubstationFlows,
+    SubstationDailyQuality,
+    SubstationFlows,
+    SubstationLocations,
+)
+from contracts.parquet import ParquetSettings, arrow_schema, parquet_settings, write_parquet
+from polars.testing import assert_frame_equal
+
+FLEET = pl.DataFrame(
+    {
+        "substation_number": [1, 1, 2],
+        "timestamp": [datetime(2026, 1, 1, hour, tzinfo=UTC) for hour in (0, 1, 0)],
+        "MW": [1.0, None, 3.0],
+        "MVA": [1.5, 2.5, 3.5],
+        "MVAr": [None, None, 0.5],
+    },
+    schema=MultiSubstationFlows.dtypes,
+)
+
+
+@pytest.mark.parametrize(
+    "model", [SubstationFlows, SubstationLocations, MultiSubstationFlows, SubstationDailyQuality]
+)
+def test_arrow_schema_reads_back_as_the_model_dtypes(model, tmp_path):
+    path = tmp_path / "empty.parquet"
+    write_parquet(model, pl.DataFrame(schema=model.dtypes), path)
+
+    assert pl.read_parquet_schema(path) == model.dtypes
+    schema = arrow_schema(model)
+    assert [field.name for field in schema if not field.nullable] == [
+        column for column in model.columns if column not in model.nullable_columns
+    ]
+
+
+def test_write_parquet(tmp_path):
+    path = tmp_path / "fleet.parquet"
+    # Columns in a different order, and Float64 flows, are cast to the model's schema.
+    df = FLEET.select(
+        "timestamp", "substation_number", pl.col("MW", "MVA", "MVAr").cast(pl.Float64)
+    )
+
+    write_parquet(MultiSubstationFlows, df, path, metadata={"source": "test"})
+
+    assert_frame_equal(pl.read_parquet(path), FLEET)
+    file = pq.ParquetFile(path)
+    assert file.schema_arrow.metadata[b"source"] == b"test"
+    row_group = file.metadata.row_group(0)
+    assert row_group.sorting_columns == (pq.SortingColumn(0), pq.SortingColumn(1))
+    assert "RLE_DICTIONARY" in row_group.column(0).encodings  # substation_number
+    assert "RLE_DICTIONARY" not in row_group.column(2).encodings  # MW
+    assert row_group.column(1).statistics.has_min_max
+
+
+def test_write_parquet_rejects_unsorted_rows(tmp_path):
+    path = tmp_path / "fleet.parquet"
+    with pytest.raises(ValueError, match=r"must be sorted by \('substation_number', 'timestamp'\)"):
+        write_parquet(MultiSubstationFlows, FLEET.reverse(), path)
+    assert not path.exists()
+
+
+def test_parquet_settings():
+    assert parquet_settings(SubstationFlows).sort_by == ("timestamp",)
+    assert parquet_settings(SubstationFlows).polars_options() == {
+        "compression": "zstd",
+        "compression_level": 3,
+        "statistics": True,
+        "row_group_size": 128 * 1024,
+    }
+    assert ParquetSettings(sort_by=("b",)).pyarrow_options(["a", "b"])["sorting_columns"] == [
+        pq.SortingColumn(1)
+    ]
@@ -14,17 +14,23 @@ with app.setup:
     import geopandas as gpd
 
     from nged_data import ckan
+    from nged_data.resource_catalogue import ResourceCatalogue
     from nged_data.substation_names.align import join_location_table_to_live_primaries
 
     BASE_PARQUET_PATH: Final[Path] = Path(
         "~/dev/python/nged-substation-forecast/data/NGED/parquet/live_primary_flows"
     ).expanduser()
+    CKAN_CACHE_PATH: Final[Path] = Path(
+        "~/dev/python/nged-substation-forecast/data/NGED/ckan_cache"
+    ).expanduser()
 
 
 @app.cell
 def _():
-    _locations = ckan.get_primary_substation_locations()
-    _live_primaries = ckan.get_csv_resources_for_live_primary_substation_flows()
+    _locations = ckan.get_primary_substation_locations(cache_dir=CKAN_CACHE_PATH)
+    _live_primaries = ckan.get_csv_resources_for_live_primary_substation_flows(
+        catalogue=ResourceCatalogue(CKAN_CACHE_PATH / ckan.RESOURCE_CATALOGUE_FILENAME)
+    )
 
     joined = join_location_table_to_live_primaries(
         live_primaries=_live_primaries, locations=_locations
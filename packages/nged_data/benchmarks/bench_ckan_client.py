@@ -0,0 +1,80 @@
+"""Benchmark the per-request latency saved by the pooled `CkanClient`.
+
+Spins up a local fake CKAN server (see `tests/fakes.py`) and compares:
+
+- "bare httpx.get": the old behaviour of `ckan.httpx_get_with_auth`. A fresh connection per
+  request, plus `load_dotenv()` per request.
+- "pooled CkanClient": the new behaviour. One keep-alive connection pool, auth headers cached.
+
+Note that the fake server speaks plain HTTP on localhost, so this *under*-estimates the saving on
+NGED's real portal, where every new connection also pays for a TLS handshake and a network round
+trip.
+
+Run with:
+    cd packages/nged_data && uv run python -m benchmarks.bench_ckan_client
+
+(As a module, from `packages/nged_data`, so that it can import the fake server from `tests`.)
+"""
+
+import argparse
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+import httpx
+from dotenv import load_dotenv
+from nged_data.ckan_client import CkanClient
+from nged_data.http_resilience import AdaptiveRateLimiter
+from tests.fakes import FakeCkanServer
+
+
+def time_requests(get: Callable[[], httpx.Response], n_requests: int) -> list[float]:
+    latencies = []
+    for _ in range(n_requests):
+        t0 = time.perf_counter()
+        get().raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-requests", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault("NGED_CKAN_TOKEN", "benchmark-token")
+
+    with FakeCkanServer(n_resources=1) as server:
+        url = server.resources[0]["url"]
+        n_bytes = len(next(iter(server.bodies.values())))
+
+        def bare_httpx_get() -> httpx.Response:
+            load_dotenv()
+            headers = {"Authorization": os.environ["NGED_CKAN_TOKEN"]}
+            return httpx.get(url, headers=headers, timeout=30)
+
+        # Don't rate-limit: We're measuring connection overheads, not politeness to the server.
+        unlimited = AdaptiveRateLimiter(rate=1e9, burst=1_000_000_000, max_rate=1e9)
+        with CkanClient(
+            server.base_url, api_key=os.environ["NGED_CKAN_TOKEN"], rate_limiter=unlimited
+        ) as client:
+            results = {
+                "bare httpx.get": time_requests(bare_httpx_get, args.n_requests),
+                "pooled CkanClient": time_requests(lambda: client.get(url), args.n_requests),
+            }
+
+    print(f"{args.n_requests} GETs of a {n_bytes:,} byte CSV:")
+    for name, latencies in results.items():
+        print(
+            f"  {name:>18}: median {statistics.median(latencies) * 1e3:6.3f} ms,"
+            f" total {sum(latencies):6.3f} s"
+        )
+    saved = statistics.median(results["bare httpx.get"]) - statistics.median(
+        results["pooled CkanClient"]
+    )
+    print(f"Median latency saved per request: {saved * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark the bytes on disk, and scan speed, of the plain vs compact `SubstationFlows` encodings.
+
+Builds a synthetic fleet of substations from the example CSVs (each substation gets one example
+CSV's flows, repeated back-to-back over `--days` days) and writes every substation's parquet file in
+both encodings. Then times:
+
+- "write": writing the whole fleet.
+- "scan all": reading every row of every substation.
+- "scan last day": reading the most recent day of every substation.
+
+Run with:
+    uv run python packages/nged_data/benchmarks/bench_compact_flows.py --n-substations 1000
+"""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+
+import polars as pl
+from nged_data.compact_flows import scan_substation_flows, write_substation_flows
+from nged_data.process_flows import process_live_primary_substation_flows
+
+EXAMPLE_DATA_DIR = Path(__file__).parent.parent / "example_csv_data"
+
+
+def example_flows(days: int) -> list[pl.DataFrame]:
+    """The flows of each example CSV, repeated back-to-back to cover `days` days."""
+    fleet = []
+    for csv_path in sorted(EXAMPLE_DATA_DIR.glob("*.csv")):
+        if csv_path.name == "primary_substation_locations.csv":
+            continue
+        df = process_live_primary_substation_flows(csv_path)
+        first, last = df["timestamp"].min(), df["timestamp"].max()
+        span = last - first + timedelta(minutes=5)  # type: ignore[operator]
+        n_repeats = -(-timedelta(days=days) // span)
+        fleet.append(
+            pl.concat(
+                df.with_columns(pl.col("timestamp") - span * (n_repeats - 1 - i))
+                for i in range(n_repeats)
+            )
+        )
+    return fleet
+
+
+def timed(run: Callable[[], object]) -> float:
+    t0 = time.perf_counter()
+    run()
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-substations", type=int, default=200)
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    examples = example_flows(args.days)
+    fleet = [examples[i % len(examples)] for i in range(args.n_substations)]
+    n_rows = sum(df.height for df in fleet)
+    last_timestamp = max(df["timestamp"].max() for df in fleet)
+    last_day = last_timestamp - timedelta(days=1)  # type: ignore[operator]
+    print(f"{args.n_substations} substations, {args.days} days, {n_rows:,} rows:")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compact in (False, True):
+            directory = Path(tmp_dir) / ("compact" if compact else "plain")
+            directory.mkdir()
+            paths = [directory / f"{i:05d}.parquet" for i in range(len(fleet))]
+
+            def write_all() -> None:
+                for df, path in zip(fleet, paths, strict=True):
+                    write_substation_flows(df, path, compact=compact)
+
+            def scan_all() -> None:
+                pl.collect_all([scan_substation_flows(path) for path in paths])
+
+            def scan_last_day() -> None:
+                pl.collect_all(
+                    [
+                        scan_substation_flows(path).filter(pl.col("timestamp") > last_day)
+                        for path in paths
+                    ]
+                )
+
+            write_seconds = timed(write_all)
+            scan_all_seconds = timed(scan_all)
+            scan_last_day_seconds = timed(scan_last_day)
+            n_bytes = sum(path.stat().st_size for path in paths)
+            print(
+                f"  {'compact' if compact else 'plain':>7}: {n_bytes / 1e6:8.1f} MB on disk"
+                f" ({n_bytes / n_rows:5.2f} bytes/row), write {write_seconds:6.2f} s,"
+                f" scan all {scan_all_seconds:6.2f} s, scan last day {scan_last_day_seconds:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark a refresh of the whole fleet of live primary CSVs against a local fake CKAN server.
+
+Serves up to a few thousand resources from `tests/fakes.py` (with simulated network
+latency and, optionally, server-side throttling) and times each way of refreshing the fleet:
+
+- "package_search": discovering the resources (paginated, in parallel).
+- "serial download": one `download_resource` after another. What the Dagster sensor + per-partition
+  runs do today (excluding the cost of launching each run).
+- "async download": `download_resources_concurrently`.
+- "conditional GET": a second, serial refresh with `download_resource_if_modified`, when nothing
+  has changed (so every request is a `304 Not Modified`).
+- "tail fetch": a second, serial refresh with `download_resource_tail`.
+
+Run with:
+    cd packages/nged_data && uv run python -m benchmarks.bench_fleet_refresh --n-resources 2000
+
+(As a module, from `packages/nged_data`, so that it can import the fake server from `tests`.)
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from nged_data import ckan
+from nged_data.ckan_client import CkanClient
+from nged_data.download_manifest import DownloadManifest
+from nged_data.http_resilience import AdaptiveRateLimiter
+from nged_data.schemas import CkanResource
+from tests.fakes import FakeCkanServer
+
+
+def serial_download(resources: list[CkanResource]) -> None:
+    for resource in resources:
+        ckan.download_resource(resource)
+
+
+def async_download(resources: list[CkanResource], max_concurrency: int) -> None:
+    async def download_all() -> None:
+        async for _ in ckan.download_resources_concurrently(resources, max_concurrency):
+            pass
+
+    asyncio.run(download_all())
+
+
+def conditional_refresh(resources: list[CkanResource], manifest: DownloadManifest) -> None:
+    for resource in resources:
+        downloaded = ckan.download_resource_if_modified(resource.id, str(resource.url), manifest)
+        if downloaded is not None:
+            manifest.put(downloaded[1])
+
+
+def tail_refresh(resources: list[CkanResource], manifest: DownloadManifest) -> None:
+    for resource in resources:
+        # The example CSVs ended months ago, so pretend that we're refreshing just after the
+        # previous fetch. Otherwise `download_resource_tail` (rightly) assumes that the whole of
+        # each rolling-window CSV has changed, and falls back to full downloads.
+        previous = manifest.get_tail_state(resource.id)
+        now = previous.last_timestamp if previous else None
+        _, state = ckan.download_resource_tail(resource.id, str(resource.url), manifest, now=now)
+        manifest.put_tail_state(state)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n-resources", type=int, default=500)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Simulated server latency, in seconds."
+    )
+    parser.add_argument(
+        "--server-max-rps",
+        type=float,
+        default=None,
+        help="Respond 429 to requests above this rate. Default: never throttle.",
+    )
+    parser.add_argument(
+        "--client-rate",
+        type=float,
+        default=None,
+        help="Initial rate of the client's rate limiter. Default: don't rate-limit.",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.client_rate is None:
+        rate_limiter = AdaptiveRateLimiter(rate=1e9, burst=1_000_000_000, max_rate=1e9)
+    else:
+        rate_limiter = AdaptiveRateLimiter(rate=args.client_rate)
+
+    with (
+        FakeCkanServer(
+            n_resources=args.n_resources,
+            latency=args.latency,
+            max_requests_per_second=args.server_max_rps,
+        ) as server,
+        tempfile.TemporaryDirectory() as tmp_dir,
+    ):
+        ckan.set_ckan_client(CkanClient(server.base_url, rate_limiter=rate_limiter))
+        conditional_manifest = DownloadManifest(Path(tmp_dir) / "conditional.sqlite")
+        tail_manifest = DownloadManifest(Path(tmp_dir) / "tail.sqlite")
+        resources: list[CkanResource] = []
+
+        def discover() -> None:
+            resources.extend(ckan.get_csv_resources_for_live_primary_substation_flows())
+
+        # Prime the manifests, so the timed runs below are "second refreshes".
+        modes: list[tuple[str, Callable[[], None]]] = [
+            ("package_search", discover),
+            ("serial download", lambda: serial_download(resources)),
+            ("async download", lambda: async_download(resources, args.max_concurrency)),
+            ("(prime manifests)", lambda: conditional_refresh(resources, conditional_manifest)),
+            ("conditional GET", lambda: conditional_refresh(resources, conditional_manifest)),
+            ("(prime manifests)", lambda: tail_refresh(resources, tail_manifest)),
+            ("tail fetch", lambda: tail_refresh(resources, tail_manifest)),
+        ]
+
+        print(
+            f"{args.n_resources} resources, {args.latency * 1e3:.0f} ms simulated latency,"
+            f" server max rps = {args.server_max_rps}, client rate = {args.client_rate}:"
+        )
+        for name, run in modes:
+            n_requests, n_bytes = server.n_requests, server.n_bytes_sent
+            t0 = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - t0
+            if name.startswith("("):
+                continue
+            n_requests = server.n_requests - n_requests
+            n_bytes = server.n_bytes_sent - n_bytes
+            print(
+                f"  {name:>16}: {elapsed:7.2f} s, {n_requests / elapsed:8.1f} requests/s,"
+                f" {n_bytes / 1e6:8.1f} MB transferred"
+            )
+        print(f"Requests throttled by the server: {server.n_throttled}")
+        ckan.set_ckan_client(None)
+
+
+if __name__ == "__main__":
+    main()
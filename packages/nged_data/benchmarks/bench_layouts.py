@@ -0,0 +1,74 @@
+"""Benchmark parsing each example CSV via its registered layout vs via type inference.
+
+For every example CSV, times:
+
+- "dispatch": reading the header and looking up the layout's pre-compiled read plan.
+- "layout": parsing the whole CSV via its layout (i.e. `process_live_primary_substation_flows`).
+- "inference": parsing the whole CSV with Polars' type inference (the fallback for unknown layouts).
+
+Each CSV is repeated back-to-back `--repeats` times (in memory), so the timings aren't dominated by
+fixed overheads.
+
+Run with:
+    uv run python packages/nged_data/benchmarks/bench_layouts.py --repeats 100
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import polars as pl
+from contracts.data_schemas import SubstationFlows
+from nged_data.process_flows import (
+    _read_header_and_first_row,
+    _read_with_type_inference,
+    get_layout,
+    process_live_primary_substation_flows,
+)
+
+EXAMPLE_DATA_DIR = Path(__file__).parent.parent / "example_csv_data"
+
+
+def process_with_type_inference(csv: bytes) -> pl.DataFrame:
+    """Parse a CSV the way the fallback for unknown layouts does, for comparison."""
+    df = _read_with_type_inference(csv).sort("timestamp")
+    return SubstationFlows.validate(df, allow_missing_columns=True)
+
+
+def best_of(run: Callable[[], object], n: int) -> float:
+    """The fastest of `n` runs, in seconds."""
+    seconds = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - t0)
+    return min(seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for csv_path in sorted(EXAMPLE_DATA_DIR.glob("*.csv")):
+        if csv_path.name == "primary_substation_locations.csv":
+            continue
+        header, rows = csv_path.read_bytes().split(b"\n", maxsplit=1)
+        csv = header + b"\n" + (rows.rstrip(b"\n") + b"\n") * args.repeats
+        layout = get_layout(_read_header_and_first_row(csv)[0])
+        assert layout is not None
+
+        dispatch = best_of(lambda: get_layout(_read_header_and_first_row(csv)[0]), args.runs)
+        with_layout = best_of(lambda: process_live_primary_substation_flows(csv), args.runs)
+        with_inference = best_of(lambda: process_with_type_inference(csv), args.runs)
+        print(
+            f"{csv_path.name:>45} ({layout.name}, {len(csv) / 1e6:5.1f} MB):"
+            f" dispatch {dispatch * 1e6:5.1f} µs, layout {with_layout * 1e3:7.1f} ms,"
+            f" inference {with_inference * 1e3:7.1f} ms ({with_inference / with_layout:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Backfill the historical primary transformer flows, in a pool of processes.
+
+Each worker process streams one historical CSV at a time into the raw content-addressed store, and
+then streams it through the lazy parser into a temporary parquet file, so a worker never holds a
+whole multi-year CSV in memory. The main process merges each parsed CSV into the same
+per-substation parquet files as the live flows (so there is one dataset of substation flows), and
+then checkpoints the resource in the `DownloadManifest`. An interrupted backfill resumes where it
+left off: resources that have already been merged (with the same `last_modified`) are skipped
+without downloading them.
+
+Each merge holds the parquet file's `file_lock`, so the backfill can safely run while the live
+flows of the same substations are being updated. And each merge writes the file's
+`ValidationWatermark`, so the next update of the live flows only parses the rows after it.
+
+The workers share the CKAN client's request rate between them (see `_worker_rate_limiter`), so
+however many workers there are, the backfill doesn't send CKAN more requests than one client would.
+If any resource fails then the backfill stops: the resources not yet started are cancelled, and the
+exception is raised once the workers' current resources have finished.
+"""
+
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import timedelta
+from pathlib import Path, PurePosixPath
+
+import httpx
+import polars as pl
+from contracts.data_schemas import SubstationFlows
+from contracts.incremental_validation import ValidationWatermark
+from obstore.store import LocalStore
+from pydantic import BaseModel
+
+from nged_data import ckan
+from nged_data.ckan_client import CkanClient
+from nged_data.compact_flows import scan_substation_flows, write_substation_flows
+from nged_data.content_store import ContentAddressedStore
+from nged_data.download_manifest import DownloadManifest
+from nged_data.file_lock import file_lock
+from nged_data.http_resilience import AdaptiveRateLimiter
+from nged_data.merge_flows import merge_sorted_flows
+from nged_data.process_flows import scan_live_primary_substation_flows, sink_substation_flows
+from nged_data.schemas import CkanResource
+from nged_data.substation_names.align import simplify_substation_name
+
+log = logging.getLogger(__name__)
+
+
+class BackfillProgress(BaseModel):
+    """A snapshot of a backfill's progress. Throughput excludes the resources that were skipped."""
+
+    n_resources: int
+    n_skipped: int = 0  # Already merged by a previous backfill.
+    n_done: int = 0  # Merged by this backfill.
+    n_rows: int = 0
+    n_bytes: int = 0  # Bytes of CSV downloaded.
+    n_bytes_remaining: int = 0  # The total CKAN `size` of the resources not yet merged.
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.n_rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.n_bytes / 1e6 / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def eta(self) -> timedelta | None:
+        """The estimated time remaining, at the average download rate so far."""
+        if not self.n_bytes:
+            return None
+        return timedelta(seconds=self.n_bytes_remaining * self.elapsed_seconds / self.n_bytes)
+
+    def __str__(self) -> str:
+        n_finished = self.n_skipped + self.n_done
+        return (
+            f"{n_finished:,}/{self.n_resources:,} resources ({self.n_skipped:,} skipped),"
+            f" {self.n_rows:,} rows, {self.rows_per_second:,.0f} rows/s,"
+            f" {self.megabytes_per_second:.1f} MB/s, ETA {self.eta}"
+        )
+
+
+class _ParsedResource(BaseModel):
+    resource_id: str
+    sha256: str
+    n_bytes: int
+    parquet_path: Path  # The parsed (and validated) flows, in a temporary file.
+
+
+def backfill(
+    resources: Sequence[CkanResource],
+    dataset_keys: Mapping[str, str],
+    dataset_dir: Path,
+    raw_dir: Path,
+    manifest: DownloadManifest,
+    max_workers: int | None = None,
+    compact: bool = False,
+    on_progress: Callable[[BackfillProgress], None] | None = None,
+) -> BackfillProgress:
+    """Download, parse and merge `resources` into the per-substation parquet files in `dataset_dir`.
+
+    Rows already in the dataset take precedence over backfilled rows with the same timestamp.
+
+    Args:
+        resources: The historical CSV resources, e.g. from
+            `ckan.get_csv_resources_for_historical_primary_substation_flows`.
+        dataset_keys: Maps each resource ID to the stem of the parquet file that its flows belong
+            in. See `dataset_keys_for_historical_resources`.
+        dataset_dir: The directory of per-substation parquet files.
+        raw_dir: The directory of the content-addressed store of raw CSVs.
+        manifest: Where to checkpoint each merged resource.
+        max_workers: The number of worker processes. Defaults to the number of CPUs.
+        compact: Write the parquet files in the compact encoding (see `nged_data.compact_flows`).
+        on_progress: Called after each resource is merged (or skipped).
+
+    Returns:
+        The final progress.
+    """
+    progress = BackfillProgress(n_resources=len(resources))
+    to_do: list[CkanResource] = []
+    for resource in resources:
+        sha256 = manifest.get_content_hash(resource.id, resource.last_modified.isoformat())
+        if sha256 is not None and manifest.is_processed(resource.id, sha256):
+            progress.n_skipped += 1
+        else:
+            to_do.append(resource)
+    progress.n_bytes_remaining = sum(resource.size for resource in to_do)
+    log.info("Backfilling %d resources (%d already done)", len(to_do), progress.n_skipped)
+    if on_progress is not None:
+        on_progress(progress)
+    if not to_do:
+        return progress
+
+    resources_by_id = {resource.id: resource for resource in to_do}
+    client = ckan.get_ckan_client()
+    n_workers = min(max_workers or os.process_cpu_count() or 1, len(to_do))
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with (
+        tempfile.TemporaryDirectory(prefix="backfill-") as parsed_dir,
+        ProcessPoolExecutor(
+            max_workers=n_workers,
+            # "spawn", because forking a process with running threads (e.g. Polars') can deadlock.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                client.base_url,
+                client.api_key,
+                _worker_rate_limiter(client.rate_limiter, n_workers),
+            ),
+        ) as executor,
+    ):
+        pending: set[Future[_ParsedResource]] = {
+            executor.submit(
+                _download_and_parse, resource.id, str(resource.url), raw_dir, Path(parsed_dir)
+            )
+            for resource in to_do
+        }
+        try:
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    parsed = future.result()
+                    resource = resources_by_id[parsed.resource_id]
+                    n_rows = _merge_into_dataset(
+                        parsed.parquet_path,
+                        dataset_dir / f"{dataset_keys[resource.id]}.parquet",
+                        compact,
+                    )
+                    parsed.parquet_path.unlink()
+                    # Checkpoint only after the flows are safely merged.
+                    last_modified = resource.last_modified.isoformat()
+                    manifest.put_content_hash(resource.id, last_modified, parsed.sha256)
+                    manifest.mark_processed(resource.id, parsed.sha256)
+
+                    progress.n_done += 1
+                    progress.n_rows += n_rows
+                    progress.n_bytes += parsed.n_bytes
+                    progress.n_bytes_remaining -= resource.size
+                    progress.elapsed_seconds = time.perf_counter() - t0
+                    log.info("Backfilled %s. %s", resource.name, progress)
+                    if on_progress is not None:
+                        on_progress(progress)
+        except BaseException:
+            # Don't download and parse the rest of the resources just to throw them away.
+            executor.shutdown(cancel_futures=True)
+            raise
+    return progress
+
+
+def dataset_keys_for_historical_resources(
+    historical: Sequence[CkanResource], live: Sequence[CkanResource]
+) -> dict[str, str]:
+    """Map each historical resource ID to the dataset key (parquet file stem) of its substation.
+
+    The dataset key of a live primary is the stem of its CSV's filename (which is what
+    `live_primary_parquet` uses). Historical resources are matched to live primaries by their
+    simplified substation names. Unmatched historical resources get the stem of their own CSV's
+    filename.
+    """
+    live_keys = dict(
+        pl.DataFrame(
+            {
+                "name": [resource.name for resource in live],
+                "key": [PurePosixPath(str(resource.url)).stem for resource in live],
+            },
+            schema={"name": pl.String, "key": pl.String},
+        )
+        .select(simplify_substation_name("name"), "key")
+        .unique(subset="name", keep="first", maintain_order=True)
+        .iter_rows()
+    )
+    simple_names = (
+        pl.Series("name", [resource.name for resource in historical], dtype=pl.String)
+        .to_frame()
+        .select(simplify_substation_name("name"))["name"]
+    )
+    return {
+        resource.id: live_keys.get(simple_name, PurePosixPath(str(resource.url)).stem)
+        for resource, simple_name in zip(historical, simple_names, strict=True)
+    }
+
+
+def _worker_rate_limiter(rate_limiter: AdaptiveRateLimiter, n_workers: int) -> dict[str, float]:
+    """The settings of each worker's `AdaptiveRateLimiter`: a 1/`n_workers` share of `rate_limiter`.
+
+    Returned as settings, because a rate limiter (with its lock) can't be sent to another process.
+    """
+    return {
+        "rate": rate_limiter.rate / n_workers,
+        "burst": max(rate_limiter.burst // n_workers, 1),
+        "min_rate": rate_limiter.min_rate / n_workers,
+        "max_rate": rate_limiter.max_rate / n_workers,
+        "rate_increase_per_success": rate_limiter.rate_increase_per_success / n_workers,
+    }
+
+
+def _init_worker(base_url: str, api_key: str | None, rate_limiter: dict[str, float]) -> None:
+    ckan.set_ckan_client(
+        CkanClient(base_url, api_key=api_key, rate_limiter=AdaptiveRateLimiter(**rate_limiter))
+    )
+
+
+def _download_and_parse(
+    resource_id: str, url: str, raw_dir: Path, parsed_dir: Path
+) -> _ParsedResource:
+    """Stream the CSV into the raw store, and then stream it through the parser into parquet."""
+    raw_store = ContentAddressedStore(LocalStore(prefix=raw_dir, mkdir=True), suffix=".csv")
+    # Streamed to a temporary path, because the hash (and so the final path) isn't known yet.
+    tmp_path = f"tmp/{resource_id}.{os.getpid()}.csv"
+    try:
+        entry = ckan.stream_resource_to_store(resource_id, url, raw_store.store, tmp_path)
+    except httpx.HTTPStatusError as e:
+        # `HTTPStatusError`s can't be unpickled, so sending one back to the main process would
+        # break the process pool, and hide the actual error.
+        raise RuntimeError(str(e)) from None
+    raw_store.move_into_place(tmp_path, entry.sha256)
+
+    parquet_path = parsed_dir / f"{resource_id}.parquet"
+    csv_path = raw_dir / raw_store.path(entry.sha256)
+    sink_substation_flows(scan_live_primary_substation_flows(csv_path), parquet_path)
+    return _ParsedResource(
+        resource_id=resource_id,
+        sha256=entry.sha256,
+        n_bytes=entry.content_length,
+        parquet_path=parquet_path,
+    )
+
+
+def _merge_into_dataset(parquet_path: Path, path: Path, compact: bool) -> int:
+    """Merge the backfilled flows into the dataset's parquet file. Returns the number of rows."""
+    backfilled = pl.read_parquet(parquet_path)
+    # Sort, and de-duplicate the timestamps, in case the CSV wasn't quite in order.
+    flows = merge_sorted_flows(backfilled.clear(), backfilled)
+    with file_lock(path):
+        if path.exists():
+            existing = scan_substation_flows(path).collect()
+            # The existing rows are merged in as the "new" rows, so that they win.
+            flows = merge_sorted_flows(flows, existing)
+        # Every row has been validated, either by the parser or before it was written to `path`,
+        # and `merge_sorted_flows` leaves the timestamps strictly increasing.
+        watermark = (
+            ValidationWatermark.of_validated_table(SubstationFlows, flows) if flows.height else None
+        )
+        write_substation_flows(
+            flows,
+            path,
+            compact=compact,
+            metadata=watermark.to_parquet_metadata() if watermark else None,
+        )
+    return backfilled.height
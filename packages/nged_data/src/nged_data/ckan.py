@@ -1,17 +1,30 @@
 """Generic CKAN client for interacting with NGED's Connected Data portal."""
 
+import asyncio
+import hashlib
 import logging
 import os
-from datetime import datetime, timedelta
+import re
+from collections.abc import AsyncIterator, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any, Final
 
 import httpx
+import obstore
 import patito as pt
 import polars as pl
-from ckanapi import RemoteCKAN
+from contracts.atomic_write import atomic_write
 from contracts.data_schemas import SubstationLocations
 from dotenv import load_dotenv
+from obstore.store import ObjectStore
+from pydantic import BaseModel
 
+from nged_data.ckan_client import CkanClient
+from nged_data.content_store import ContentAddressedStore
+from nged_data.download_manifest import DownloadManifest, ManifestEntry, TailState
+from nged_data.resource_catalogue import ResourceCatalogue
 from nged_data.schemas import CkanResource, PackageSearchResult
 
 from .utils import change_dataframe_column_names_to_snake_case, find_one_match
@@ -21,19 +34,79 @@ log = logging.getLogger(__name__)
 # The name of the environment variable that holds the NGED CKAN TOKEN.
 NGED_CKAN_TOKEN_ENV_KEY: Final[str] = "NGED_CKAN_TOKEN"
 BASE_CKAN_URL: Final[str] = "https://connecteddata.nationalgrid.co.uk"
+DOWNLOAD_MANIFEST_FILENAME: Final[str] = "download_manifest.sqlite"
+RESOURCE_CATALOGUE_FILENAME: Final[str] = "resource_catalogue.parquet"
 
+# `package_search` fetches pages of this many packages concurrently. (CKAN's default is just 10.)
+PACKAGE_SEARCH_PAGE_SIZE: Final[int] = 100
+PACKAGE_SEARCH_MAX_WORKERS: Final[int] = 8
+# How long `package_search` results are cached for.
+PACKAGE_SEARCH_TTL: Final[timedelta] = timedelta(hours=1)
+# Incremental refreshes of the `ResourceCatalogue` can't see deleted resources, so do a full
+# refresh this often.
+CATALOGUE_FULL_REFRESH_INTERVAL: Final[timedelta] = timedelta(days=1)
 
-def get_primary_substation_locations() -> pt.DataFrame[SubstationLocations]:
-    """Note that 'Park Lane' appears twice (with different substation numbers)."""
-    api_key = get_nged_ckan_token_from_env()
-    with RemoteCKAN(BASE_CKAN_URL, apikey=api_key) as nged_ckan:
-        ckan_response = nged_ckan.action.resource_search(query="name:Primary Substation Location")
+# `stream_resource_to_store` reads and uploads in chunks of this size. Cloud object stores need
+# multipart upload parts of at least 5 MiB.
+STREAM_CHUNK_SIZE: Final[int] = 5 * 1024 * 1024
+
+# Tail fetches check that the last few rows of the previous fetch re-appear, byte-for-byte.
+N_TAIL_OVERLAP_ROWS: Final[int] = 3
+# The live primary CSVs have one row every 5 minutes.
+LIVE_CSV_ROW_PERIOD: Final[timedelta] = timedelta(minutes=5)
+_ISO_TIMESTAMP_PATTERN: Final[re.Pattern[bytes]] = re.compile(
+    rb"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2})?(?:Z|[+-]\d{2}:\d{2})?"
+)
+
+# The client shared by every function in this module. Created lazily by `get_ckan_client`.
+_ckan_client: CkanClient | None = None
+
+
+def get_ckan_client() -> CkanClient:
+    """Get the module-level `CkanClient`, creating it (and reading the token) on first use.
+
+    Re-using one client means every request re-uses the same pool of keep-alive connections,
+    instead of paying for a fresh TCP + TLS handshake per request.
+    """
+    global _ckan_client
+    if _ckan_client is None:
+        _ckan_client = CkanClient(BASE_CKAN_URL, api_key=get_nged_ckan_token_from_env())
+    return _ckan_client
+
+
+def set_ckan_client(client: CkanClient | None) -> None:
+    """Replace the module-level `CkanClient`, e.g. to change the pool limits or the base URL.
+
+    Pass `None` to go back to the default client (which is created on next use).
+    """
+    global _ckan_client
+    if _ckan_client is not None and _ckan_client is not client:
+        _ckan_client.close()
+    _ckan_client = client
+
+
+def get_primary_substation_locations(
+    cache_dir: Path | None = None,
+) -> pt.DataFrame[SubstationLocations]:
+    """Note that 'Park Lane' appears twice (with different substation numbers).
+
+    Args:
+        cache_dir: If set, keep a copy of the locations CSV (and a `DownloadManifest`) in this
+            directory, and only re-download the CSV if it has changed on the server.
+    """
+    ckan_response = get_ckan_client().action(
+        "resource_search", query="name:Primary Substation Location"
+    )
     ckan_results = ckan_response["results"]
     ckan_result = find_one_match(lambda result: result["format"].upper() == "CSV", ckan_results)
     url = ckan_result["url"]
-    http_response = httpx_get_with_auth(url)
-    http_response.raise_for_status()
-    locations = pl.read_csv(http_response.content)
+    if cache_dir is None:
+        http_response = httpx_get_with_auth(url)
+        http_response.raise_for_status()
+        csv_bytes = http_response.content
+    else:
+        csv_bytes = _download_with_local_cache(ckan_result["id"], url, cache_dir)
+    locations = pl.read_csv(csv_bytes)
     locations = change_dataframe_column_names_to_snake_case(locations)
     locations = locations.filter(
         pl.col("substation_type").str.to_lowercase().str.contains("primary")
@@ -48,24 +121,307 @@ def download_resource(resource: CkanResource) -> bytes:
     return http_response.content
 
 
-def get_csv_resources_for_historical_primary_substation_flows() -> list[CkanResource]:
+def stream_resource_to_store(
+    resource_id: str,
+    url: str,
+    store: ObjectStore,
+    path: str,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> ManifestEntry:
+    """Stream a resource straight into an `obstore` store, hashing it on the way through.
+
+    Unlike `download_resource`, the content is never held in memory all at once: it's written to
+    `store` chunk-by-chunk (as a multipart upload), so peak memory stays flat however large the
+    file is. Useful for the multi-year historical CSVs.
+
+    Returns:
+        A `ManifestEntry` describing the stored object, including its SHA-256.
+    """
+    hasher = hashlib.sha256()
+    content_length = 0
+    with get_ckan_client().http.stream("GET", url) as http_response:
+        http_response.raise_for_status()
+
+        def hashed_chunks() -> Iterator[bytes]:
+            nonlocal content_length
+            for chunk in http_response.iter_bytes(chunk_size):
+                hasher.update(chunk)
+                content_length += len(chunk)
+                yield chunk
+
+        obstore.put(store, path, hashed_chunks(), use_multipart=True, chunk_size=chunk_size)
+
+    log.debug("Streamed %d bytes from %s to %s", content_length, url, path)
+    return ManifestEntry(
+        resource_id=resource_id,
+        etag=http_response.headers.get("ETag"),
+        last_modified=http_response.headers.get("Last-Modified"),
+        content_length=content_length,
+        sha256=hasher.hexdigest(),
+        fetched_at=datetime.now(UTC),
+    )
+
+
+def download_resource_if_modified(
+    resource_id: str, url: str, manifest: DownloadManifest
+) -> tuple[bytes, ManifestEntry] | None:
+    """Download a resource only if it has changed since it was last recorded in `manifest`.
+
+    Returns None if the resource is unchanged: Either the server responded `304 Not Modified`, or
+    the content hash matches the hash in the manifest. Otherwise returns the content and a new
+    `ManifestEntry`. The caller should `manifest.put(entry)` once the content has been safely
+    saved, so a crash before then won't cause the new content to be skipped next time.
+    """
+    previous = manifest.get(resource_id)
+    http_response = _get_if_modified(url, previous)
+    if http_response is None:
+        return None
+    entry = ManifestEntry.from_response(resource_id, http_response)
+    if previous is not None and previous.sha256 == entry.sha256:
+        # The server ignored our conditional headers, but the content hasn't changed. Record the new
+        # ETag and Last-Modified so we have a better chance of getting a 304 next time.
+        manifest.put(entry)
+        return None
+    return http_response.content, entry
+
+
+def download_unprocessed_resource(
+    resource_id: str, url: str, manifest: DownloadManifest, store: ContentAddressedStore
+) -> str | None:
+    """Download a resource into `store`, and return its content hash if it still needs processing.
+
+    Returns None if the resource's latest content has already been processed (i.e. passed to
+    `manifest.mark_processed`). Otherwise returns the hash of its latest content in `store`: Either
+    the content just downloaded, or (if the resource hasn't changed since the last download) the
+    content that was downloaded last time but whose processing failed or never ran. So, unlike
+    `download_resource_if_modified` alone, a failure downstream doesn't lose the content for good.
+    """
+    download = download_resource_if_modified(resource_id, url, manifest)
+    if download is None:
+        previous = manifest.get(resource_id)
+        if previous is None or not store.exists(previous.sha256):
+            return None
+        sha256 = previous.sha256
+    else:
+        content, entry = download
+        sha256 = store.put(content)
+        manifest.put(entry)
+    return None if manifest.is_processed(resource_id, sha256) else sha256
+
+
+def _get_if_modified(url: str, previous: ManifestEntry | None) -> httpx.Response | None:
+    """GET `url`, returning None if the server says it hasn't changed since `previous`."""
+    headers = previous.conditional_headers() if previous else {}
+    http_response = httpx_get_with_auth(url, headers=headers)
+    if http_response.status_code == httpx.codes.NOT_MODIFIED:
+        log.debug("%s has not been modified since it was last downloaded", url)
+        return None
+    http_response.raise_for_status()
+    return http_response
+
+
+def _download_with_local_cache(resource_id: str, url: str, cache_dir: Path) -> bytes:
+    manifest = DownloadManifest(cache_dir / DOWNLOAD_MANIFEST_FILENAME)
+    cached_path = cache_dir / resource_id
+    previous = manifest.get(resource_id) if cached_path.exists() else None
+    http_response = _get_if_modified(url, previous)
+    if http_response is None:
+        return cached_path.read_bytes()
+    cached_path.write_bytes(http_response.content)
+    manifest.put(ManifestEntry.from_response(resource_id, http_response))
+    return http_response.content
+
+
+class TailFetch(BaseModel):
+    header: bytes  # The CSV header line.
+    new_rows: bytes  # The CSV rows that were appended since the last fetch (or all rows).
+    is_full_download: bool
+
+    @property
+    def csv(self) -> bytes:
+        """A CSV of just the new rows, ready for `process_live_primary_substation_flows`."""
+        return self.header + self.new_rows
+
+
+def download_resource_tail(
+    resource_id: str, url: str, manifest: DownloadManifest, now: datetime | None = None
+) -> tuple[TailFetch, TailState]:
+    """Download just the rows appended to a CSV since it was last fetched.
+
+    Uses an HTTP Range request starting just before the end of the previous fetch, and checks that
+    the last few rows of the previous fetch re-appear byte-for-byte in the response. Live CSVs are
+    often rolling windows (old rows are dropped from the start of the file as new rows are
+    appended), so the range starts early enough to allow for the rows we expect to have been
+    dropped since the last fetch. If the overlap rows can't be found (e.g. the data was revised),
+    or the server doesn't support Range requests (or doesn't say the resource's size in the
+    `Content-Range` header), then this falls back to a full download.
+
+    Like `download_resource_if_modified`, the caller should `manifest.put_tail_state(state)` once
+    the new rows have been safely processed.
+    """
+    previous = manifest.get_tail_state(resource_id)
+    if previous is not None and previous.overlap:
+        range_start = _tail_range_start(previous, now or datetime.now(UTC))
+        if range_start > len(previous.header):
+            http_response = httpx_get_with_auth(url, headers={"Range": f"bytes={range_start}-"})
+            if http_response.status_code == httpx.codes.PARTIAL_CONTENT:
+                tail = _parse_tail(resource_id, http_response, previous)
+                if tail is not None:
+                    return tail
+                log.info("Couldn't use the tail of %s. Falling back to full download.", url)
+            elif http_response.status_code == httpx.codes.OK:
+                # The server ignored the Range header and sent the whole file.
+                return _full_fetch(resource_id, http_response.content)
+            elif http_response.status_code != httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE:
+                http_response.raise_for_status()
+
+    http_response = httpx_get_with_auth(url)
+    http_response.raise_for_status()
+    return _full_fetch(resource_id, http_response.content)
+
+
+def _tail_range_start(previous: TailState, now: datetime) -> int:
+    bytes_per_row = len(previous.overlap) / max(previous.overlap.count(b"\n"), 1)
+    if previous.last_timestamp is None:
+        expected_new_rows = 0.0
+    else:
+        expected_new_rows = max((now - previous.last_timestamp) / LIVE_CSV_ROW_PERIOD, 0)
+    # Allow for the rows that a rolling window will have dropped from the start of the file. These
+    # move the overlap rows towards the start of the file.
+    slack = int(bytes_per_row * (expected_new_rows + 1))
+    # The -1 is so the response includes the newline before the overlap rows.
+    return previous.size - len(previous.overlap) - 1 - slack
+
+
+def _content_range_size(http_response: httpx.Response) -> int | None:
+    """The complete size of the resource from the `Content-Range` header of a 206 response.
+
+    None if the header is missing, or doesn't say the size (e.g. "bytes 1000-1999/*").
+    """
+    # e.g. "bytes 1000-1999/2000"
+    size = http_response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(size) if size.isdigit() else None
+
+
+def _parse_tail(
+    resource_id: str, http_response: httpx.Response, previous: TailState
+) -> tuple[TailFetch, TailState] | None:
+    size = _content_range_size(http_response)
+    if size is None:
+        log.info("The response from %s doesn't say the resource's size.", http_response.url)
+        return None
+    chunk = http_response.content
+    overlap_start = chunk.find(b"\n" + previous.overlap)
+    if overlap_start == -1:
+        log.info("The overlap rows of %s have changed.", http_response.url)
+        return None
+    new_rows = chunk[overlap_start + 1 + len(previous.overlap) :]
+    if not previous.overlap.endswith(b"\n"):
+        # The previous fetch didn't end with a newline, so check its last row hasn't grown.
+        if new_rows and not new_rows.startswith((b"\n", b"\r\n")):
+            return None
+        new_rows = new_rows.lstrip(b"\r\n")
+    state = _make_tail_state(resource_id, previous.header, chunk[overlap_start + 1 :], size)
+    return TailFetch(header=previous.header, new_rows=new_rows, is_full_download=False), state
+
+
+def _full_fetch(resource_id: str, content: bytes) -> tuple[TailFetch, TailState]:
+    header_end = content.find(b"\n") + 1
+    header, rows = content[:header_end], content[header_end:]
+    state = _make_tail_state(resource_id, header, rows, size=len(content))
+    return TailFetch(header=header, new_rows=rows, is_full_download=True), state
+
+
+def _make_tail_state(resource_id: str, header: bytes, rows: bytes, size: int) -> TailState:
+    last_rows = rows.splitlines(keepends=True)[-N_TAIL_OVERLAP_ROWS:]
+    last_timestamp = None
+    if last_rows and (match := _ISO_TIMESTAMP_PATTERN.search(last_rows[-1])):
+        last_timestamp = datetime.fromisoformat(match.group().decode())
+        if last_timestamp.tzinfo is None:
+            last_timestamp = last_timestamp.replace(tzinfo=UTC)
+    return TailState(
+        resource_id=resource_id,
+        size=size,
+        header=header,
+        overlap=b"".join(last_rows),
+        last_timestamp=last_timestamp,
+    )
+
+
+async def download_resources_concurrently(
+    resources: Iterable[CkanResource], max_concurrency: int = 16
+) -> AsyncIterator[tuple[CkanResource, bytes]]:
+    """Download many resources concurrently, yielding `(resource, content)` as each completes.
+
+    Downloads are made over one `httpx.AsyncClient`, with at most `max_concurrency` requests in
+    flight at once. If any download fails then the exception is raised and all the outstanding
+    downloads are cancelled.
+
+    Example:
+        ```python
+        async for resource, content in download_resources_concurrently(resources):
+            ...
+        ```
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limits = httpx.Limits(
+        max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+    )
+    async with get_ckan_client().async_http(limits=limits) as http:
+
+        async def download(resource: CkanResource) -> tuple[CkanResource, bytes]:
+            async with semaphore:
+                http_response = await http.get(str(resource.url))
+            http_response.raise_for_status()
+            return resource, http_response.content
+
+        tasks = [asyncio.create_task(download(resource)) for resource in resources]
+        log.debug("Downloading %d resources, %d at a time", len(tasks), max_concurrency)
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                yield await next_completed
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_csv_resources_for_historical_primary_substation_flows(
+    cache_dir: Path | None = None, catalogue: ResourceCatalogue | None = None
+) -> list[CkanResource]:
+    # Every resource, however old: the backfill needs the whole archive.
     return get_csv_resources_for_package(
-        'title:"primary transformer flows"', max_age=timedelta(days=2)
+        'title:"primary transformer flows"', max_age=None, cache_dir=cache_dir, catalogue=catalogue
     )
 
 
-def get_csv_resources_for_live_primary_substation_flows() -> list[CkanResource]:
-    return get_csv_resources_for_package('title:"live primary"', max_age=timedelta(days=2))
+def get_csv_resources_for_live_primary_substation_flows(
+    cache_dir: Path | None = None, catalogue: ResourceCatalogue | None = None
+) -> list[CkanResource]:
+    return get_csv_resources_for_package(
+        'title:"live primary"', max_age=timedelta(days=2), cache_dir=cache_dir, catalogue=catalogue
+    )
 
 
 def get_csv_resources_for_package(
-    query: str, max_age: timedelta | None = None
+    query: str,
+    max_age: timedelta | None = None,
+    cache_dir: Path | None = None,
+    catalogue: ResourceCatalogue | None = None,
 ) -> list[CkanResource]:
-    package_search_result = package_search(query)
-    resources = []
-    for result in package_search_result.results:
-        resources.extend(result.resources)
-    resources = [CkanResource.model_validate(resource) for resource in resources]
+    """Get the CSV resources of all the packages that match `query`.
+
+    Args:
+        query: The CKAN `package_search` query.
+        max_age: If set, ignore resources whose `last_modified` is older than this.
+        cache_dir: If set (and `catalogue` isn't), cache the `package_search` results on disk.
+        catalogue: If set, read the resources from this `ResourceCatalogue`, refreshing it first
+            if it's older than `PACKAGE_SEARCH_TTL`.
+    """
+    if catalogue is None:
+        resources = _resources_in_packages(package_search(query, cache_dir=cache_dir))
+    else:
+        resources = refresh_resource_catalogue(catalogue, query)
     resources = [r for r in resources if r.format == "CSV" and r.size > 100]
     resources = remove_duplicate_names(resources)
 
@@ -77,21 +433,132 @@ def get_csv_resources_for_package(
     return resources
 
 
-def package_search(query: str) -> PackageSearchResult:
-    api_key = get_nged_ckan_token_from_env()
-    with RemoteCKAN(BASE_CKAN_URL, apikey=api_key) as nged_ckan:
-        result: dict[str, Any] = nged_ckan.action.package_search(q=query)
-    result_validated = PackageSearchResult.model_validate(result)
+def refresh_resource_catalogue(
+    catalogue: ResourceCatalogue,
+    query: str,
+    ttl: timedelta = PACKAGE_SEARCH_TTL,
+    full_refresh_interval: timedelta = CATALOGUE_FULL_REFRESH_INTERVAL,
+) -> list[CkanResource]:
+    """Bring `catalogue` up to date for `query` (if needed), and return the resources for `query`.
+
+    If the catalogue was refreshed less than `ttl` ago then CKAN isn't contacted at all. Otherwise,
+    only packages modified since the newest `metadata_modified` in the catalogue are fetched, except
+    every `full_refresh_interval` when all the packages are fetched (to find deleted resources).
+    """
+    now = datetime.now(UTC)
+    state = catalogue.query_state(query)
+    if state is not None and now - state.refreshed_at < ttl:
+        return catalogue.resources(query)
+
+    watermark = catalogue.watermark(query)
+    is_full_refresh = (
+        state is None
+        or watermark is None
+        or now - state.fully_refreshed_at >= full_refresh_interval
+    )
+    if is_full_refresh:
+        fq = None
+    else:
+        # CKAN's `metadata_modified` is in UTC. The range is inclusive, and precise to the second.
+        fq = f"metadata_modified:[{watermark:%Y-%m-%dT%H:%M:%S}Z TO *]"
+    resources = _resources_in_packages(_package_search_all_pages(query, fq=fq))
+    log.info(
+        "%s refresh of resource catalogue for '%s': %d resources fetched.",
+        "Full" if is_full_refresh else "Incremental",
+        query,
+        len(resources),
+    )
+    catalogue.update(query, resources, is_full_refresh=is_full_refresh, now=now)
+    return catalogue.resources(query)
+
+
+def _resources_in_packages(package_search_result: PackageSearchResult) -> list[CkanResource]:
+    resources = []
+    for result in package_search_result.results:
+        resources.extend(result.resources)
+    return [CkanResource.model_validate(resource) for resource in resources]
+
+
+class _CachedPackageSearch(BaseModel):
+    query: str
+    fetched_at: datetime
+    result: PackageSearchResult
+
+
+_package_search_cache: dict[str, _CachedPackageSearch] = {}
+
+
+def package_search(
+    query: str, ttl: timedelta = PACKAGE_SEARCH_TTL, cache_dir: Path | None = None
+) -> PackageSearchResult:
+    """Search CKAN for packages matching `query`, fetching all pages of results.
+
+    Results are cached in memory and, if `cache_dir` is set, on disk (so the cache is shared across
+    processes and restarts). Cached results younger than `ttl` are returned without touching the
+    network. Set `ttl=timedelta(0)` to force a fresh search.
+    """
+    now = datetime.now(UTC)
+    cache_path = None
+    if cache_dir is not None:
+        query_hash = hashlib.sha256(query.encode()).hexdigest()[:16]
+        cache_path = cache_dir / f"package_search_{query_hash}.json"
+
+    cached = _package_search_cache.get(query)
+    if (cached is None or now - cached.fetched_at >= ttl) and cache_path and cache_path.exists():
+        cached = _CachedPackageSearch.model_validate_json(cache_path.read_bytes())
+    if cached is not None and cached.query == query and now - cached.fetched_at < ttl:
+        log.debug("Using cached results for CKAN 'package_search?q=%s'", query)
+        _package_search_cache[query] = cached
+        return cached.result
+
+    result = _package_search_all_pages(query)
+    cached = _CachedPackageSearch(query=query, fetched_at=now, result=result)
+    _package_search_cache[query] = cached
+    if cache_path is not None:
+        with atomic_write(cache_path) as tmp_path:
+            tmp_path.write_text(cached.model_dump_json())
+    return result
+
+
+def _package_search_all_pages(query: str, fq: str | None = None) -> PackageSearchResult:
+    client = get_ckan_client()
+    filter_params = {} if fq is None else {"fq": fq}
+
+    def get_page(start: int) -> dict[str, Any]:
+        # Sort by a unique key, so pages don't overlap or skip packages.
+        return client.action(
+            "package_search",
+            q=query,
+            rows=PACKAGE_SEARCH_PAGE_SIZE,
+            start=start,
+            sort="id asc",
+            **filter_params,
+        )
+
+    first_page = get_page(start=0)
+    starts = range(PACKAGE_SEARCH_PAGE_SIZE, first_page["count"], PACKAGE_SEARCH_PAGE_SIZE)
+    with ThreadPoolExecutor(max_workers=PACKAGE_SEARCH_MAX_WORKERS) as executor:
+        pages = [first_page, *executor.map(get_page, starts)]
+
+    results = {}
+    for page in pages:
+        for package in page["results"]:
+            results.setdefault(package["id"], package)
+    result_validated = PackageSearchResult.model_validate(
+        {**first_page, "results": list(results.values())}
+    )
     log.debug(
-        "%d results found from CKAN 'package_search?q=%s'", len(result_validated.results), query
+        "%d results found from CKAN 'package_search?q=%s' (%d pages)",
+        len(result_validated.results),
+        query,
+        len(pages),
     )
     return result_validated
 
 
 def httpx_get_with_auth(url: str, **kwargs) -> httpx.Response:
-    api_key = get_nged_ckan_token_from_env()
-    auth_headers = {"Authorization": api_key}
-    return httpx.get(url=url, headers=auth_headers, timeout=30, **kwargs)
+    """GET `url` using the shared, pooled `CkanClient` (which holds the auth headers)."""
+    return get_ckan_client().get(url, **kwargs)
 
 
 def get_nged_ckan_token_from_env() -> str:
@@ -0,0 +1,152 @@
+"""A pooled, keep-alive HTTP client for CKAN's action API and resource downloads."""
+
+import logging
+from functools import cached_property
+from typing import Any, Final, Self
+
+import httpx
+
+from nged_data.http_resilience import (
+    AdaptiveRateLimiter,
+    AsyncResilientTransport,
+    CircuitBreaker,
+    ResilientTransport,
+    RetryPolicy,
+)
+
+log = logging.getLogger(__name__)
+
+# NGED's portal serves ~1,000 live primary CSVs from a single host, so it's the number of
+# *keep-alive* connections that matters most: each one saves a TCP + TLS handshake per request.
+DEFAULT_LIMITS: Final[httpx.Limits] = httpx.Limits(
+    max_connections=32, max_keepalive_connections=32, keepalive_expiry=60
+)
+DEFAULT_TIMEOUT: Final[httpx.Timeout] = httpx.Timeout(30)
+
+
+class CkanClient:
+    """Share one pooled `httpx.Client` (and the auth headers) across all calls to a CKAN portal.
+
+    The underlying `httpx.Client` is created lazily, on first use, so constructing a `CkanClient`
+    is cheap and never touches the network.
+
+    Every request (from `http` and from every `async_http` client) goes through the same
+    `AdaptiveRateLimiter`, `RetryPolicy` and `CircuitBreaker`, so concurrent downloads back off
+    together when the portal throttles us or starts failing.
+
+    Example:
+        ```python
+        with CkanClient("https://connecteddata.nationalgrid.co.uk", api_key=token) as client:
+            result = client.action("package_search", q='title:"live primary"')
+            csv_bytes = client.get(result["results"][0]["resources"][0]["url"]).content
+        ```
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None = None,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        http2: bool = True,
+        transport: httpx.BaseTransport | None = None,
+        async_transport: httpx.AsyncBaseTransport | None = None,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """Initialise the client.
+
+        Args:
+            base_url: The root URL of the CKAN portal.
+            api_key: The CKAN API token. Sent as the "Authorization" header on every request.
+            limits: Connection pool limits for the underlying `httpx.Client`.
+            timeout: Timeouts for the underlying `httpx.Client`.
+            http2: Negotiate HTTP/2 (via ALPN) if the server supports it. HTTP/2 multiplexes many
+                requests over one TLS connection.
+            transport: Optional custom transport. Mostly useful for testing with
+                `httpx.MockTransport`.
+            async_transport: Optional custom transport for the clients returned by `async_http`.
+            rate_limiter: Defaults to `AdaptiveRateLimiter()`.
+            retry_policy: Defaults to `RetryPolicy()`.
+            circuit_breaker: Defaults to `CircuitBreaker()`.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.limits = limits
+        self.timeout = timeout
+        self.http2 = http2
+        self.transport = transport
+        self.async_transport = async_transport
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+    @cached_property
+    def auth_headers(self) -> dict[str, str]:
+        return {"Authorization": self.api_key} if self.api_key else {}
+
+    @cached_property
+    def http(self) -> httpx.Client:
+        """The pooled `httpx.Client`. Created on first access."""
+        log.debug("Creating pooled httpx.Client for %s (http2=%s)", self.base_url, self.http2)
+        transport = self.transport or httpx.HTTPTransport(http2=self.http2, limits=self.limits)
+        return httpx.Client(
+            headers=self.auth_headers,
+            timeout=self.timeout,
+            transport=ResilientTransport(
+                transport, self.rate_limiter, self.circuit_breaker, self.retry_policy
+            ),
+            follow_redirects=True,
+        )
+
+    def async_http(self, limits: httpx.Limits | None = None) -> httpx.AsyncClient:
+        """Create a new `httpx.AsyncClient` with the same settings as `http`.
+
+        Unlike `http`, this isn't cached: an `AsyncClient` is bound to the event loop it is used
+        in, so use the returned client as an `async with` context manager.
+
+        Args:
+            limits: Connection pool limits. Defaults to `self.limits`.
+        """
+        transport = self.async_transport or httpx.AsyncHTTPTransport(
+            http2=self.http2, limits=limits or self.limits
+        )
+        return httpx.AsyncClient(
+            headers=self.auth_headers,
+            timeout=self.timeout,
+            transport=AsyncResilientTransport(
+                transport, self.rate_limiter, self.circuit_breaker, self.retry_policy
+            ),
+            follow_redirects=True,
+        )
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET `url` over the pooled connection. Does not raise on HTTP error statuses."""
+        return self.http.get(url, **kwargs)
+
+    def action(self, action: str, **params: Any) -> Any:
+        """Call a CKAN action API endpoint (e.g. "package_search") and return its `result`.
+
+        Raises:
+            httpx.HTTPStatusError: If the server responds with an HTTP error status.
+            RuntimeError: If CKAN reports that the action was unsuccessful.
+        """
+        response = self.get(f"{self.base_url}/api/3/action/{action}", params=params)
+        response.raise_for_status()
+        body: dict[str, Any] = response.json()
+        if not body.get("success", False):
+            raise RuntimeError(f"CKAN action '{action}' failed: {body.get('error')}")
+        return body["result"]
+
+    def close(self) -> None:
+        """Close the pooled connections (if any were opened)."""
+        if "http" in self.__dict__:
+            self.http.close()
+            del self.__dict__["http"]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,130 @@
+"""Read and write `SubstationFlows` parquet files, optionally in a compact encoding.
+
+The compact encoding stores:
+
+- each timestamp as an `Int32` count of 5-minute periods since the Unix epoch. So the timestamps
+  must lie on the regular 5-minute grid.
+- each flow as an `Int32` in kW, kVA or kVAr. NGED's CSVs give flows to 3 decimal places (i.e. to
+  the nearest kW), so this is lossless for NGED's data. (`Int16` would be even smaller, but can't
+  represent the ±1,000 MW range allowed by `SubstationFlows`.)
+
+Every column is written with parquet's `DELTA_BINARY_PACKED` encoding (and then zstd), which
+stores the (mostly tiny) differences between consecutive values in a few bits each. The regular
+timestamps cost almost nothing. The encoding is recorded in the parquet file's key-value metadata,
+so `scan_substation_flows` reads either encoding back into the `SubstationFlows` dtypes.
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from datetime import timedelta
+from pathlib import Path
+from typing import Final
+
+import polars as pl
+from contracts.data_schemas import SubstationFlows
+from contracts.parquet import parquet_settings, write_arrow, write_parquet
+
+COMPACT_FLOWS_METADATA_KEY: Final[str] = "nged_data.compact_flows"
+
+_PERIOD: Final[timedelta] = timedelta(minutes=5)
+_PERIOD_COLUMN: Final[str] = "five_minute_period"
+_SCALE: Final[int] = 1_000  # e.g. kW per MW.
+_SCALED_COLUMNS: Final[dict[str, str]] = {"MW": "kW", "MVA": "kVA", "MVAr": "kVAr"}
+
+
+def write_substation_flows(
+    df: pl.DataFrame,
+    path: str | Path,
+    compact: bool = False,
+    metadata: Mapping[str, str] | None = None,
+) -> None:
+    """Write `SubstationFlows` to a parquet file.
+
+    Args:
+        df: The (validated) `SubstationFlows`, sorted by timestamp.
+        path: The parquet file to write.
+        compact: If True, use the compact encoding described in this module's docstring. Flows are
+            rounded to the nearest kW (or kVA or kVAr).
+        metadata: Extra key-value metadata for the parquet file, e.g. a
+            `contracts.incremental_validation.ValidationWatermark`.
+
+    Raises:
+        ValueError: If `df` isn't sorted by timestamp, or `compact` is True and any timestamp is
+            not on the 5-minute grid.
+    """
+    if not compact:
+        write_parquet(SubstationFlows, df, path, metadata=metadata)
+        return
+    # Unsorted timestamps would break the delta encoding's savings, as well as the sort order.
+    if not df["timestamp"].is_sorted():
+        raise ValueError("The rows of SubstationFlows must be sorted by ('timestamp',).")
+    metadata = dict(metadata or {})
+    encoded = encode_compact(df)
+    encoding = {
+        "period_seconds": int(_PERIOD.total_seconds()),
+        "scale": _SCALE,
+        "columns": encoded.columns,
+    }
+    metadata[COMPACT_FLOWS_METADATA_KEY] = json.dumps(encoding)
+    # The periods are sorted exactly like the timestamps they encode.
+    settings = parquet_settings(SubstationFlows).model_copy(update={"sort_by": (_PERIOD_COLUMN,)})
+    write_arrow(
+        encoded.to_arrow(),
+        path,
+        settings,
+        metadata=metadata,
+        use_dictionary=False,
+        column_encoding=dict.fromkeys(encoded.columns, "DELTA_BINARY_PACKED"),
+    )
+
+
+def scan_substation_flows(path: str | Path) -> pl.LazyFrame:
+    """Lazily read a `SubstationFlows` parquet file, written in either encoding."""
+    lf = pl.scan_parquet(path)
+    metadata = pl.read_parquet_metadata(path).get(COMPACT_FLOWS_METADATA_KEY)
+    if metadata is None:
+        return lf
+    # The column names are in the metadata too, which saves reading the parquet schema.
+    return decode_compact(lf, columns=json.loads(metadata)["columns"])
+
+
+def encode_compact(df: pl.DataFrame) -> pl.DataFrame:
+    """Convert `SubstationFlows` to the compact encoding's columns and dtypes."""
+    period_us = _PERIOD // timedelta(microseconds=1)
+    epoch_us = df["timestamp"].dt.epoch("us")
+    if (epoch_us % period_us != 0).any():
+        raise ValueError(
+            "The compact encoding requires every timestamp to be on the 5-minute grid."
+            f" First timestamp that isn't: {df['timestamp'].filter(epoch_us % period_us != 0)[0]}"
+        )
+    return df.select(
+        (pl.col("timestamp").dt.epoch("us") // period_us).cast(pl.Int32).alias(_PERIOD_COLUMN),
+        *(
+            (pl.col(column) * _SCALE).round().cast(pl.Int32).alias(scaled)
+            for column, scaled in _SCALED_COLUMNS.items()
+            if column in df.columns
+        ),
+    )
+
+
+def decode_compact(lf: pl.LazyFrame, columns: Sequence[str] | None = None) -> pl.LazyFrame:
+    """Convert the compact encoding back to `SubstationFlows` columns and dtypes.
+
+    Args:
+        lf: The compact-encoded flows.
+        columns: The names of `lf`'s columns, if known. Defaults to `lf.collect_schema().names()`.
+    """
+    if columns is None:
+        columns = lf.collect_schema().names()
+    return lf.select(
+        pl.from_epoch(
+            pl.col(_PERIOD_COLUMN).cast(pl.Int64) * int(_PERIOD.total_seconds()), time_unit="s"
+        )
+        .cast(SubstationFlows.dtypes["timestamp"])
+        .alias("timestamp"),
+        *(
+            (pl.col(scaled) / _SCALE).cast(pl.Float32).alias(column)
+            for column, scaled in _SCALED_COLUMNS.items()
+            if scaled in columns
+        ),
+    )
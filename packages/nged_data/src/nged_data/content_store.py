@@ -0,0 +1,54 @@
+"""A content-addressed store for raw downloads.
+
+Each object is stored under its SHA-256 hash, so identical content is only ever stored once, no
+matter how many times (or on how many days) it's downloaded. Use `DownloadManifest` to map
+`(resource_id, last_modified)` to the hash.
+"""
+
+import hashlib
+
+import obstore
+from obstore.store import ObjectStore
+
+
+class ContentAddressedStore:
+    """Store bytes in an `obstore` store, keyed by their SHA-256 hash."""
+
+    def __init__(self, store: ObjectStore, suffix: str = "") -> None:
+        """Initialise the store.
+
+        Args:
+            store: The underlying object store, e.g. `LocalStore(prefix="data/raw/sha256")`.
+            suffix: Appended to every path, e.g. ".csv", to make the objects easier to inspect.
+        """
+        self.store = store
+        self.suffix = suffix
+
+    def path(self, sha256: str) -> str:
+        # Fan out into sub-directories, so no single directory holds too many files.
+        return f"{sha256[:2]}/{sha256}{self.suffix}"
+
+    def put(self, content: bytes) -> str:
+        """Store `content` (unless it's already stored) and return its SHA-256 hash."""
+        sha256 = hashlib.sha256(content).hexdigest()
+        if not self.exists(sha256):
+            obstore.put(self.store, self.path(sha256), content)
+        return sha256
+
+    def move_into_place(self, path: str, sha256: str) -> None:
+        """Move the object at `path` in the underlying store to the path of its hash, `sha256`.
+
+        E.g. after streaming a large download into the store with `ckan.stream_resource_to_store`.
+        """
+        # Identical content may already be stored, in which case overwriting it changes nothing.
+        obstore.rename(self.store, path, self.path(sha256), overwrite=True)
+
+    def get(self, sha256: str) -> bytes:
+        return bytes(obstore.get(self.store, self.path(sha256)).bytes())
+
+    def exists(self, sha256: str) -> bool:
+        try:
+            obstore.head(self.store, self.path(sha256))
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,88 @@
+"""A per-substation, per-day data-quality report of the 5-minutely substation flows.
+
+The report flags missing 5-minute intervals, duplicate timestamps, flat-lined ("stuck") telemetry
+and sudden sign flips. Every indicator is computed for every substation in one lazy Polars pass,
+with no per-substation Python loops.
+"""
+
+from datetime import timedelta
+from typing import Final
+
+import polars as pl
+from contracts.data_schemas import FLOW_COLUMNS, SubstationDailyQuality
+
+_INTERVAL: Final[timedelta] = timedelta(minutes=5)
+
+# A run of at least this many identical readings (i.e. 2 hours) suggests the telemetry is stuck.
+DEFAULT_STUCK_RUN_LENGTH: Final[int] = 24
+# Sign flips between values smaller than this (in MW, MVA or MVAr) are just noise around zero.
+DEFAULT_SIGN_FLIP_MIN_MAGNITUDE: Final[float] = 1.0
+
+
+def quality_report(
+    flows: pl.LazyFrame,
+    stuck_run_length: int = DEFAULT_STUCK_RUN_LENGTH,
+    sign_flip_min_magnitude: float = DEFAULT_SIGN_FLIP_MIN_MAGNITUDE,
+) -> pl.LazyFrame:
+    """Compute the `SubstationDailyQuality` of the flows of many substations.
+
+    Args:
+        flows: Long-format `SubstationFlows`, with a `substation` column and all of the flow
+            columns (e.g. from `rollups.concat_substation_flows`). The rows of each substation must
+            be contiguous, and sorted by `timestamp`.
+        stuck_run_length: The minimum number of consecutive, identical, non-null values of a flow
+            for those rows to count as stuck.
+        sign_flip_min_magnitude: A change of sign between consecutive values of a flow only counts
+            as a sign flip if both values are at least this far from zero.
+
+    Returns:
+        A `LazyFrame` in the `SubstationDailyQuality` schema (not yet validated).
+    """
+    # The rows of each substation are contiguous, so comparing each row with the previous row
+    # (rather than using `.over("substation")`, which hashes the substation names) is fine, as long
+    # as we mask out the comparisons at the first row of each substation.
+    is_first_row = pl.col("substation") != pl.col("substation").shift()
+    gap = pl.when(~is_first_row).then(pl.col("timestamp").diff())
+    per_row = [
+        (gap == timedelta(0)).fill_null(False).alias("is_duplicate"),
+        (gap.dt.total_seconds() // int(_INTERVAL.total_seconds()) - 1)
+        .clip(lower_bound=0)
+        .fill_null(0)
+        .alias("n_missing_intervals"),
+    ]
+    for column in FLOW_COLUMNS:
+        value = pl.col(column)
+        previous = pl.when(~is_first_row).then(value.shift())
+        run_length = pl.len().over(pl.struct("substation", column).rle_id())
+        per_row += [
+            (value.is_not_null() & (run_length >= stuck_run_length)).alias(f"{column}_is_stuck"),
+            (
+                (value.sign() * previous.sign() < 0)
+                & (value.abs() >= sign_flip_min_magnitude)
+                & (previous.abs() >= sign_flip_min_magnitude)
+            )
+            .fill_null(False)
+            .alias(f"{column}_is_sign_flip"),
+        ]
+
+    return (
+        flows.select("substation", "timestamp", *FLOW_COLUMNS, *per_row)
+        .group_by("substation", pl.col("timestamp").dt.date().alias("date"))
+        .agg(
+            pl.len().alias("n_rows"),
+            pl.col("is_duplicate").sum().alias("n_duplicate_timestamps"),
+            pl.col("n_missing_intervals").sum(),
+            *(
+                expr
+                for column in FLOW_COLUMNS
+                for expr in (
+                    pl.col(column).null_count().alias(f"{column}_n_null"),
+                    pl.col(f"{column}_is_stuck").sum().alias(f"{column}_n_stuck"),
+                    pl.col(f"{column}_is_sign_flip").sum().alias(f"{column}_n_sign_flips"),
+                )
+            ),
+        )
+        .sort("substation", "date")
+        .cast(SubstationDailyQuality.dtypes)  # type: ignore[invalid-argument-type]
+        .select(SubstationDailyQuality.columns)
+    )
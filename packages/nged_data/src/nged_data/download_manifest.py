@@ -0,0 +1,202 @@
+"""A small, persistent record of what we've already downloaded from CKAN.
+
+The manifest is keyed by `CkanResource.id` and stores the validators (ETag and Last-Modified) that
+the server sent with the last download. `ckan.download_resource_if_modified` sends these back as
+`If-None-Match` / `If-Modified-Since`, so unchanged resources cost a `304 Not Modified` rather than
+a full download (and reprocessing).
+
+The manifest also stores a `TailState` per resource, which `ckan.download_resource_tail` uses to
+fetch just the end of append-only CSVs with an HTTP Range request. And it indexes the content
+hashes of the objects in a `ContentAddressedStore`, and which of them have been processed.
+
+The manifest is a SQLite database (rather than, say, a parquet file) because Dagster runs each
+partition in its own process, and SQLite handles concurrent writers safely.
+"""
+
+import hashlib
+import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+
+import httpx
+from pydantic import BaseModel
+
+
+class ManifestEntry(BaseModel):
+    resource_id: str
+    etag: str | None = None
+    last_modified: str | None = None  # The HTTP Last-Modified header, verbatim.
+    content_length: int
+    sha256: str
+    fetched_at: datetime
+
+    @classmethod
+    def from_response(cls, resource_id: str, response: httpx.Response) -> ManifestEntry:
+        return cls(
+            resource_id=resource_id,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_length=len(response.content),
+            sha256=hashlib.sha256(response.content).hexdigest(),
+            fetched_at=datetime.now(UTC),
+        )
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class TailState(BaseModel):
+    """What we need to remember about a CSV to fetch just its new rows next time."""
+
+    resource_id: str
+    size: int  # The size in bytes of the CSV when we last fetched it.
+    header: bytes  # The CSV header line, including the trailing newline.
+    overlap: bytes  # The last few lines of the CSV. These must re-appear in the next fetch.
+    last_timestamp: datetime | None
+
+
+class DownloadManifest:
+    """A SQLite-backed table of `ManifestEntry`s, keyed by CKAN resource ID."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS manifest (
+                    resource_id TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_length INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tail_state (
+                    resource_id TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    header BLOB NOT NULL,
+                    overlap BLOB NOT NULL,
+                    last_timestamp TEXT
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS content_index (
+                    resource_id TEXT NOT NULL,
+                    last_modified TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (resource_id, last_modified)
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS processed_content (
+                    resource_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    processed_at TEXT NOT NULL,
+                    PRIMARY KEY (resource_id, sha256)
+                )
+                """
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A generous timeout, because many Dagster runs might write to the manifest at once.
+        # `with connection` commits on success, and rolls back on exception.
+        with closing(sqlite3.connect(self.path, timeout=60)) as connection, connection:
+            yield connection
+
+    def get(self, resource_id: str) -> ManifestEntry | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT resource_id, etag, last_modified, content_length, sha256, fetched_at"
+                " FROM manifest WHERE resource_id = ?",
+                (resource_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return ManifestEntry.model_validate(dict(zip(ManifestEntry.model_fields, row)))
+
+    def put(self, entry: ManifestEntry) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    entry.resource_id,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.content_length,
+                    entry.sha256,
+                    entry.fetched_at.isoformat(),
+                ),
+            )
+
+    def get_tail_state(self, resource_id: str) -> TailState | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT resource_id, size, header, overlap, last_timestamp"
+                " FROM tail_state WHERE resource_id = ?",
+                (resource_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return TailState.model_validate(dict(zip(TailState.model_fields, row)))
+
+    def put_tail_state(self, state: TailState) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO tail_state VALUES (?, ?, ?, ?, ?)",
+                (
+                    state.resource_id,
+                    state.size,
+                    state.header,
+                    state.overlap,
+                    state.last_timestamp.isoformat() if state.last_timestamp else None,
+                ),
+            )
+
+    def put_content_hash(self, resource_id: str, last_modified: str, sha256: str) -> None:
+        """Record that version `last_modified` of `resource_id` has the given content hash."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO content_index VALUES (?, ?, ?)",
+                (resource_id, last_modified, sha256),
+            )
+
+    def get_content_hash(self, resource_id: str, last_modified: str) -> str | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT sha256 FROM content_index WHERE resource_id = ? AND last_modified = ?",
+                (resource_id, last_modified),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def mark_processed(self, resource_id: str, sha256: str) -> None:
+        """Record that the content `sha256` of `resource_id` has been processed downstream."""
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO processed_content VALUES (?, ?, ?)",
+                (resource_id, sha256, datetime.now(UTC).isoformat()),
+            )
+
+    def is_processed(self, resource_id: str, sha256: str) -> bool:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM processed_content WHERE resource_id = ? AND sha256 = ?",
+                (resource_id, sha256),
+            ).fetchone()
+        return row is not None
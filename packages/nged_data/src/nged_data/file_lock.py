@@ -0,0 +1,33 @@
+"""Exclusive locks on the per-substation parquet files, shared by every writer.
+
+Updating a parquet file is a read-modify-write: the live flows (`live_primary_parquet`) and the
+historical backfill both read a substation's file, merge in new rows, and write the file back. If
+two writers did that at once then one writer's rows would be lost. So each writer holds the file's
+lock for the whole read-modify-write.
+
+The locks are advisory `flock`s on a `.lock` file beside each file, so they work across processes
+(e.g. concurrent Dagster runs), and are released automatically if the process dies.
+"""
+
+import fcntl
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def lock_path(path: Path) -> Path:
+    """The lock file of `path`, e.g. `flows.parquet.lock` for `flows.parquet`."""
+    return path.with_name(f"{path.name}.lock")
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold the exclusive lock on `path`, waiting for any other holder to release it first."""
+    lock = lock_path(path)
+    lock.parent.mkdir(parents=True, exist_ok=True)
+    with lock.open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
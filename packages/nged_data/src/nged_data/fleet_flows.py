@@ -0,0 +1,117 @@
+"""Read and write the flows of a whole fleet of substations, as one `MultiSubstationFlows` file.
+
+The file is sorted by substation number and then by timestamp, and declares that sort order in its
+parquet metadata (as the row groups' sorting columns). It is written in row groups of about one
+substation-year, so the row groups' min/max statistics let a scan of a few substations, or of a
+time range, skip most of the file.
+"""
+
+from collections.abc import Collection, Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Final
+
+import polars as pl
+import pyarrow.parquet as pq
+from contracts.data_schemas import MultiSubstationFlows
+from contracts.parquet import write_parquet
+
+# About one year of 5-minutely rows of one substation.
+DEFAULT_ROW_GROUP_SIZE: Final[int] = 128 * 1024
+
+# Filter on up to this many substation numbers with one `==` per number.
+_MAX_EQUALITIES: Final[int] = 64
+
+
+def to_multi_substation_flows(flows: Mapping[int, pl.LazyFrame]) -> pl.LazyFrame:
+    """Combine the `SubstationFlows` of many substations into (unvalidated) `MultiSubstationFlows`.
+
+    Args:
+        flows: Maps each substation number to its `SubstationFlows`, sorted by timestamp.
+
+    Returns:
+        The flows of all the substations, sorted by substation number and then timestamp. (The
+        substations are concatenated in order, so this doesn't need a sort.)
+    """
+    if not flows:
+        return pl.LazyFrame(schema=MultiSubstationFlows.dtypes)
+    return pl.concat(
+        [
+            _with_substation_number(flows[substation_number], substation_number)
+            for substation_number in sorted(flows)
+        ],
+        how="vertical",
+    )
+
+
+def write_multi_substation_flows(
+    df: pl.DataFrame, path: str | Path, row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> None:
+    """Validate `df` (including its sort order), and write it to a parquet file.
+
+    Raises:
+        patito.exceptions.DataFrameValidationError: If `df` isn't valid `MultiSubstationFlows`.
+    """
+    write_parquet(
+        MultiSubstationFlows,
+        MultiSubstationFlows.validate(df),
+        path,
+        row_group_size=row_group_size,
+    )
+
+
+def scan_multi_substation_flows(
+    path: str | Path,
+    substation_numbers: Collection[int] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> pl.LazyFrame:
+    """Lazily read a `MultiSubstationFlows` parquet file, skipping the row groups that aren't used.
+
+    Args:
+        path: A file written by `write_multi_substation_flows`.
+        substation_numbers: Only read these substations. Defaults to all of them.
+        start: Only read the rows at or after this time.
+        end: Only read the rows before this time.
+
+    Raises:
+        ValueError: If the file doesn't declare the `MultiSubstationFlows` sort order.
+    """
+    metadata = pq.ParquetFile(path).metadata
+    expected = MultiSubstationFlows.parquet.sorting_columns(metadata.schema.names)
+    for i in range(metadata.num_row_groups):
+        if metadata.row_group(i).sorting_columns != tuple(expected):
+            raise ValueError(
+                f"{path} isn't sorted by {MultiSubstationFlows.sort_by}, according to its metadata."
+                " Write it with `write_multi_substation_flows`."
+            )
+
+    lf = pl.scan_parquet(path)
+    if substation_numbers is not None:
+        lf = lf.filter(_is_one_of(pl.col("substation_number"), sorted(set(substation_numbers))))
+    if start is not None:
+        lf = lf.filter(pl.col("timestamp") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("timestamp") < end)
+    return lf.with_columns(pl.col("substation_number").set_sorted())
+
+
+def _is_one_of(col: pl.Expr, values: list[int]) -> pl.Expr:
+    # Polars can skip row groups using `==` and `is_between`, but not (as of Polars 1.38) `is_in`.
+    if not values:
+        return pl.lit(False)
+    if len(values) <= _MAX_EQUALITIES:
+        return pl.any_horizontal(col == value for value in values)
+    return col.is_between(values[0], values[-1]) & col.is_in(values)
+
+
+def _with_substation_number(lf: pl.LazyFrame, substation_number: int) -> pl.LazyFrame:
+    schema = lf.collect_schema()
+    return lf.select(
+        pl.lit(substation_number, dtype=pl.Int32).alias("substation_number"),
+        *(
+            pl.col(column).cast(dtype) if column in schema else pl.lit(None, dtype).alias(column)
+            for column, dtype in MultiSubstationFlows.dtypes.items()
+            if column != "substation_number"
+        ),
+    )
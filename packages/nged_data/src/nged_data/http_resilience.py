@@ -0,0 +1,302 @@
+"""Client-side rate limiting, retries and circuit breaking for HTTP requests to CKAN.
+
+These are wired into `CkanClient` as an `httpx` transport, so every request made through the client
+(sync or async, actions or downloads) shares the same rate limiter and circuit breaker.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Final
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+# Responses with these status codes are retried. (All our requests are idempotent GETs.)
+RETRY_STATUS_CODES: Final[frozenset[int]] = frozenset(
+    {
+        httpx.codes.TOO_MANY_REQUESTS,
+        httpx.codes.BAD_GATEWAY,
+        httpx.codes.SERVICE_UNAVAILABLE,
+        httpx.codes.GATEWAY_TIMEOUT,
+    }
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class AdaptiveRateLimiter:
+    """A thread-safe token bucket whose rate adapts to the server.
+
+    The rate creeps up (additively) after every successful request, up to `max_rate`, and halves
+    whenever the server throttles us with a 429. If the 429 has a `Retry-After` header then no
+    tokens are handed out until that time has passed.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 10,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        rate_increase_per_success: float = 0.5,
+    ) -> None:
+        """Initialise the rate limiter.
+
+        Args:
+            rate: The initial rate, in requests per second.
+            burst: The capacity of the bucket: the number of requests that can be sent at once.
+            min_rate: The rate never drops below this, however often we're throttled.
+            max_rate: The rate never rises above this.
+            rate_increase_per_success: Added to the rate after each successful request.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase_per_success = rate_increase_per_success
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, and return how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, 0.0)
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.rate + self.rate_increase_per_success, self.max_rate)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        with self._lock:
+            self.rate = max(self.rate / 2, self.min_rate)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        log.warning("Throttled by server. Reduced rate to %.2f requests/s.", self.rate)
+
+
+class CircuitBreaker:
+    """Stop sending requests after `failure_threshold` consecutive failures.
+
+    Once open, the breaker rejects requests (by raising `CircuitOpenError`) for `reset_timeout`
+    seconds. Then it lets a single trial request through ("half-open"), and keeps rejecting every
+    other request while the trial is in flight: if the trial succeeds, the breaker closes again; if
+    it fails, the breaker re-opens. A trial which hasn't finished after `reset_timeout` seconds
+    (e.g. because it was cancelled) is abandoned, and another trial is let through.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+        self._trial_started_at: float | None = None  # None unless a trial request is in flight.
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        """Raise `CircuitOpenError` if requests are not currently allowed."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError(
+                    f"Circuit breaker is open after {self._consecutive_failures} consecutive"
+                    " failures. Not sending request."
+                )
+            if self._trial_started_at is not None and (
+                now - self._trial_started_at < self.reset_timeout
+            ):
+                raise CircuitOpenError(
+                    "Circuit breaker is half-open, and its trial request is in flight. Not sending"
+                    " request."
+                )
+            # Half-open: Let this request through as the trial.
+            self._trial_started_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._trial_started_at is not None:
+                # The trial failed, so re-open (and restart the reset timeout).
+                self._trial_started_at = None
+                self._opened_at = time.monotonic()
+                log.error("Re-opening circuit breaker after its trial request failed.")
+            elif self._consecutive_failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = time.monotonic()
+                log.error("Opening circuit breaker after %d failures.", self._consecutive_failures)
+
+    def record_throttle(self) -> None:
+        """End the trial request (if any) without a verdict. The next request becomes the trial.
+
+        Being throttled says nothing about the server's health.
+        """
+        with self._lock:
+            self._trial_started_at = None
+
+
+class RetryPolicy:
+    """Retry with "full jitter" exponential backoff."""
+
+    def __init__(
+        self, max_attempts: int = 5, backoff_base: float = 0.5, backoff_max: float = 60.0
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """The number of seconds to wait after the (zero-indexed) `attempt` failed."""
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(backoff, retry_after or 0.0)
+
+
+def parse_retry_after(response: httpx.Response) -> float | None:
+    """Parse the `Retry-After` header (either a number of seconds, or an HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(UTC)).total_seconds(), 0.0)
+    except TypeError, ValueError:
+        return None
+
+
+class _ResilienceMixin:
+    def __init__(
+        self,
+        rate_limiter: AdaptiveRateLimiter,
+        circuit_breaker: CircuitBreaker,
+        retry_policy: RetryPolicy,
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.retry_policy = retry_policy
+
+    def _should_retry(self, response: httpx.Response) -> tuple[bool, float | None]:
+        """Update the rate limiter & circuit breaker. Return whether to retry, and Retry-After."""
+        if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            # Being throttled isn't a failure of the server, so don't trip the circuit breaker.
+            retry_after = parse_retry_after(response)
+            self.rate_limiter.on_throttle(retry_after)
+            self.circuit_breaker.record_throttle()
+            return True, retry_after
+        if response.is_server_error:
+            # Every 5xx is a failure of the server, even the ones which aren't worth retrying.
+            self.circuit_breaker.record_failure()
+            if response.status_code in RETRY_STATUS_CODES:
+                return True, parse_retry_after(response)
+            return False, None
+        # The server is healthy. But only speed up after a successful request: a 4xx is our fault.
+        if not response.is_client_error:
+            self.rate_limiter.on_success()
+        self.circuit_breaker.record_success()
+        return False, None
+
+
+class ResilientTransport(_ResilienceMixin, httpx.BaseTransport):
+    """Wrap an `httpx` transport with rate limiting, retries and a circuit breaker."""
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        rate_limiter: AdaptiveRateLimiter,
+        circuit_breaker: CircuitBreaker,
+        retry_policy: RetryPolicy,
+    ) -> None:
+        super().__init__(rate_limiter, circuit_breaker, retry_policy)
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.retry_policy.max_attempts):
+            is_last_attempt = attempt == self.retry_policy.max_attempts - 1
+            self.circuit_breaker.check()
+            self.rate_limiter.acquire()
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if is_last_attempt:
+                    raise
+                log.warning("%s for %s (attempt %d). Retrying.", e, request.url, attempt + 1)
+                time.sleep(self.retry_policy.backoff(attempt))
+                continue
+            should_retry, retry_after = self._should_retry(response)
+            if not should_retry or is_last_attempt:
+                return response
+            response.close()
+            log.warning("HTTP %d for %s. Retrying.", response.status_code, request.url)
+            time.sleep(self.retry_policy.backoff(attempt, retry_after))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncResilientTransport(_ResilienceMixin, httpx.AsyncBaseTransport):
+    """The async equivalent of `ResilientTransport`."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        rate_limiter: AdaptiveRateLimiter,
+        circuit_breaker: CircuitBreaker,
+        retry_policy: RetryPolicy,
+    ) -> None:
+        super().__init__(rate_limiter, circuit_breaker, retry_policy)
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.retry_policy.max_attempts):
+            is_last_attempt = attempt == self.retry_policy.max_attempts - 1
+            self.circuit_breaker.check()
+            await self.rate_limiter.acquire_async()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as e:
+                self.circuit_breaker.record_failure()
+                if is_last_attempt:
+                    raise
+                log.warning("%s for %s (attempt %d). Retrying.", e, request.url, attempt + 1)
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+                continue
+            should_retry, retry_after = self._should_retry(response)
+            if not should_retry or is_last_attempt:
+                return response
+            await response.aclose()
+            log.warning("HTTP %d for %s. Retrying.", response.status_code, request.url)
+            await asyncio.sleep(self.retry_policy.backoff(attempt, retry_after))
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
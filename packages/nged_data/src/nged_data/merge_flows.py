@@ -0,0 +1,55 @@
+"""Merge newly-downloaded `SubstationFlows` into the flows we already have.
+
+Both inputs are already sorted by timestamp, and new data almost always overlaps just the end of the
+stored data. So, rather than concatenating, de-duplicating and re-sorting the whole history on every
+update, `merge_sorted_flows` binary-searches for the start of the overlap, and only merges the
+overlapping tail. The cost is proportional to the size of the new data, not of the history.
+"""
+
+import polars as pl
+
+
+def merge_sorted_flows(old: pl.DataFrame, new: pl.DataFrame) -> pl.DataFrame:
+    """Merge `new` flows into `old` flows. For timestamps in both, the row in `new` wins.
+
+    Args:
+        old: The stored flows. Must be sorted by timestamp, with unique timestamps.
+        new: The latest download. If it has duplicate timestamps then the last row of each wins.
+
+    Returns:
+        The merged flows, sorted by timestamp, with unique timestamps. If `old` and `new` have
+        different flow columns, then the result has all the flow columns (filled with nulls).
+    """
+    if new.is_empty():
+        return old
+    if not new["timestamp"].is_sorted():
+        new = new.sort("timestamp", maintain_order=True)
+    if new["timestamp"].is_duplicated().any():
+        new = new.unique(subset="timestamp", keep="last", maintain_order=True)
+
+    # `old` before the first new timestamp is untouched. (`slice` doesn't copy the data.)
+    overlap_start = old["timestamp"].search_sorted(new["timestamp"][0], side="left")
+    untouched = old.slice(0, overlap_start)
+    # `merge_sorted` needs both inputs sorted, so the anti-join must keep the order of `old`.
+    overlapping = old.slice(overlap_start).join(
+        new.select("timestamp"), on="timestamp", how="anti", maintain_order="left"
+    )
+
+    schema = _union_schema(old, new)
+    merged_tail = _with_schema(overlapping, schema).merge_sorted(
+        _with_schema(new, schema), key="timestamp"
+    )
+    return pl.concat((_with_schema(untouched, schema), merged_tail), how="vertical", rechunk=False)
+
+
+def _union_schema(old: pl.DataFrame, new: pl.DataFrame) -> pl.Schema:
+    return pl.Schema({**old.schema, **{c: d for c, d in new.schema.items() if c not in old.schema}})
+
+
+def _with_schema(df: pl.DataFrame, schema: pl.Schema) -> pl.DataFrame:
+    if df.schema == schema:
+        return df
+    return df.select(
+        pl.col(column) if column in df.columns else pl.lit(None, dtype=dtype).alias(column)
+        for column, dtype in schema.items()
+    )
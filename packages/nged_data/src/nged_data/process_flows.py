@@ -1,52 +1,529 @@
+import csv
+import io
 import logging
+import os
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import IO
+from typing import IO, Final, Self
 
 import patito as pt
 import polars as pl
-from contracts.data_schemas import SubstationFlows
+from contracts.data_schemas import FLOW_COLUMNS, SubstationFlows
+from pydantic import BaseModel, model_validator
 
 logger = logging.getLogger(__name__)
 
+type CsvData = str | Path | IO[str] | IO[bytes] | bytes
+
+# All the known CSV layouts use ISO 8601 timestamps with a UTC offset,
+# e.g. 2026-01-14T00:05:00+00:00.
+TIMESTAMP_FORMAT: Final[str] = "%Y-%m-%dT%H:%M:%S%:z"
+# In practice the offset is always +00:00, and parsing it as a literal is ~4x faster than "%:z".
+UTC_TIMESTAMP_FORMAT: Final[str] = "%Y-%m-%dT%H:%M:%S+00:00"
+
+# `_skip_rows_until` checks that this many rows either side of the cut are in time order.
+_N_ROWS_CHECKED_AT_CUT: Final[int] = 8
+
+
+class CsvLayout(BaseModel):
+    """One of the CSV layouts that NGED uses for substation flows.
+
+    A layout is pure data. `register_layout` checks it and compiles it into a Polars read plan, so
+    supporting a new layout doesn't need any new code.
+    """
+
+    name: str
+    header: tuple[str, ...]  # The exact header line of the CSV, split into column names.
+    timestamp_column: str
+    # A chrono format string. If it has no UTC offset then the timestamps are assumed to be in UTC.
+    timestamp_format: str = TIMESTAMP_FORMAT
+    # Maps the CSV's column names to `SubstationFlows` column names. Other columns are never read.
+    flow_columns: dict[str, str] = {}
+    # "Long" CSVs have one `value` column whose units are given by the `unit` column.
+    value_column: str | None = None
+    unit_column: str | None = None
+
+    @model_validator(mode="after")
+    def _check_columns(self) -> Self:
+        columns = {self.timestamp_column, *self.flow_columns, self.value_column, self.unit_column}
+        if not_in_header := sorted(columns - {None} - set(self.header)):  # type: ignore[operator]
+            raise ValueError(
+                f"Columns of layout {self.name!r} aren't in its header: {not_in_header}"
+            )
+        if unknown := sorted(set(self.flow_columns.values()) - set(FLOW_COLUMNS)):
+            raise ValueError(f"Layout {self.name!r} maps to unknown flow columns: {unknown}")
+        if (self.value_column is None) != (self.unit_column is None):
+            raise ValueError(
+                f"Layout {self.name!r} needs both a value and a unit column, or neither."
+            )
+        if not self.flow_columns and self.value_column is None:
+            raise ValueError(f"Layout {self.name!r} has no flow columns.")
+        return self
+
+
+# The CSV column names vary between NGED license areas:
+LAYOUTS: Final[tuple[CsvLayout, ...]] = (
+    CsvLayout(
+        name="East Midlands (e.g. Abington)",
+        header=("ValueDate", "MVA", "Volts"),
+        timestamp_column="ValueDate",
+        flow_columns={"MVA": "MVA"},
+    ),
+    CsvLayout(
+        name="West Midlands (e.g. Albrighton)",
+        header=("ValueDate", "Amps", "MVA", "MVAr", "MW", "Volts"),
+        timestamp_column="ValueDate",
+        flow_columns={"MW": "MW", "MVA": "MVA", "MVAr": "MVAr"},
+    ),
+    CsvLayout(
+        name="South Wales (e.g. Aberaeron)",
+        header=("ValueDate", "Current Inst", "Derived MVA", "MVAr Inst", "MW Inst", "Volts Inst"),
+        timestamp_column="ValueDate",
+        flow_columns={"MW Inst": "MW", "Derived MVA": "MVA", "MVAr Inst": "MVAr"},
+    ),
+    CsvLayout(
+        name="South West (e.g. Filton Dc)",
+        header=("ValueDate", "Current Inst", "MVAr Inst", "MW Inst", "Volts Inst"),
+        timestamp_column="ValueDate",
+        flow_columns={"MW Inst": "MW", "MVAr Inst": "MVAr"},
+    ),
+    CsvLayout(
+        # e.g. Regent Street primary substation (in the East Midlands), and Milford Haven Grid.
+        name="Long",
+        header=("site", "time", "unit", "value"),
+        timestamp_column="time",
+        value_column="value",
+        unit_column="unit",
+    ),
+)
+
+
+class _ReadPlan(BaseModel, arbitrary_types_allowed=True):
+    """A `CsvLayout` compiled into everything needed to scan a CSV in that layout."""
+
+    layout: CsvLayout
+    flow_columns: list[str]  # The `SubstationFlows` columns that the CSV has.
+    schema_overrides: dict[str, pl.DataType]
+    # Select `timestamp` (as a string), the flow columns, and `unit` (null unless the CSV is long).
+    columns: list[pl.Expr]
+
+
+# The registry. Keyed by header, and (for the read plans) by unit: a long layout has one plan per
+# unit, because the unit determines which flow column the `value` column holds.
+_LAYOUTS_BY_HEADER: Final[dict[tuple[str, ...], CsvLayout]] = {}
+_READ_PLANS: Final[dict[tuple[tuple[str, ...], str | None], _ReadPlan]] = {}
+
+
+def register_layout(layout: CsvLayout) -> None:
+    """Add a CSV layout, so CSVs with its header are parsed with it (rather than type inference).
+
+    Raises:
+        ValueError: If a different layout with the same header is already registered.
+    """
+    existing = _LAYOUTS_BY_HEADER.get(layout.header)
+    if existing is not None and existing != layout:
+        raise ValueError(
+            f"Can't register layout {layout.name!r}: Layout {existing.name!r} has the same header."
+        )
+    units = [None] if layout.value_column is None else list(FLOW_COLUMNS)
+    for unit in units:
+        _READ_PLANS[layout.header, unit] = _compile(layout, unit)
+    _LAYOUTS_BY_HEADER[layout.header] = layout
+
+
+def get_layout(header: Sequence[str]) -> CsvLayout | None:
+    """The registered layout with this header, if any."""
+    return _LAYOUTS_BY_HEADER.get(tuple(header))
+
+
+def _compile(layout: CsvLayout, unit: str | None) -> _ReadPlan:
+    if layout.value_column is None:
+        flow_columns = layout.flow_columns
+    else:
+        assert unit is not None
+        flow_columns = {layout.value_column: unit}
+    columns = [pl.col(layout.timestamp_column).alias("timestamp")]
+    columns += [pl.col(csv_col).alias(flows_col) for csv_col, flows_col in flow_columns.items()]
+    if layout.unit_column is None:
+        columns.append(pl.lit(None, pl.String).alias("unit"))
+    else:
+        columns.append(pl.col(layout.unit_column).alias("unit"))
+    return _ReadPlan(
+        layout=layout,
+        flow_columns=list(flow_columns.values()),
+        schema_overrides={
+            csv_column: SubstationFlows.dtypes[flows_column]
+            for csv_column, flows_column in flow_columns.items()
+        },
+        columns=columns,
+    )
+
+
+for _layout in LAYOUTS:
+    register_layout(_layout)
+
 
 def process_live_primary_substation_flows(
-    csv_data: str | Path | IO[str] | IO[bytes] | bytes,
+    csv_data: CsvData, since: datetime | None = None
 ) -> pt.DataFrame[SubstationFlows]:
-    """Read a primary substation CSV and validate it against the schema."""
-    df: pl.DataFrame = pl.read_csv(csv_data)
-
-    # The CSV column names vary between NGED license areas:
-    # East Midlands (e.g. Abington)  : ValueDate,                       MVA,                     Volts
-    # West Midlands (e.g. Albrighton): ValueDate, Amps,                 MVA, MVAr,      MW,      Volts
-    # South Wales   (e.g. Aberaeron) : ValueDate, Current Inst, Derived MVA, MVAr Inst, MW Inst, Volts Inst
-    # South West    (e.g. Filton Dc) : ValueDate, Current Inst,              MVAr Inst, MW Inst, Volts Inst
-    # New format    (e.g. Regent St) : site, time, unit, value
-    if "unit" in df.columns and "value" in df.columns:
-        if (df["unit"] == "MVA").all():
-            # Handle Regent Street primary substation (in the East Midlands), which uses a completely
-            # different CSV structure. See `example_csv_data/regent-street.csv`.
-            df = df.rename({"value": "MVA"}, strict=False)
-        elif (df["unit"] == "MW").all():
-            # Handle milford-haven-grid.csv.
-            df = df.rename({"value": "MW"}, strict=False)
+    """Read a primary substation CSV and validate it against the schema.
+
+    Only the header line is read to identify the CSV's layout. Then the CSV is parsed in one pass,
+    reading just the timestamp and flow columns, straight into the `SubstationFlows` dtypes. CSVs
+    in an unknown layout are parsed with type inference, and the columns are matched by name.
+
+    Args:
+        csv_data: The CSV.
+        since: If given, only return (and validate) the rows strictly after `since`, which must be
+            timezone-aware. The rows up to `since` are skipped without parsing them, by
+            binary-searching the CSV's bytes for the first newer row. This assumes that the rows
+            are in time order, as NGED's are. The rows either side of the cut are checked, and if
+            they're out of order then the whole CSV is parsed instead. But a newer row hidden
+            among the skipped rows, further from the cut, would be missed.
+    """
+    source = _as_scan_source(csv_data)
+    if since is not None:
+        if since.tzinfo is None:
+            raise ValueError(f"`since` must be timezone-aware, not {since!r}.")
+        source = _skip_rows_until(source, since)
+    df, flow_columns = _parse_csvs([source])
+    if since is not None:
+        # `_skip_rows_until` returns the whole CSV if it can't (or shouldn't) skip rows.
+        df = df.filter(pl.col("timestamp") > since)
+    df = df.select("timestamp", *flow_columns).sort("timestamp")
+    return SubstationFlows.validate(df, allow_missing_columns=True)
+
+
+def process_many_live_primary_substation_flows(
+    csv_data: Mapping[str, CsvData] | Mapping[int, CsvData], key_column: str = "resource_id"
+) -> pl.DataFrame:
+    """Read many primary substation CSVs into one long-format table, in a single parallel pass.
+
+    All the CSVs are scanned in one Polars query (so they're parsed concurrently on Polars' thread
+    pool), and the units check, timestamp parsing, sorting and validation each happen once, on the
+    whole table.
+
+    Args:
+        csv_data: Maps a key (e.g. a CKAN resource ID, or a substation number) to each CSV.
+        key_column: The name of the column which holds the keys of `csv_data`.
+
+    Returns:
+        A DataFrame with columns `key_column` and all the `SubstationFlows` columns (which are null
+        where a CSV doesn't include that column), sorted by `key_column` and `timestamp`.
+    """
+    keys = sorted(csv_data)
+    sources = [_as_scan_source(data) for _, data in sorted(csv_data.items())]
+    df, _ = _parse_csvs(sources, keys=keys)
+    key_dtype = None if keys else pl.String
+    df = df.select(
+        pl.Series(key_column, keys, dtype=key_dtype).gather(df["_index"]), *SubstationFlows.columns
+    )
+    SubstationFlows.validate(df, allow_superfluous_columns=True)
+    return df
+
+
+def scan_live_primary_substation_flows(csv_data: CsvData) -> pl.LazyFrame:
+    """The lazy equivalent of `process_live_primary_substation_flows`.
+
+    Returns a `LazyFrame` with the `timestamp` and flow columns of the CSV. Unlike the eager
+    version, the rows are not sorted (NGED's CSVs are already in time order) and the result is not
+    validated: use `sink_substation_flows` to validate the rows as they're streamed to parquet.
+    """
+    lf, flow_columns = _scan(_as_scan_source(csv_data))
+    return lf.select("timestamp", *flow_columns)
+
+
+def scan_many_live_primary_substation_flows(
+    csv_data: Mapping[str, CsvData] | Mapping[int, CsvData], key_column: str = "resource_id"
+) -> pl.LazyFrame:
+    """The lazy equivalent of `process_many_live_primary_substation_flows`.
+
+    CSVs in known layouts are scanned lazily, so the result can be streamed (e.g. by
+    `sink_substation_flows`) with bounded memory, however large the CSVs are. The only exception
+    is CSVs in unknown layouts, which are read into memory with type inference. Rows are in the
+    order of the (sorted) keys, and then the order of the rows within each CSV.
+    """
+    if not csv_data:
+        return pl.LazyFrame(schema={key_column: pl.String} | SubstationFlows.dtypes)
+    lazy_frames = []
+    flow_columns: set[str] = set()
+    for key, data in sorted(csv_data.items()):
+        with _add_key_to_errors(key):
+            lf, csv_flow_columns = _scan(_as_scan_source(data))
+        lazy_frames.append(lf.with_columns(pl.lit(key).alias(key_column)))
+        flow_columns.update(csv_flow_columns)
+    return pl.concat(lazy_frames).select(
+        key_column, "timestamp", *[col for col in FLOW_COLUMNS if col in flow_columns]
+    )
+
+
+def _scan(source: Path | bytes) -> tuple[pl.LazyFrame, list[str]]:
+    """Scan one CSV into all the `SubstationFlows` columns (plus `_index`).
+
+    Also returns the names of the flow columns which are actually in the CSV.
+    """
+    planned = _plan_scan(source, check_units=True)
+    if planned is None:
+        df = _read_with_type_inference(source)
+        flow_columns = [col for col in df.columns if col in FLOW_COLUMNS]
+        lf = df.lazy()
+    else:
+        lf, plan = planned
+        flow_columns = plan.flow_columns
+        timestamp = pl.col("timestamp").str.to_datetime(
+            plan.layout.timestamp_format, time_zone="UTC"
+        )
+        lf = lf.drop("unit").with_columns(timestamp)
+    return _pad_flow_columns(lf, index=0), flow_columns
+
+
+def sink_substation_flows(lf: pl.LazyFrame, path: str | Path) -> None:
+    """Stream `lf` into a parquet file, checking it against the `SubstationFlows` contract.
+
+    The rows are streamed into a temporary file, and the contract's column constraints are checked
+    in the same streaming pass. The file is only moved to `path` if all the checks pass, so `path`
+    never holds invalid data. Memory use is bounded throughout.
+
+    Raises:
+        ValueError: If `lf` breaks the contract.
+    """
+    SubstationFlows.sink_parquet(
+        lf, path, allow_missing_columns=True, allow_superfluous_columns=True
+    )
+
+
+def _parse_csvs(
+    sources: Sequence[Path | bytes], keys: Sequence[str | int] | None = None
+) -> tuple[pl.DataFrame, list[str]]:
+    """Parse many CSVs into one (unvalidated) table.
+
+    Returns:
+        A DataFrame with an `_index` column (the index into `sources`) and all the
+        `SubstationFlows` columns, sorted by `_index` and `timestamp`. And the names of the flow
+        columns which appear in at least one CSV.
+    """
+    lazy_frames: list[pl.LazyFrame] = []  # CSVs in known layouts.
+    indexes_by_timestamp_format: dict[str, list[int]] = {}
+    dfs: list[pl.DataFrame] = []  # CSVs in unknown layouts.
+    flow_columns: set[str] = set()
+    for index, source in enumerate(sources):
+        with _add_key_to_errors(keys[index] if keys else None):
+            planned = _plan_scan(source)
+            if planned is None:
+                df = _read_with_type_inference(source)
+                csv_flow_columns = [col for col in df.columns if col in FLOW_COLUMNS]
+                dfs.append(_pad_flow_columns(df.lazy(), index).collect())
+            else:
+                lf, plan = planned
+                lazy_frames.append(_pad_flow_columns(lf, index))
+                csv_flow_columns = plan.flow_columns
+                indexes_by_timestamp_format.setdefault(plan.layout.timestamp_format, []).append(
+                    index
+                )
+        flow_columns.update(csv_flow_columns)
+
+    if lazy_frames:
+        df = pl.concat(lazy_frames, parallel=True).collect()
+        _check_units(df, keys)
+        df = df.drop("unit")
+        # Parse the timestamps of all the CSVs which share a timestamp format in one go.
+        if len(indexes_by_timestamp_format) == 1:
+            timestamp_format = next(iter(indexes_by_timestamp_format))
+            dfs.append(df.with_columns(_parse_timestamps(df["timestamp"], timestamp_format)))
         else:
-            raise ValueError(f"Unexpected unit in CSV: {df['unit'].unique().to_list()}")
-
-    df = df.rename(
-        {
-            "time": "timestamp",
-            "ValueDate": "timestamp",
-            "Timestamp": "timestamp",
-            "MW Inst": "MW",
-            "MVAr Inst": "MVAr",
-            "Derived MVA": "MVA",
-        },
-        strict=False,
+            for timestamp_format, indexes in indexes_by_timestamp_format.items():
+                part = df.filter(pl.col("_index").is_in(indexes))
+                dfs.append(
+                    part.with_columns(_parse_timestamps(part["timestamp"], timestamp_format))
+                )
+    if not dfs:
+        schema = {"_index": pl.UInt32} | {
+            c: SubstationFlows.dtypes[c] for c in SubstationFlows.columns
+        }
+        return pl.DataFrame(schema=schema), []
+    df = pl.concat(dfs).sort("_index", "timestamp")
+    return df, [col for col in FLOW_COLUMNS if col in flow_columns]
+
+
+def _plan_scan(
+    source: Path | bytes, check_units: bool = False
+) -> tuple[pl.LazyFrame, _ReadPlan] | None:
+    """Plan a scan of a CSV in a registered layout. Returns None if the layout is unknown.
+
+    The `timestamp` column is left as a string, to be parsed by `_parse_timestamps`. The `unit`
+    column is null except for long CSVs, and is checked by `_check_units` (or, if `check_units` is
+    True, straight away, by streaming through the `unit` column of the CSV).
+    """
+    header, first_row = _read_header_and_first_row(source)
+    layout = _LAYOUTS_BY_HEADER.get(header)
+    if layout is None:
+        logger.warning("Unknown CSV layout %s. Falling back to type inference.", header)
+        return None
+
+    unit = None
+    if layout.unit_column is not None:
+        # The units of a long CSV are the same on every row, so we only need to read the first.
+        unit = first_row[header.index(layout.unit_column)] if first_row else "MW"  # Empty CSV.
+        if unit not in FLOW_COLUMNS:
+            raise ValueError(f"Unexpected unit in CSV: {[unit]}")
+    plan = _READ_PLANS[header, unit]
+
+    lf = pl.scan_csv(
+        source,
+        infer_schema=False,  # Columns not in `schema_overrides` are read as strings (if at all).
+        schema_overrides=plan.schema_overrides,
+    )
+    if check_units and layout.unit_column is not None:
+        units = lf.select(pl.col(layout.unit_column).unique()).collect(engine="streaming")
+        if units.height > 1:
+            raise ValueError(f"Unexpected unit in CSV: {units.to_series().sort().to_list()}")
+    return lf.select(plan.columns), plan
+
+
+def _pad_flow_columns(lf: pl.LazyFrame, index: int) -> pl.LazyFrame:
+    """Give every CSV the same columns, so they can be concatenated."""
+    schema = lf.collect_schema()
+    columns = [pl.lit(index, dtype=pl.UInt32).alias("_index"), pl.col("timestamp")]
+    columns += [
+        pl.col(col) if col in schema else pl.lit(None, SubstationFlows.dtypes[col]).alias(col)
+        for col in FLOW_COLUMNS
+    ]
+    if "unit" in schema:
+        columns.append(pl.col("unit"))
+    return lf.select(columns)
+
+
+def _check_units(df: pl.DataFrame, keys: Sequence[str | int] | None) -> None:
+    """Check that each long CSV uses the same units on every row."""
+    mixed_units = (
+        df.filter(pl.col("unit").is_not_null())
+        .group_by("_index")
+        .agg(pl.col("unit").unique(maintain_order=True))
+        .filter(pl.col("unit").list.len() > 1)
     )
+    if not mixed_units.is_empty():
+        index, units = mixed_units.row(0)
+        with _add_key_to_errors(keys[index] if keys else None):
+            raise ValueError(f"Unexpected unit in CSV: {units}")
+
+
+@contextmanager
+def _add_key_to_errors(key: str | int | None) -> Iterator[None]:
+    try:
+        yield
+    except ValueError as e:
+        if key is None:
+            raise
+        raise ValueError(f"{key}: {e}") from e
+
+
+def _parse_timestamps(timestamps: pl.Series, timestamp_format: str) -> pl.Series:
+    if timestamp_format == TIMESTAMP_FORMAT and timestamps.str.ends_with("+00:00").all():
+        timestamp_format = UTC_TIMESTAMP_FORMAT
+    return timestamps.str.to_datetime(timestamp_format, time_zone="UTC")
+
+
+def _as_scan_source(csv_data: CsvData) -> Path | bytes:
+    if isinstance(csv_data, str | Path):
+        return Path(csv_data)
+    if isinstance(csv_data, bytes):
+        return csv_data
+    content = csv_data.read()
+    return content.encode() if isinstance(content, str) else content
+
+
+def _read_header_and_first_row(source: Path | bytes) -> tuple[tuple[str, ...], list[str]]:
+    with source.open("rb") if isinstance(source, Path) else io.BytesIO(source) as f:
+        first_lines = f.readline() + f.readline()
+    rows = list(csv.reader(io.StringIO(first_lines.decode("utf-8-sig"))))
+    header = tuple(column.strip() for column in rows[0]) if rows else ()
+    return header, rows[1] if len(rows) > 1 else []
+
 
+def _skip_rows_until(source: Path | bytes, since: datetime) -> Path | bytes:
+    """Return the header plus the rows after the last row at or before `since`.
+
+    Assumes that the rows are in time order. Reads O(log n) rows. Returns `source` unchanged if the
+    CSV's layout is unknown (so we don't know which column holds the timestamps), or if the
+    `_N_ROWS_CHECKED_AT_CUT` rows either side of the cut aren't in time order.
+    """
+    header, _ = _read_header_and_first_row(source)
+    layout = _LAYOUTS_BY_HEADER.get(header)
+    if layout is None or layout.timestamp_format != TIMESTAMP_FORMAT:
+        return source  # We can't parse the timestamps here.
+    timestamp_index = header.index(layout.timestamp_column)
+
+    def timestamp_of(line: bytes) -> datetime | None:
+        row = next(csv.reader([line.decode("utf-8-sig")]), None)
+        if not row or len(row) <= timestamp_index:
+            return None  # A blank or truncated line.
+        return datetime.fromisoformat(row[timestamp_index].strip())
+
+    def is_after_since(line: bytes) -> bool:
+        timestamp = timestamp_of(line)
+        return timestamp is None or timestamp > since  # Let the parser deal with bad lines.
+
+    def start_of_first_line_at_or_after(f: IO[bytes], position: int) -> int:
+        f.seek(position - 1)
+        f.readline()  # Skip to the end of the line containing the byte before `position`.
+        return f.tell()
+
+    with source.open("rb") if isinstance(source, Path) else io.BytesIO(source) as f:
+        header_line = f.readline()
+        # Invariant: every line starting before `lo` is at or before `since`, and `first_new_row`
+        # is the start of the earliest line found so far that is after `since`.
+        lo, hi = len(header_line), f.seek(0, os.SEEK_END)
+        first_new_row = hi
+        while lo < hi:
+            mid = (lo + hi) // 2
+            line_start = start_of_first_line_at_or_after(f, mid)
+            if line_start >= hi:  # No line starts in [mid, hi).
+                hi = mid
+                continue
+            f.seek(line_start)
+            line = f.readline()
+            if is_after_since(line):
+                first_new_row = line_start
+                hi = mid
+            else:
+                lo = line_start + len(line)
+        if first_new_row == len(header_line):
+            return source  # Every row is new.
+
+        # The rows just before the cut, and just after it.
+        window_start = max(first_new_row - _N_ROWS_CHECKED_AT_CUT * 256, len(header_line))
+        f.seek(window_start)
+        before = f.read(first_new_row - window_start).splitlines()
+        if window_start > len(header_line):
+            before = before[1:]  # The first line is probably partial.
+        after = [f.readline() for _ in range(_N_ROWS_CHECKED_AT_CUT)]
+        timestamps = [
+            timestamp
+            for line in (*before[-_N_ROWS_CHECKED_AT_CUT:], *after)
+            if (timestamp := timestamp_of(line)) is not None
+        ]
+        if any(later < earlier for earlier, later in zip(timestamps, timestamps[1:])):
+            logger.warning("Rows are out of time order near %s. Parsing the whole CSV.", since)
+            return source
+        f.seek(first_new_row)
+        return header_line + f.read()
+
+
+def _read_with_type_inference(source: Path | bytes) -> pl.DataFrame:
+    """Read a CSV in an unknown layout, matching its columns to the registered layouts' columns."""
+    df: pl.DataFrame = pl.read_csv(source)
+    renames = {"Timestamp": "timestamp"}
+    for layout in _LAYOUTS_BY_HEADER.values():
+        renames[layout.timestamp_column] = "timestamp"
+        renames.update(layout.flow_columns)
+        if layout.value_column in df.columns and layout.unit_column in df.columns:
+            units = df[layout.unit_column].unique(maintain_order=True)
+            if units.len() != 1 or units[0] not in FLOW_COLUMNS:
+                raise ValueError(f"Unexpected unit in CSV: {units.to_list()}")
+            renames[layout.value_column] = units[0]
+    df = df.rename(renames, strict=False)
     columns = [col for col in SubstationFlows.columns if col in df.columns]
     df = df.select(columns)
-    df = df.cast({col: SubstationFlows.dtypes[col] for col in columns})
-    df = df.sort("timestamp")
-
-    return SubstationFlows.validate(df, allow_missing_columns=True)
+    return df.cast({col: SubstationFlows.dtypes[col] for col in columns})
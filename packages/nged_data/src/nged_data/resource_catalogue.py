@@ -0,0 +1,184 @@
+"""A local, persistent catalogue of the `CkanResource`s found by each CKAN `package_search` query.
+
+The sensor, the assets and the dashboard all need the same ~1,000 `CkanResource` records. Rather
+than each of them asking the portal, `ckan.refresh_resource_catalogue` keeps this catalogue up to
+date (incrementally, using `metadata_modified`) and everything else reads from it.
+
+The catalogue is a parquet file with one row per `(query, resource id)`. Each row also records
+`fetched_at`: when this version of the resource was fetched from CKAN. The times of the last
+refresh (and last full refresh) of each query are stored in the parquet file's key-value metadata.
+The file is written atomically, and each update holds the file's lock from reading the catalogue to
+writing it, so many processes can safely share one catalogue.
+"""
+
+import io
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Final
+
+import polars as pl
+from contracts.atomic_write import atomic_write
+from pydantic import BaseModel, TypeAdapter
+
+from nged_data.file_lock import file_lock
+from nged_data.schemas import CkanResource
+
+_METADATA_KEY: Final[str] = "nged_data.resource_catalogue"
+
+_SCHEMA: Final[dict[str, pl.DataType]] = {
+    "query": pl.String(),
+    "id": pl.String(),
+    "name": pl.String(),
+    "package_id": pl.String(),
+    "url": pl.String(),
+    "format": pl.String(),
+    "mimetype": pl.String(),
+    "description": pl.String(),
+    "size": pl.Int64(),
+    "state": pl.String(),
+    "restricted_level": pl.String(),
+    "created": pl.Datetime("us"),
+    "last_modified": pl.Datetime("us"),
+    "metadata_modified": pl.Datetime("us"),
+    "fetched_at": pl.Datetime("us", time_zone="UTC"),
+}
+
+
+class QueryState(BaseModel):
+    refreshed_at: datetime  # The last time this query was refreshed, fully or incrementally.
+    fully_refreshed_at: datetime  # The last time *all* the resources for this query were fetched.
+
+
+_QUERY_STATES = TypeAdapter(dict[str, QueryState])
+
+
+class ResourceCatalogue:
+    """A parquet-backed table of `CkanResource`s, with in-memory indexes by ID and name."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._loaded_mtime_ns: int | None = None
+        self._table = pl.DataFrame(schema=_SCHEMA)
+        self._query_states: dict[str, QueryState] = {}
+        self._by_id: dict[str, CkanResource] = {}
+        self._by_name: dict[str, list[CkanResource]] = {}
+
+    def _load(self) -> None:
+        """(Re-)load the catalogue from disk, if another process (or we) changed it."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns == self._loaded_mtime_ns:
+            return
+        # Read the file once, so the table and its metadata are from the same version of the file.
+        data = self.path.read_bytes()
+        self._table = pl.read_parquet(data)
+        metadata = pl.read_parquet_metadata(io.BytesIO(data))
+        self._query_states = _QUERY_STATES.validate_json(metadata.get(_METADATA_KEY, "{}"))
+        self._by_id = {}
+        self._by_name = {}
+        for row in self._table.drop("query", "fetched_at").iter_rows(named=True):
+            resource = CkanResource.model_validate(row)
+            self._by_id[resource.id] = resource
+            self._by_name.setdefault(resource.name, []).append(resource)
+        self._loaded_mtime_ns = mtime_ns
+
+    def get(self, resource_id: str) -> CkanResource | None:
+        self._load()
+        return self._by_id.get(resource_id)
+
+    def find_by_name(self, name: str) -> list[CkanResource]:
+        """Note that a handful of resource names are not unique."""
+        self._load()
+        return self._by_name.get(name, [])
+
+    def resources(self, query: str) -> list[CkanResource]:
+        self._load()
+        ids = self._table.filter(pl.col("query") == query)["id"]
+        return [self._by_id[resource_id] for resource_id in ids]
+
+    def table(self) -> pl.DataFrame:
+        """The whole catalogue, including the `query` and `fetched_at` columns."""
+        self._load()
+        return self._table
+
+    def query_state(self, query: str) -> QueryState | None:
+        self._load()
+        return self._query_states.get(query)
+
+    def watermark(self, query: str) -> datetime | None:
+        """The most recent `metadata_modified` of any resource in the catalogue for `query`."""
+        self._load()
+        metadata_modified = self._table.filter(pl.col("query") == query)["metadata_modified"]
+        return metadata_modified.max()  # type: ignore[invalid-return-type]
+
+    def update(
+        self,
+        query: str,
+        resources: list[CkanResource],
+        is_full_refresh: bool,
+        now: datetime | None = None,
+    ) -> None:
+        """Merge freshly-fetched `resources` into the catalogue.
+
+        Rows are only replaced if the resource's `metadata_modified` has advanced, so `fetched_at`
+        records when each version of each resource was first seen.
+
+        Args:
+            query: The `package_search` query that found `resources`.
+            resources: The resources returned by CKAN.
+            is_full_refresh: True if `resources` is the complete set of resources for `query`, in
+                which case any resources missing from `resources` are removed from the catalogue.
+            now: The time of the refresh. Defaults to now.
+        """
+        with file_lock(self.path):
+            # Re-read the catalogue, in case another process changed it within the mtime resolution.
+            self._loaded_mtime_ns = None
+            self._load()
+            previous_state = self._query_states.get(query)
+            if previous_state is None and not is_full_refresh:
+                raise ValueError(f"The first refresh of {query=} must be a full refresh.")
+            now = now or datetime.now(UTC)
+            fetched = pl.DataFrame(
+                [
+                    {
+                        **resource.model_dump(include=set(_SCHEMA)),
+                        "url": str(resource.url),
+                        "query": query,
+                        "fetched_at": now,
+                    }
+                    for resource in resources
+                ],
+                schema=_SCHEMA,
+            )
+            previous = self._table.filter(pl.col("query") == query)
+            if is_full_refresh:
+                previous = previous.filter(pl.col("id").is_in(fetched["id"].implode()))
+            merged = (
+                pl.concat((previous, fetched))
+                # Keep the newest version of each resource. If the version hasn't changed, then keep
+                # the row we already had (with the earlier `fetched_at`).
+                .sort(["metadata_modified", "fetched_at"], descending=[True, False])
+                .unique(subset="id", keep="first", maintain_order=True)
+                .sort("name", "id")
+            )
+            table = pl.concat((self._table.filter(pl.col("query") != query), merged))
+
+            if is_full_refresh:
+                fully_refreshed_at = now
+            else:
+                assert previous_state is not None
+                fully_refreshed_at = previous_state.fully_refreshed_at
+            query_states = self._query_states | {
+                query: QueryState(refreshed_at=now, fully_refreshed_at=fully_refreshed_at)
+            }
+            self._write(table, query_states)
+
+    def _write(self, table: pl.DataFrame, query_states: dict[str, QueryState]) -> None:
+        with atomic_write(self.path) as tmp_path:
+            table.write_parquet(
+                tmp_path,
+                compression="zstd",
+                metadata={_METADATA_KEY: _QUERY_STATES.dump_json(query_states).decode()},
+            )
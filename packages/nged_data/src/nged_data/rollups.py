@@ -0,0 +1,228 @@
+"""Roll up the 5-minutely `SubstationFlows` of all substations into half-hourly windows and peaks.
+
+The forecasts are half-hourly, so the half-hourly rollups save every consumer from resampling the
+5-minutely data on the fly. Both rollups are computed for all substations in one vectorised pass,
+and are updated incrementally: only the windows (and days) at or after the last stored window (or
+day) of each substation are recomputed. Those periods may have been incomplete when they were
+last computed.
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Final
+
+import patito as pt
+import polars as pl
+from contracts.atomic_write import atomic_write
+from contracts.data_schemas import (
+    FLOW_COLUMNS,
+    DailySubstationPeaks,
+    HalfHourlySubstationFlows,
+    SubstationFlows,
+)
+from contracts.parquet import parquet_settings, write_parquet
+
+_UTC_DATETIME: Final[pl.Datetime] = pl.Datetime("us", time_zone="UTC")
+
+
+def rollup_half_hourly(flows: pl.LazyFrame) -> pl.LazyFrame:
+    """Roll up 5-minutely flows into 30-minute windows.
+
+    Args:
+        flows: `SubstationFlows` of many substations, plus a `substation` column, with all of the
+            flow columns. Sorted by `timestamp` within each substation.
+
+    Returns:
+        A `LazyFrame` in the `HalfHourlySubstationFlows` schema (not yet validated).
+    """
+    return (
+        flows.group_by_dynamic(
+            "timestamp", every="30m", group_by="substation", closed="left", label="left"
+        )
+        .agg(
+            pl.len().alias("n_samples"),
+            *(
+                expr
+                for column in FLOW_COLUMNS
+                for expr in (
+                    pl.col(column).mean().alias(f"{column}_mean"),
+                    pl.col(column).min().alias(f"{column}_min"),
+                    pl.col(column).max().alias(f"{column}_max"),
+                    pl.col(column).drop_nulls().last().alias(f"{column}_last"),
+                )
+            ),
+        )
+        .cast(HalfHourlySubstationFlows.dtypes)  # type: ignore[invalid-argument-type]
+        .select(HalfHourlySubstationFlows.columns)
+    )
+
+
+def daily_peaks(flows: pl.LazyFrame) -> pl.LazyFrame:
+    """The daily (UTC) maximum of each flow of each substation, and the time of that maximum.
+
+    Args:
+        flows: As for `rollup_half_hourly`.
+
+    Returns:
+        A `LazyFrame` in the `DailySubstationPeaks` schema (not yet validated).
+    """
+    return (
+        flows.group_by_dynamic("timestamp", every="1d", group_by="substation")
+        .agg(
+            expr
+            for column in FLOW_COLUMNS
+            for expr in (
+                pl.col(column).max().alias(f"{column}_peak"),
+                pl.col("timestamp").get(pl.col(column).arg_max()).alias(f"{column}_peak_timestamp"),
+            )
+        )
+        .with_columns(date=pl.col("timestamp").dt.date())
+        .cast(DailySubstationPeaks.dtypes)  # type: ignore[invalid-argument-type]
+        .select(DailySubstationPeaks.columns)
+    )
+
+
+def update_rollups(
+    flows: Mapping[str, pl.LazyFrame], half_hourly_path: Path, daily_peaks_path: Path
+) -> None:
+    """Recompute the rollups of the latest 5-minutely flows, and merge them into the stored rollups.
+
+    For each substation, only the flows at or after the start of its last stored half-hourly window
+    (or day, for the daily peaks) are read. Substations missing from `flows` are left unchanged.
+
+    Args:
+        flows: Maps each substation to its `SubstationFlows`, sorted by timestamp. e.g. the result
+            of `pl.scan_parquet`, so that the filters on timestamp are pushed down into the scan.
+        half_hourly_path: The `HalfHourlySubstationFlows` parquet file. Created if it doesn't exist.
+        daily_peaks_path: The `DailySubstationPeaks` parquet file. Created if it doesn't exist.
+    """
+    half_hourly_from = _last_stored_period_starts(half_hourly_path, "timestamp")
+    daily_from = _last_stored_period_starts(daily_peaks_path, "date")
+    half_hourly_inputs: list[pl.LazyFrame] = []
+    daily_inputs: list[pl.LazyFrame] = []
+    # Most substations share the same start times, and building a datetime literal is slow-ish.
+    literals = {
+        start: pl.lit(start, dtype=_UTC_DATETIME)
+        for start in {*half_hourly_from.values(), *daily_from.values()}
+    }
+    for substation, lf in flows.items():
+        lf = _with_all_flow_columns(lf).with_columns(substation=pl.lit(substation))
+        for inputs, starts in ((half_hourly_inputs, half_hourly_from), (daily_inputs, daily_from)):
+            start = starts.get(substation)
+            inputs.append(
+                lf if start is None else lf.filter(pl.col("timestamp") >= literals[start])
+            )
+
+    # Both rollups, for all substations, in one pass over the (filtered) flows.
+    new_half_hourly, new_daily_peaks = pl.collect_all(
+        [
+            rollup_half_hourly(pl.concat(half_hourly_inputs, how="vertical")),
+            daily_peaks(pl.concat(daily_inputs, how="vertical")),
+        ]
+        if flows
+        else [
+            pl.LazyFrame(schema=HalfHourlySubstationFlows.dtypes),
+            pl.LazyFrame(schema=DailySubstationPeaks.dtypes),
+        ]
+    )
+    _merge(
+        HalfHourlySubstationFlows,
+        half_hourly_path,
+        HalfHourlySubstationFlows.validate(new_half_hourly),
+        "timestamp",
+        half_hourly_from,
+        list(flows),
+    )
+    _merge(
+        DailySubstationPeaks,
+        daily_peaks_path,
+        DailySubstationPeaks.validate(new_daily_peaks),
+        "date",
+        daily_from,
+        list(flows),
+    )
+
+
+def concat_substation_flows(flows: Mapping[str, pl.LazyFrame]) -> pl.LazyFrame:
+    """Concatenate the flows of many substations, into the long format used by this module.
+
+    Args:
+        flows: Maps each substation to its `SubstationFlows`, sorted by timestamp.
+
+    Returns:
+        A `LazyFrame` with a `substation` column, plus all the `SubstationFlows` columns (filled
+        with nulls for substations which don't report that flow).
+    """
+    if not flows:
+        return pl.LazyFrame(schema={"substation": pl.String, **SubstationFlows.dtypes})
+    return pl.concat(
+        [
+            _with_all_flow_columns(lf).with_columns(substation=pl.lit(substation))
+            for substation, lf in flows.items()
+        ],
+        how="vertical",
+    )
+
+
+def _with_all_flow_columns(lf: pl.LazyFrame) -> pl.LazyFrame:
+    schema = lf.collect_schema()
+    return lf.select(
+        "timestamp",
+        *(
+            pl.col(column) if column in schema else pl.lit(None, dtype=pl.Float32).alias(column)
+            for column in FLOW_COLUMNS
+        ),
+    )
+
+
+def _last_stored_period_starts(path: Path, period_column: str) -> dict[str, datetime]:
+    """Maps each substation in the rollup at `path` to the start of its last stored period."""
+    if not path.exists():
+        return {}
+    last = (
+        pl.scan_parquet(path)
+        .group_by("substation")
+        .agg(pl.col(period_column).max().cast(_UTC_DATETIME))
+        .collect()
+    )
+    return dict(last.iter_rows())
+
+
+def _merge(
+    model: type[pt.Model],
+    path: Path,
+    new: pl.DataFrame,
+    period_column: str,
+    recomputed_from: Mapping[str, datetime],
+    substations: list[str],
+) -> None:
+    """Replace the recomputed periods of `substations` in the parquet file at `path` with `new`.
+
+    The file is written by `write_parquet`, with the Arrow schema and parquet settings of `model`,
+    the file's contract.
+    """
+    if path.exists():
+        # Keep the old rows of the substations which weren't recomputed, and the old rows before
+        # `recomputed_from` of those which were.
+        keep_before = pl.LazyFrame(
+            {
+                "substation": substations,
+                "_keep_before": [recomputed_from.get(substation) for substation in substations],
+            },
+            schema={"substation": pl.String, "_keep_before": _UTC_DATETIME},
+        )
+        old = (
+            pl.scan_parquet(path)
+            .join(keep_before, on="substation", how="left")
+            .filter(
+                pl.col("_keep_before").is_null()
+                | (pl.col(period_column).cast(_UTC_DATETIME) < pl.col("_keep_before"))
+            )
+            .drop("_keep_before")
+        )
+        merged = pl.concat((old, new.lazy()), how="vertical")
+    else:
+        merged = new.lazy()
+    with atomic_write(path) as tmp_path:
+        write_parquet(model, merged.sort(parquet_settings(model).sort_by).collect(), tmp_path)
@@ -0,0 +1,33 @@
+from collections.abc import Callable, Iterator
+
+import httpx
+import pytest
+from fakes import FakeCkanServer
+from nged_data import ckan
+from nged_data.ckan_client import CkanClient
+from nged_data.http_resilience import RetryPolicy
+
+
+@pytest.fixture
+def fake_ckan() -> Iterator[FakeCkanServer]:
+    """A local fake CKAN server, which `nged_data.ckan` is configured to talk to."""
+    with FakeCkanServer(n_resources=20) as server:
+        ckan.set_ckan_client(CkanClient(server.base_url, api_key="fake-token"))
+        yield server
+        ckan.set_ckan_client(None)
+        ckan._package_search_cache.clear()
+
+
+@pytest.fixture
+def make_client() -> Callable[..., CkanClient]:
+    """A factory of `CkanClient`s whose requests are all answered by `handler`, retrying quickly."""
+
+    def make_client(handler: Callable[[httpx.Request], httpx.Response], **kwargs) -> CkanClient:
+        return CkanClient(
+            "https://ckan.example.com",
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(max_attempts=3, backoff_base=0.001),
+            **kwargs,
+        )
+
+    return make_client
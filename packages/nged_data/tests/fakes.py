@@ -0,0 +1,239 @@
+"""A local stand-in for NGED's CKAN portal, for tests and benchmarks.
+
+Serves `package_search`, `resource_search`, and CSV bodies copied from `example_csv_data`, with
+configurable latency, throttling and number of resources. CSV downloads support `ETag` /
+`If-None-Match` and `Range` requests, like the real portal's file server.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import cycle
+from pathlib import Path
+from typing import Any, Final, Self
+from urllib.parse import parse_qs, urlparse
+
+EXAMPLE_CSV_DIR: Final[Path] = Path(__file__).parents[1] / "example_csv_data"
+LOCATIONS_CSV_FILENAME: Final[str] = "primary_substation_locations.csv"
+LIVE_CSV_FILENAMES: Final[list[str]] = [
+    "aberaeron-primary-transformer-flows.csv",
+    "abington-primary-transformer-flows.csv",
+    "albrighton-11kv-primary-transformer-flows.csv",
+    "filton-dc-primary-transformer-flows.csv",
+    "regent-street.csv",
+    "milford-haven-grid.csv",
+]
+
+
+class FakeCkanServer:
+    """A threaded HTTP server which behaves (just enough) like NGED's CKAN portal.
+
+    Example:
+        ```python
+        with FakeCkanServer(n_resources=2_000, latency=0.05) as server:
+            ckan.set_ckan_client(CkanClient(server.base_url))
+            resources = ckan.get_csv_resources_for_live_primary_substation_flows()
+        ```
+    """
+
+    def __init__(
+        self,
+        n_resources: int = 20,
+        latency: float = 0.0,
+        max_requests_per_second: float | None = None,
+        resources_per_package: int = 50,
+    ) -> None:
+        """Initialise the server. It starts listening when used as a context manager.
+
+        Args:
+            n_resources: The number of live primary CSV resources to serve.
+            latency: Seconds to sleep before responding to each request.
+            max_requests_per_second: If set, respond "429 Too Many Requests" (with a Retry-After
+                header) to requests above this rate.
+            resources_per_package: The number of resources in each CKAN package.
+        """
+        self.n_resources = n_resources
+        self.latency = latency
+        self.max_requests_per_second = max_requests_per_second
+        self.resources_per_package = resources_per_package
+        self.n_requests = 0
+        self.n_throttled = 0
+        self.n_bytes_sent = 0
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._requests_in_window = 0
+        self.resources: list[dict[str, Any]] = []
+        self.bodies: dict[str, bytes] = {}
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None, "Use FakeCkanServer as a context manager."
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> Self:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        now = _utc_now_isoformat()
+        templates = cycle((EXAMPLE_CSV_DIR / name).read_bytes() for name in LIVE_CSV_FILENAMES)
+        for i, body in zip(range(self.n_resources), templates, strict=False):
+            filename = f"substation-{i:04d}-primary-transformer-flows.csv"
+            self.bodies[filename] = body
+            self.resources.append(
+                {
+                    "created": now,
+                    "description": None,
+                    "format": "CSV",
+                    "id": f"resource-{i:04d}",
+                    "last_modified": now,
+                    "metadata_modified": now,
+                    "mimetype": "text/csv",
+                    "name": f"Substation {i:04d} Primary Transformer Flows",
+                    "package_id": f"package-{i // self.resources_per_package:03d}",
+                    "size": len(body),
+                    "state": "active",
+                    "url": f"{self.base_url}/download/{filename}",
+                }
+            )
+        self.bodies[LOCATIONS_CSV_FILENAME] = (
+            EXAMPLE_CSV_DIR / LOCATIONS_CSV_FILENAME
+        ).read_bytes()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        assert self._server is not None
+        self._server.shutdown()
+        self._server.server_close()
+
+    def packages(self, modified_since: str | None = None) -> list[dict[str, Any]]:
+        packages: dict[str, dict[str, Any]] = {}
+        for resource in self.resources:
+            package_id = resource["package_id"]
+            package = packages.setdefault(package_id, {"id": package_id, "resources": []})
+            package["resources"].append(resource)
+            package["metadata_modified"] = max(
+                package.get("metadata_modified", ""), resource["metadata_modified"]
+            )
+        return [
+            package
+            for package in packages.values()
+            if modified_since is None or package["metadata_modified"] >= modified_since
+        ]
+
+    def modify_resource(self, resource_id: str) -> None:
+        """Simulate NGED updating a resource's metadata (e.g. after uploading new data)."""
+        resource = next(r for r in self.resources if r["id"] == resource_id)
+        resource["metadata_modified"] = resource["last_modified"] = _utc_now_isoformat()
+
+    def delete_resource(self, resource_id: str) -> None:
+        self.resources = [r for r in self.resources if r["id"] != resource_id]
+
+    def _is_throttled(self) -> bool:
+        with self._lock:
+            self.n_requests += 1
+            if self.max_requests_per_second is None:
+                return False
+            now = time.monotonic()
+            if now - self._window_start >= 1:
+                self._window_start, self._requests_in_window = now, 0
+            self._requests_in_window += 1
+            if self._requests_in_window > self.max_requests_per_second:
+                self.n_throttled += 1
+                return True
+            return False
+
+
+def _utc_now_isoformat() -> str:
+    # Like CKAN, timestamps are in UTC but without a timezone.
+    return datetime.now(UTC).replace(tzinfo=None).isoformat()
+
+
+def _parse_modified_since(fq: str | None) -> str | None:
+    """Parse the filter query `metadata_modified:[<timestamp>Z TO *]`, which is all we support."""
+    if fq is None:
+        return None
+    prefix, suffix = "metadata_modified:[", "Z TO *]"
+    assert fq.startswith(prefix) and fq.endswith(suffix), f"Unsupported filter query {fq=}"
+    return fq.removeprefix(prefix).removesuffix(suffix)
+
+
+def _make_handler(server: FakeCkanServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Enables keep-alive.
+
+        def do_GET(self) -> None:
+            if server.latency:
+                time.sleep(server.latency)
+            if server._is_throttled():
+                self._send(429, b"Too many requests", headers={"Retry-After": "1"})
+                return
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == "/api/3/action/package_search":
+                start, rows = int(params.get("start", 0)), int(params.get("rows", 10))
+                packages = server.packages(modified_since=_parse_modified_since(params.get("fq")))
+                self._send_action_result(
+                    {
+                        "count": len(packages),
+                        "facets": {},
+                        "results": packages[start : start + rows],
+                        "sort": params.get("sort", "score desc, metadata_modified desc"),
+                        "search_facets": {},
+                    }
+                )
+            elif url.path == "/api/3/action/resource_search":
+                locations = {
+                    "format": "CSV",
+                    "id": "locations",
+                    "url": f"{server.base_url}/download/{LOCATIONS_CSV_FILENAME}",
+                }
+                self._send_action_result({"count": 1, "results": [locations]})
+            elif url.path.startswith("/download/"):
+                self._send_file(url.path.removeprefix("/download/"))
+            else:
+                self._send(404, b"Not found")
+
+        def _send_action_result(self, result: dict[str, Any]) -> None:
+            body = json.dumps({"success": True, "result": result}).encode()
+            self._send(200, body, headers={"Content-Type": "application/json"})
+
+        def _send_file(self, filename: str) -> None:
+            body = server.bodies.get(filename)
+            if body is None:
+                self._send(404, b"Not found")
+                return
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", headers={"ETag": etag})
+                return
+            range_header = self.headers.get("Range")
+            if range_header and range_header.startswith("bytes="):
+                start = int(range_header.removeprefix("bytes=").split("-")[0])
+                if start >= len(body):
+                    self._send(416, b"", headers={"Content-Range": f"bytes */{len(body)}"})
+                    return
+                content_range = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                self._send(
+                    206, body[start:], headers={"ETag": etag, "Content-Range": content_range}
+                )
+                return
+            self._send(200, body, headers={"ETag": etag, "Content-Type": "text/csv"})
+
+        def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with server._lock:
+                server.n_bytes_sent += len(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return Handler
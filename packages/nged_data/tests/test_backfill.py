@@ -0,0 +1,147 @@
+import polars as pl
+import pytest
+from contracts.incremental_validation import read_watermark
+from nged_data import ckan
+from nged_data.backfill import (
+    BackfillProgress,
+    _worker_rate_limiter,
+    backfill,
+    dataset_keys_for_historical_resources,
+)
+from nged_data.compact_flows import scan_substation_flows, write_substation_flows
+from nged_data.download_manifest import DownloadManifest
+from nged_data.http_resilience import AdaptiveRateLimiter
+from polars.testing import assert_frame_equal
+
+
+def test_backfill_resumes_after_interruption(fake_ckan, tmp_path):
+    resources = ckan.get_csv_resources_for_historical_primary_substation_flows()[:6]
+    dataset_keys = {resource.id: f"substation-{i % 3}" for i, resource in enumerate(resources)}
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    dataset_dir = tmp_path / "flows"
+    raw_dir = tmp_path / "raw"
+
+    # An "interrupted" backfill, which only got through the first two resources.
+    backfill(resources[:2], dataset_keys, dataset_dir, raw_dir, manifest, max_workers=2)
+    n_requests = fake_ckan.n_requests
+    progress_reports: list[BackfillProgress] = []
+    progress = backfill(
+        resources,
+        dataset_keys,
+        dataset_dir,
+        raw_dir,
+        manifest,
+        max_workers=2,
+        on_progress=lambda p: progress_reports.append(p.model_copy()),
+    )
+
+    assert fake_ckan.n_requests - n_requests == 4
+    assert (progress.n_skipped, progress.n_done) == (2, 4)
+    assert progress.n_bytes_remaining == 0
+    assert progress.rows_per_second > 0
+    assert [p.n_done for p in progress_reports] == [0, 1, 2, 3, 4]
+    assert sorted(path.stem for path in dataset_dir.glob("*.parquet")) == [
+        "substation-0",
+        "substation-1",
+        "substation-2",
+    ]
+    # Substation 0 has two resources, which have the same (example) CSV content.
+    substation_0 = scan_substation_flows(dataset_dir / "substation-0.parquet").collect()
+    assert substation_0["timestamp"].is_sorted()
+    assert substation_0["timestamp"].is_unique().all()
+
+    assert backfill(resources, dataset_keys, dataset_dir, raw_dir, manifest).n_skipped == 6
+    # The raw CSVs were streamed into the content-addressed store.
+    assert len(list(raw_dir.rglob("*.csv"))) == 6
+    assert not list((raw_dir / "tmp").glob("*"))
+
+
+def test_backfill_keeps_existing_rows(fake_ckan, tmp_path):
+    resources = ckan.get_csv_resources_for_historical_primary_substation_flows()[:1]
+    dataset_keys = {resources[0].id: "substation"}
+    path = tmp_path / "flows" / "substation.parquet"
+    backfill(
+        resources, dataset_keys, path.parent, tmp_path / "raw", DownloadManifest(tmp_path / "1")
+    )
+    existing = scan_substation_flows(path).collect().with_columns(MVA=pl.lit(1.25, pl.Float32))
+    write_substation_flows(existing, path)
+
+    # Backfill the same resource again, from scratch.
+    backfill(
+        resources, dataset_keys, path.parent, tmp_path / "raw", DownloadManifest(tmp_path / "2")
+    )
+
+    assert_frame_equal(scan_substation_flows(path).collect(), existing)
+    # The next update of the live flows only needs to parse the rows after the watermark.
+    watermark = read_watermark(path)
+    assert watermark is not None
+    assert (watermark.validated_up_to, watermark.n_rows) == (
+        existing["timestamp"][-1],
+        existing.height,
+    )
+
+
+def test_backfill_stops_at_the_first_failure(fake_ckan, tmp_path):
+    resources = ckan.get_csv_resources_for_historical_primary_substation_flows()[:10]
+    dataset_keys = {resource.id: resource.id for resource in resources}
+    del fake_ckan.bodies[resources[0].url.path.removeprefix("/download/")]
+    n_requests = fake_ckan.n_requests
+
+    with pytest.raises(Exception, match="404"):
+        backfill(
+            resources,
+            dataset_keys,
+            tmp_path / "flows",
+            tmp_path / "raw",
+            DownloadManifest(tmp_path / "manifest.sqlite"),
+            max_workers=1,
+        )
+
+    # Only the resources already queued for the worker were downloaded. The rest were cancelled.
+    assert fake_ckan.n_requests - n_requests < 5
+
+
+def test_workers_share_the_rate_limit():
+    rate_limiter = AdaptiveRateLimiter(rate=10.0, burst=10, max_rate=50.0)
+
+    settings = _worker_rate_limiter(rate_limiter, n_workers=4)
+
+    assert settings["rate"] * 4 == rate_limiter.rate
+    assert settings["max_rate"] * 4 == rate_limiter.max_rate
+    assert settings["burst"] * 4 <= rate_limiter.burst
+
+
+def test_backfill_includes_old_resources(fake_ckan, tmp_path):
+    # Most of the historical archive hasn't been modified for years.
+    fake_ckan.resources[0]["last_modified"] = "2019-04-01T09:30:00"
+
+    resources = ckan.get_csv_resources_for_historical_primary_substation_flows()
+    dataset_keys = {resource.id: resource.id for resource in resources}
+    progress = backfill(
+        resources[:1],
+        dataset_keys,
+        tmp_path / "flows",
+        tmp_path / "raw",
+        DownloadManifest(tmp_path / "manifest.sqlite"),
+        max_workers=1,
+    )
+
+    assert resources[0].id == "resource-0000"
+    assert progress.n_done == 1
+    assert scan_substation_flows(tmp_path / "flows" / "resource-0000.parquet").collect().height
+
+
+def test_dataset_keys_for_historical_resources(fake_ckan):
+    resources = ckan.get_csv_resources_for_historical_primary_substation_flows()
+    live = [
+        resources[0].model_copy(
+            update={"name": "Substation 0000 Primary", "url": "https://example.com/live-0000.csv"}
+        )
+    ]
+
+    keys = dataset_keys_for_historical_resources(resources[:2], live)
+
+    assert keys == {
+        resources[0].id: "live-0000",
+        resources[1].id: "substation-0001-primary-transformer-flows",
+    }
@@ -0,0 +1,325 @@
+import asyncio
+import hashlib
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import obstore
+import pytest
+from nged_data import ckan
+from nged_data.ckan_client import CkanClient
+from nged_data.content_store import ContentAddressedStore
+from nged_data.download_manifest import DownloadManifest
+from nged_data.schemas import CkanResource
+from obstore.store import LocalStore
+
+
+def make_resource(name: str) -> CkanResource:
+    return CkanResource.model_validate(make_resource_dict(name))
+
+
+def make_resource_dict(name: str, package_id: str = "package-id") -> dict:
+    return {
+        "created": "2026-01-01T00:00:00",
+        "description": None,
+        "format": "CSV",
+        "id": f"id-{name}",
+        "last_modified": "2026-01-02T00:00:00",
+        "metadata_modified": "2026-01-02T00:00:00",
+        "mimetype": "text/csv",
+        "name": name,
+        "package_id": package_id,
+        "size": 1_000,
+        "state": "active",
+        "url": f"https://ckan.example.com/{name}.csv",
+    }
+
+
+@pytest.fixture
+def use_mock_transport():
+    def _use_mock_transport(handler) -> None:
+        transport = httpx.MockTransport(handler)
+        ckan.set_ckan_client(
+            CkanClient(
+                "https://ckan.example.com",
+                api_key="secret",
+                transport=transport,
+                async_transport=transport,
+            )
+        )
+
+    yield _use_mock_transport
+    ckan.set_ckan_client(None)
+    ckan._package_search_cache.clear()
+
+
+async def collect(resources: list[CkanResource], max_concurrency: int) -> dict[str, bytes]:
+    return {
+        resource.name: content
+        async for resource, content in ckan.download_resources_concurrently(
+            resources, max_concurrency=max_concurrency
+        )
+    }
+
+
+def test_download_resources_concurrently(use_mock_transport):
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, content=request.url.path.encode())
+
+    use_mock_transport(handler)
+    resources = [make_resource(f"substation_{i}") for i in range(20)]
+
+    downloaded = asyncio.run(collect(resources, max_concurrency=4))
+
+    assert downloaded == {r.name: f"/{r.name}.csv".encode() for r in resources}
+    assert max_in_flight == 4
+
+
+def test_download_resources_concurrently_raises_on_http_error(use_mock_transport):
+    use_mock_transport(lambda request: httpx.Response(404))
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(collect([make_resource("missing")], max_concurrency=2))
+
+
+def test_download_resource_if_modified(use_mock_transport, tmp_path):
+    content = b"timestamp,MW\n2026-01-01T00:00:00Z,1.0\n"
+    requests_seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+
+    use_mock_transport(handler)
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    url = "https://ckan.example.com/substation.csv"
+
+    # First download: No manifest entry yet, so we get the content.
+    download = ckan.download_resource_if_modified("resource-id", url, manifest)
+    assert download is not None
+    downloaded_content, entry = download
+    assert downloaded_content == content
+    assert "If-None-Match" not in requests_seen[-1].headers
+
+    # The caller hasn't recorded the entry yet, so we should download again.
+    assert ckan.download_resource_if_modified("resource-id", url, manifest) is not None
+
+    # Once recorded, the server responds 304.
+    manifest.put(entry)
+    assert manifest.get("resource-id") == entry
+    assert ckan.download_resource_if_modified("resource-id", url, manifest) is None
+    assert requests_seen[-1].headers["If-None-Match"] == '"v1"'
+
+
+def test_download_resource_if_modified_skips_unchanged_content(use_mock_transport, tmp_path):
+    # A server which ignores conditional headers.
+    use_mock_transport(lambda request: httpx.Response(200, content=b"a,b\n1,2\n"))
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    url = "https://ckan.example.com/substation.csv"
+
+    download = ckan.download_resource_if_modified("resource-id", url, manifest)
+    assert download is not None
+    manifest.put(download[1])
+
+    assert ckan.download_resource_if_modified("resource-id", url, manifest) is None
+
+
+def test_download_unprocessed_resource_retries_failed_processing(use_mock_transport, tmp_path):
+    content = b"timestamp,MW\n2026-01-01T00:00:00Z,1.0\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=content, headers={"ETag": '"v1"'})
+
+    use_mock_transport(handler)
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    store = ContentAddressedStore(LocalStore(prefix=tmp_path / "sha256", mkdir=True))
+    url = "https://ckan.example.com/substation.csv"
+
+    sha256 = ckan.download_unprocessed_resource("resource-id", url, manifest, store)
+    assert sha256 == hashlib.sha256(content).hexdigest()
+    assert store.get(sha256) == content
+
+    # The processing failed, so `mark_processed` wasn't called. The server now responds 304, but
+    # the content still needs processing.
+    assert ckan.download_unprocessed_resource("resource-id", url, manifest, store) == sha256
+
+    manifest.mark_processed("resource-id", sha256)
+    assert ckan.download_unprocessed_resource("resource-id", url, manifest, store) is None
+
+
+def make_csv(start_row: int, end_row: int) -> bytes:
+    t0 = datetime(2026, 1, 1, tzinfo=UTC)
+    rows = [
+        f"{t0 + timedelta(minutes=5 * i):%Y-%m-%dT%H:%M:%S+00:00},{i}\n"
+        for i in range(start_row, end_row)
+    ]
+    return ("ValueDate,MW\n" + "".join(rows)).encode()
+
+
+def serve_with_range_support(content: bytes):
+    def handler(request: httpx.Request) -> httpx.Response:
+        range_header = request.headers.get("Range")
+        if range_header is None:
+            return httpx.Response(200, content=content)
+        start = int(range_header.removeprefix("bytes=").removesuffix("-"))
+        return httpx.Response(
+            206,
+            content=content[start:],
+            headers={"Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}"},
+        )
+
+    return handler
+
+
+@pytest.mark.parametrize(
+    ("first_rows", "second_rows"),
+    [
+        ((0, 500), (0, 510)),  # Append-only.
+        ((0, 500), (10, 510)),  # Rolling window.
+    ],
+)
+def test_download_resource_tail(use_mock_transport, tmp_path, first_rows, second_rows):
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    url = "https://ckan.example.com/substation.csv"
+
+    use_mock_transport(serve_with_range_support(make_csv(*first_rows)))
+    fetch, state = ckan.download_resource_tail("resource-id", url, manifest)
+    assert fetch.is_full_download
+    assert fetch.csv == make_csv(*first_rows)
+    manifest.put_tail_state(state)
+
+    use_mock_transport(serve_with_range_support(make_csv(*second_rows)))
+    now = state.last_timestamp + timedelta(minutes=50)
+    fetch, state = ckan.download_resource_tail("resource-id", url, manifest, now=now)
+    assert not fetch.is_full_download
+    assert fetch.csv == make_csv(first_rows[1], second_rows[1])
+    assert state.size == len(make_csv(*second_rows))
+
+
+def test_download_resource_tail_falls_back_if_overlap_changed(use_mock_transport, tmp_path):
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    url = "https://ckan.example.com/substation.csv"
+
+    use_mock_transport(serve_with_range_support(make_csv(0, 500)))
+    manifest.put_tail_state(ckan.download_resource_tail("resource-id", url, manifest)[1])
+
+    revised = make_csv(0, 510).replace(b",499\n", b",-499\n")
+    use_mock_transport(serve_with_range_support(revised))
+    fetch, _ = ckan.download_resource_tail("resource-id", url, manifest)
+    assert fetch.is_full_download
+    assert fetch.csv == revised
+
+
+@pytest.mark.parametrize("content_range", [None, "bytes {start}-{end}/*"])
+def test_download_resource_tail_falls_back_without_the_size(
+    use_mock_transport, tmp_path, content_range
+):
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    url = "https://ckan.example.com/substation.csv"
+
+    use_mock_transport(serve_with_range_support(make_csv(0, 500)))
+    _, state = ckan.download_resource_tail("resource-id", url, manifest)
+    manifest.put_tail_state(state)
+
+    content = make_csv(0, 510)
+    requests_seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        range_header = request.headers.get("Range")
+        if range_header is None:
+            return httpx.Response(200, content=content)
+        start = int(range_header.removeprefix("bytes=").removesuffix("-"))
+        headers = {}
+        if content_range is not None:
+            headers["Content-Range"] = content_range.format(start=start, end=len(content) - 1)
+        return httpx.Response(206, content=content[start:], headers=headers)
+
+    use_mock_transport(handler)
+    now = state.last_timestamp + timedelta(minutes=50)
+    fetch, state = ckan.download_resource_tail("resource-id", url, manifest, now=now)
+    assert [request.headers.get("Range") is not None for request in requests_seen] == [True, False]
+    assert fetch.is_full_download
+    assert fetch.csv == content
+    assert state.size == len(content)
+
+
+def serve_package_search(n_packages: int, requests_seen: list[httpx.Request]):
+    packages = [
+        {"id": f"package-{i:03d}", "resources": [make_resource_dict(f"substation_{i}")]}
+        for i in range(n_packages)
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests_seen.append(request)
+        start, rows = int(request.url.params["start"]), int(request.url.params["rows"])
+        result = {
+            "count": n_packages,
+            "facets": {},
+            "results": packages[start : start + rows],
+            "sort": request.url.params["sort"],
+            "search_facets": {},
+        }
+        return httpx.Response(200, json={"success": True, "result": result})
+
+    return handler
+
+
+def test_package_search_fetches_all_pages(use_mock_transport):
+    requests_seen = []
+    use_mock_transport(serve_package_search(n_packages=250, requests_seen=requests_seen))
+
+    result = ckan.package_search("live primary")
+
+    assert len(result.results) == 250
+    assert len(requests_seen) == 3
+    assert {r.resources[0].name for r in result.results} == {f"substation_{i}" for i in range(250)}
+
+
+def test_package_search_cache(use_mock_transport, tmp_path):
+    requests_seen = []
+    use_mock_transport(serve_package_search(n_packages=5, requests_seen=requests_seen))
+
+    first = ckan.package_search("live primary", cache_dir=tmp_path)
+    assert len(requests_seen) == 1
+
+    # Cached in memory.
+    assert ckan.package_search("live primary", cache_dir=tmp_path) == first
+    assert len(requests_seen) == 1
+
+    # Cached on disk (e.g. for another process).
+    ckan._package_search_cache.clear()
+    assert ckan.package_search("live primary", cache_dir=tmp_path) == first
+    assert len(requests_seen) == 1
+
+    # Expired.
+    ckan.package_search("live primary", ttl=timedelta(0), cache_dir=tmp_path)
+    assert len(requests_seen) == 2
+
+
+def test_stream_resource_to_store(use_mock_transport, tmp_path):
+    content = make_csv(0, 5_000)
+    use_mock_transport(lambda request: httpx.Response(200, content=content))
+    store = LocalStore(prefix=tmp_path)
+
+    entry = ckan.stream_resource_to_store(
+        "resource-id",
+        "https://ckan.example.com/substation.csv",
+        store,
+        "raw/substation.csv",
+        chunk_size=64 * 1024,
+    )
+
+    assert obstore.get(store, "raw/substation.csv").bytes() == content
+    assert entry.content_length == len(content)
+    assert entry.sha256 == hashlib.sha256(content).hexdigest()
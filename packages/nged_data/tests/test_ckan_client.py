@@ -0,0 +1,38 @@
+import httpx
+import pytest
+
+URL = "https://ckan.example.com/file.csv"
+
+
+def test_ckan_client_reuses_one_pooled_client_with_auth_headers(make_client):
+    seen_auth_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_auth_headers.append(request.headers.get("Authorization"))
+        return httpx.Response(200, content=b"a,b\n1,2\n")
+
+    with make_client(handler, api_key="secret") as client:
+        http = client.http
+        for _ in range(3):
+            assert client.get(URL).content == b"a,b\n1,2\n"
+        assert client.http is http
+
+    assert seen_auth_headers == ["secret"] * 3
+
+
+def test_ckan_client_action(make_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/3/action/package_search"
+        assert request.url.params["q"] == 'title:"live primary"'
+        return httpx.Response(200, json={"success": True, "result": {"count": 0}})
+
+    with make_client(handler) as client:
+        assert client.action("package_search", q='title:"live primary"') == {"count": 0}
+
+
+def test_ckan_client_action_raises_if_unsuccessful(make_client):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"success": False, "error": {"message": "Nope"}})
+
+    with make_client(handler) as client, pytest.raises(RuntimeError, match="Nope"):
+        client.action("package_search", q="foo")
@@ -0,0 +1,74 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+from nged_data.compact_flows import scan_substation_flows, write_substation_flows
+from nged_data.process_flows import process_live_primary_substation_flows
+from polars.testing import assert_frame_equal
+
+EXAMPLE_DATA_DIR = Path(__file__).parent.parent / "example_csv_data"
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize(
+    "csv_filename",
+    [
+        "aberaeron-primary-transformer-flows.csv",
+        "abington-primary-transformer-flows.csv",
+        "filton-dc-primary-transformer-flows.csv",
+        "regent-street.csv",
+    ],
+)
+def test_round_trip(csv_filename: str, compact: bool, tmp_path):
+    df = process_live_primary_substation_flows(EXAMPLE_DATA_DIR / csv_filename)
+    path = tmp_path / "flows.parquet"
+
+    write_substation_flows(df, path, compact=compact)
+
+    assert_frame_equal(scan_substation_flows(path).collect(), df)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_metadata_is_written(compact: bool, tmp_path):
+    df = process_live_primary_substation_flows(EXAMPLE_DATA_DIR / "regent-street.csv")
+    path = tmp_path / "flows.parquet"
+
+    write_substation_flows(df, path, compact=compact, metadata={"key": "value"})
+
+    assert pl.read_parquet_metadata(path)["key"] == "value"
+    assert_frame_equal(scan_substation_flows(path).collect(), df)
+    # The first column (the timestamp, or its 5-minute period) is the sort order.
+    assert pq.ParquetFile(path).metadata.row_group(0).sorting_columns == (pq.SortingColumn(0),)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_unsorted_flows_are_rejected(compact: bool, tmp_path):
+    df = process_live_primary_substation_flows(EXAMPLE_DATA_DIR / "regent-street.csv")
+
+    with pytest.raises(ValueError, match="must be sorted"):
+        write_substation_flows(df.reverse(), tmp_path / "flows.parquet", compact=compact)
+
+
+def test_compact_encoding_is_smaller(tmp_path):
+    df = process_live_primary_substation_flows(
+        EXAMPLE_DATA_DIR / "albrighton-11kv-primary-transformer-flows.csv"
+    )
+
+    write_substation_flows(df, tmp_path / "plain.parquet")
+    write_substation_flows(df, tmp_path / "compact.parquet", compact=True)
+
+    assert (tmp_path / "compact.parquet").stat().st_size < (
+        tmp_path / "plain.parquet"
+    ).stat().st_size / 2
+
+
+def test_compact_encoding_rejects_timestamps_off_the_grid(tmp_path):
+    df = pl.DataFrame(
+        {"timestamp": [datetime(2026, 1, 1, 0, 7, tzinfo=UTC)], "MW": [1.0]},
+        schema={"timestamp": pl.Datetime(time_zone="UTC"), "MW": pl.Float32},
+    )
+
+    with pytest.raises(ValueError, match="5-minute grid"):
+        write_substation_flows(df, tmp_path / "flows.parquet", compact=True)
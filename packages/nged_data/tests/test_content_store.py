@@ -0,0 +1,35 @@
+import hashlib
+
+from nged_data.content_store import ContentAddressedStore
+from nged_data.download_manifest import DownloadManifest
+from obstore.store import LocalStore
+
+
+def test_content_addressed_store_deduplicates(tmp_path):
+    store = ContentAddressedStore(LocalStore(prefix=tmp_path, mkdir=True), suffix=".csv")
+    content = b"ValueDate,MW\n2026-01-01T00:05:00+00:00,1.0\n"
+
+    sha256 = store.put(content)
+    assert sha256 == hashlib.sha256(content).hexdigest()
+    assert store.exists(sha256)
+    assert store.get(sha256) == content
+
+    # Storing the same content again doesn't create another copy.
+    assert store.put(content) == sha256
+    assert [p.name for p in tmp_path.rglob("*.csv")] == [f"{sha256}.csv"]
+
+    assert not store.exists(hashlib.sha256(b"other").hexdigest())
+
+
+def test_download_manifest_content_index(tmp_path):
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+
+    manifest.put_content_hash("resource-id", "2026-01-01", "abc")
+    manifest.put_content_hash("resource-id", "2026-01-02", "abc")
+    assert manifest.get_content_hash("resource-id", "2026-01-02") == "abc"
+    assert manifest.get_content_hash("resource-id", "2026-01-03") is None
+
+    assert not manifest.is_processed("resource-id", "abc")
+    manifest.mark_processed("resource-id", "abc")
+    assert manifest.is_processed("resource-id", "abc")
+    assert not manifest.is_processed("other-resource-id", "abc")
@@ -0,0 +1,48 @@
+from datetime import UTC, date, datetime, timedelta
+
+import polars as pl
+from contracts.data_schemas import SubstationDailyQuality
+from nged_data.data_quality import quality_report
+from nged_data.rollups import concat_substation_flows
+
+
+def test_quality_report():
+    start = datetime(2026, 1, 1, 23, 0, tzinfo=UTC)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(12)]
+    # Miss out 23:25 and 23:30, and repeat 23:50.
+    timestamps = timestamps[:5] + timestamps[7:10] + timestamps[9:]
+    a = pl.LazyFrame(
+        {
+            "timestamp": timestamps,
+            # Stuck at 5.0 for the first 4 rows, then two sign flips, with noise around zero.
+            "MW": [5.0, 5.0, 5.0, 5.0, -2.0, 3.0, 0.1, -0.1, 0.2, 1.0, 1.0],
+        },
+        schema={"timestamp": pl.Datetime(time_zone="UTC"), "MW": pl.Float32},
+    )
+    b = pl.LazyFrame(
+        {"timestamp": [start], "MVA": [None]},
+        schema={"timestamp": pl.Datetime(time_zone="UTC"), "MVA": pl.Float32},
+    )
+
+    report = quality_report(concat_substation_flows({"a": a, "b": b}), stuck_run_length=4)
+    report = SubstationDailyQuality.validate(report.collect())
+
+    assert report.select("substation", "date", "n_rows").rows() == [
+        ("a", date(2026, 1, 1), 11),
+        ("b", date(2026, 1, 1), 1),
+    ]
+    a_report = report.row(0, named=True)
+    assert a_report["n_duplicate_timestamps"] == 1
+    assert a_report["n_missing_intervals"] == 2
+    assert a_report["MW_n_stuck"] == 4
+    assert a_report["MW_n_sign_flips"] == 2
+    assert a_report["MVA_n_null"] == 11
+    assert a_report["MVA_n_stuck"] == 0
+    assert report.row(1, named=True)["MVA_n_null"] == 1
+
+
+def test_quality_report_of_no_substations():
+    report = quality_report(concat_substation_flows({})).collect()
+
+    assert report.is_empty()
+    assert report.columns == SubstationDailyQuality.columns
@@ -0,0 +1,42 @@
+import asyncio
+
+from nged_data import ckan
+from nged_data.download_manifest import DownloadManifest
+
+
+def test_live_primary_resources_from_fake_ckan(fake_ckan):
+    resources = ckan.get_csv_resources_for_live_primary_substation_flows()
+
+    assert len(resources) == fake_ckan.n_resources
+    assert {r.id for r in resources} == {r["id"] for r in fake_ckan.resources}
+
+
+def test_primary_substation_locations_from_fake_ckan(fake_ckan):
+    locations = ckan.get_primary_substation_locations()
+
+    assert locations.height > 0
+
+
+def test_download_fleet_from_fake_ckan(fake_ckan):
+    resources = ckan.get_csv_resources_for_live_primary_substation_flows()
+
+    async def download_all() -> dict[str, bytes]:
+        return {
+            str(r.url).rsplit("/", 1)[-1]: content
+            async for r, content in ckan.download_resources_concurrently(resources)
+        }
+
+    downloaded = asyncio.run(download_all())
+
+    assert len(downloaded) == len(resources)
+    assert all(content == fake_ckan.bodies[name] for name, content in downloaded.items())
+
+
+def test_second_refresh_is_not_modified(fake_ckan, tmp_path):
+    manifest = DownloadManifest(tmp_path / "manifest.sqlite")
+    resource = ckan.get_csv_resources_for_live_primary_substation_flows()[0]
+    downloaded = ckan.download_resource_if_modified(resource.id, str(resource.url), manifest)
+    assert downloaded is not None
+    manifest.put(downloaded[1])
+
+    assert ckan.download_resource_if_modified(resource.id, str(resource.url), manifest) is None
@@ -0,0 +1,22 @@
+import threading
+
+from nged_data.file_lock import file_lock, lock_path
+
+
+def test_file_lock_excludes_other_holders(tmp_path):
+    path = tmp_path / "flows.parquet"
+    acquired = threading.Event()
+
+    def hold_lock() -> None:
+        with file_lock(path):
+            acquired.set()
+
+    with file_lock(path):
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        assert not acquired.wait(timeout=0.2)
+    thread.join(timeout=5)
+
+    assert acquired.is_set()
+    assert lock_path(path).name == "flows.parquet.lock"
+    assert not path.exists()
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import patito as pt
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+from nged_data.fleet_flows import (
+    scan_multi_substation_flows,
+    to_multi_substation_flows,
+    write_multi_substation_flows,
+)
+from polars.testing import assert_frame_equal
+
+
+def test_round_trip_with_pruning(make_flows, tmp_path):
+    flows = {
+        300: make_flows(20, MW=3.0, MVAr=0.3).lazy(),
+        100: make_flows(20, MVA=1.0).lazy(),
+        200: make_flows(20, MW=2.0, MVA=2.0, MVAr=0.2).lazy(),
+    }
+    df = to_multi_substation_flows(flows).collect()
+    path = tmp_path / "fleet.parquet"
+
+    write_multi_substation_flows(df, path, row_group_size=10)
+
+    assert df["substation_number"].unique(maintain_order=True).to_list() == [100, 200, 300]
+    assert_frame_equal(scan_multi_substation_flows(path).collect(), df)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 6
+    start = df["timestamp"].min()
+    one_hour = scan_multi_substation_flows(
+        path, substation_numbers=[200], start=start, end=start + timedelta(hours=1)
+    ).collect()
+    assert one_hour["substation_number"].unique().to_list() == [200]
+    assert one_hour.height == 12
+    many = scan_multi_substation_flows(path, substation_numbers=range(101, 300)).collect()
+    assert many["substation_number"].unique().to_list() == [200]
+
+
+def test_sort_order_is_enforced(make_flows, tmp_path):
+    df = to_multi_substation_flows({1: make_flows(3, MW=1.0).lazy()}).collect()
+    path = tmp_path / "fleet.parquet"
+
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="strictly increasing"):
+        write_multi_substation_flows(df.reverse(), path)
+    with pytest.raises(pt.exceptions.DataFrameValidationError, match="strictly increasing"):
+        write_multi_substation_flows(pl.concat([df, df]), path)
+
+    df.write_parquet(path)  # Sorted, but without the sort order in its metadata.
+    with pytest.raises(ValueError, match="isn't sorted by"):
+        scan_multi_substation_flows(path)
@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from nged_data.http_resilience import (
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    parse_retry_after,
+)
+
+URL = "https://ckan.example.com/file.csv"
+
+
+def test_retries_server_errors_and_transport_errors(make_client):
+    responses = iter(
+        [httpx.ConnectError("Connection refused"), httpx.Response(503), httpx.Response(200)]
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    with make_client(handler) as client:
+        assert client.get(URL).status_code == 200
+
+
+def test_gives_up_after_max_attempts(make_client):
+    n_requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal n_requests
+        n_requests += 1
+        return httpx.Response(502)
+
+    with make_client(handler) as client:
+        assert client.get(URL).status_code == 502
+    assert n_requests == 3
+
+
+def test_throttling_halves_rate(make_client):
+    responses = iter([httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200)])
+    rate_limiter = AdaptiveRateLimiter(rate=10, rate_increase_per_success=0)
+
+    with make_client(lambda request: next(responses), rate_limiter=rate_limiter) as client:
+        assert client.get(URL).status_code == 200
+    assert rate_limiter.rate == 5
+
+
+def test_circuit_breaker_opens_after_consecutive_failures(make_client):
+    circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    with make_client(
+        lambda request: httpx.Response(503), circuit_breaker=circuit_breaker
+    ) as client:
+        client.get(URL)  # 3 failed attempts.
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+
+
+@pytest.mark.parametrize("status_code", [500, 501])
+def test_unretried_server_errors_are_failures(make_client, status_code: int):
+    rate_limiter = AdaptiveRateLimiter(rate=10.0)
+    circuit_breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    with make_client(
+        lambda request: httpx.Response(status_code),
+        rate_limiter=rate_limiter,
+        circuit_breaker=circuit_breaker,
+    ) as client:
+        for _ in range(3):
+            assert client.get(URL).status_code == status_code  # Not retried.
+        with pytest.raises(CircuitOpenError):
+            client.get(URL)
+    assert rate_limiter.rate == 10.0
+
+
+def test_client_errors_do_not_raise_the_rate(make_client):
+    rate_limiter = AdaptiveRateLimiter(rate=10.0)
+    with make_client(lambda request: httpx.Response(404), rate_limiter=rate_limiter) as client:
+        assert client.get(URL).status_code == 404
+    assert rate_limiter.rate == 10.0
+
+
+def test_circuit_breaker_half_open():
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+    circuit_breaker.record_failure()
+    circuit_breaker.record_failure()
+    circuit_breaker.check()  # The reset timeout has passed, so a trial request is allowed.
+    circuit_breaker.record_failure()  # The trial fails, so re-open straight away.
+    circuit_breaker.reset_timeout = 60
+    with pytest.raises(CircuitOpenError):
+        circuit_breaker.check()
+
+
+def test_circuit_breaker_half_open_lets_one_trial_through(make_client):
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    circuit_breaker.record_failure()
+    time.sleep(0.1)
+    trial_started, finish_trial = threading.Event(), threading.Event()
+    n_requests = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal n_requests
+        n_requests += 1
+        trial_started.set()
+        finish_trial.wait(timeout=5)
+        return httpx.Response(200)
+
+    with (
+        make_client(handler, circuit_breaker=circuit_breaker) as client,
+        ThreadPoolExecutor(max_workers=16) as executor,
+    ):
+        trial = executor.submit(client.get, URL)
+        assert trial_started.wait(timeout=5)
+        others = [executor.submit(client.get, URL) for _ in range(15)]
+        for other in others:
+            with pytest.raises(CircuitOpenError, match="trial request is in flight"):
+                other.result()
+        finish_trial.set()
+        assert trial.result().status_code == 200
+        # The trial succeeded, so the breaker is closed.
+        assert client.get(URL).status_code == 200
+    assert n_requests == 2
+
+
+def test_rate_limiter_reserve():
+    rate_limiter = AdaptiveRateLimiter(rate=10, burst=2)
+    assert rate_limiter.reserve() == 0
+    assert rate_limiter.reserve() == 0
+    assert rate_limiter.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    ("retry_after", "expected"),
+    [("120", 120), ("Wed, 21 Oct 2015 07:28:00 GMT", 0), ("garbage", None), (None, None)],
+)
+def test_parse_retry_after(retry_after: str | None, expected: float | None):
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    assert parse_retry_after(httpx.Response(429, headers=headers)) == expected
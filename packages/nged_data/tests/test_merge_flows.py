@@ -0,0 +1,52 @@
+import polars as pl
+from nged_data.merge_flows import merge_sorted_flows
+from polars.testing import assert_frame_equal
+
+
+def test_latest_download_wins_in_the_overlap(make_flows):
+    old = make_flows([0, 5, 10, 15], MW=[1.0, 2.0, 3.0, 4.0])
+    new = make_flows([10, 20, 15, 20], MW=[30.0, 50.0, 40.0, 51.0])
+
+    merged = merge_sorted_flows(old, new)
+
+    assert_frame_equal(merged, make_flows([0, 5, 10, 15, 20], MW=[1.0, 2.0, 30.0, 40.0, 51.0]))
+
+
+def test_new_rows_before_and_after_the_stored_rows(make_flows):
+    old = make_flows([10, 15], MW=[1.0, 2.0])
+
+    assert_frame_equal(
+        merge_sorted_flows(old, make_flows([20, 25], MW=[3.0, 4.0])),
+        make_flows([10, 15, 20, 25], MW=[1.0, 2.0, 3.0, 4.0]),
+    )
+    assert_frame_equal(
+        merge_sorted_flows(old, make_flows([0, 12], MW=[3.0, 4.0])),
+        make_flows([0, 10, 12, 15], MW=[3.0, 1.0, 4.0, 2.0]),
+    )
+    assert_frame_equal(merge_sorted_flows(old, make_flows([], MW=[])), old)
+
+
+def test_merge_with_different_flow_columns(make_flows):
+    old = make_flows([0, 5], MW=[1.0, 2.0])
+    new = make_flows([5, 10], MVA=[3.0, 4.0])
+
+    merged = merge_sorted_flows(old, new)
+
+    assert_frame_equal(merged, make_flows([0, 5, 10], MW=[1.0, None, None], MVA=[None, 3.0, 4.0]))
+
+
+def test_overlap_spanning_many_chunks(make_flows):
+    # Stored flows which were appended in many small chunks.
+    old = pl.concat(
+        [make_flows(range(m, m + 100, 5), MW=range(m, m + 100, 5)) for m in range(0, 10_000, 100)],
+        rechunk=False,
+    )
+    new = make_flows(range(5_005, 10_100, 10), MW=[-1.0] * 510)
+    assert old.n_chunks() == 100
+
+    merged = merge_sorted_flows(old, new)
+
+    assert merged["timestamp"].is_sorted()
+    assert merged["timestamp"].is_unique().all()
+    expected = pl.concat([old, new]).unique("timestamp", keep="last").sort("timestamp")
+    assert_frame_equal(merged, expected)
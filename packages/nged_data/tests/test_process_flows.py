@@ -1,7 +1,22 @@
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
+import polars as pl
 import pytest
-from nged_data.process_flows import process_live_primary_substation_flows
+from contracts.data_schemas import SubstationFlows
+from nged_data import process_flows
+from nged_data.process_flows import (
+    LAYOUTS,
+    CsvLayout,
+    get_layout,
+    process_live_primary_substation_flows,
+    process_many_live_primary_substation_flows,
+    register_layout,
+    scan_live_primary_substation_flows,
+    scan_many_live_primary_substation_flows,
+    sink_substation_flows,
+)
+from polars.testing import assert_frame_equal
 
 EXAMPLE_DATA_DIR = Path(__file__).parent.parent / "example_csv_data"
 
@@ -25,3 +40,291 @@ def test_primary_substation_csv_to_dataframe(csv_filename: str):
     assert df.height > 0
     assert "timestamp" in df.columns
     assert "MW" in df.columns or "MVA" in df.columns
+
+
+@pytest.mark.parametrize(
+    ("csv_filename", "height", "first_and_last_rows"),
+    [
+        (
+            "aberaeron-primary-transformer-flows.csv",
+            2016,
+            {
+                "timestamp": [datetime(2026, 1, 14, 0, 5), datetime(2026, 1, 21)],
+                "MW": [-1.812, -1.674],
+                "MVA": [1.836, 1.701],
+                "MVAr": [0.12, 0.154],
+            },
+        ),
+        (
+            "abington-primary-transformer-flows.csv",
+            2016,
+            {
+                "timestamp": [datetime(2026, 1, 14, 0, 5), datetime(2026, 1, 21)],
+                "MVA": [3.522, 3.356],
+            },
+        ),
+        (
+            "albrighton-11kv-primary-transformer-flows.csv",
+            2016,
+            {
+                "timestamp": [datetime(2026, 1, 14, 0, 5), datetime(2026, 1, 21)],
+                "MW": [-4.406, -3.888],
+                "MVA": [4.431, 3.877],
+                "MVAr": [0.995, 0.92],
+            },
+        ),
+        (
+            "filton-dc-primary-transformer-flows.csv",
+            2016,
+            {
+                "timestamp": [datetime(2026, 1, 15, 0, 5), datetime(2026, 1, 22)],
+                "MW": [-5.743, -5.598],
+                "MVAr": [0.454, 0.438],
+            },
+        ),
+        (
+            "regent-street.csv",
+            288,
+            {
+                "timestamp": [datetime(2025, 11, 11, 0, 5), datetime(2025, 11, 12)],
+                "MVA": [0.035, 0.035],
+            },
+        ),
+        (
+            "milford-haven-grid.csv",
+            288,
+            {
+                "timestamp": [datetime(2025, 11, 12, 0, 5), datetime(2025, 11, 13)],
+                "MW": [-0.101, -0.214],
+            },
+        ),
+    ],
+)
+def test_known_layouts_parse_the_example_csvs(
+    csv_filename: str, height: int, first_and_last_rows: dict[str, list]
+):
+    csv_path = EXAMPLE_DATA_DIR / csv_filename
+
+    df = process_live_primary_substation_flows(csv_path.read_bytes())
+
+    expected = pl.DataFrame(first_and_last_rows).with_columns(
+        pl.col("timestamp").dt.replace_time_zone("UTC")
+    )
+    expected = expected.cast(
+        {column: SubstationFlows.dtypes[column] for column in expected.columns}
+    )
+    assert_frame_equal(df[[0, -1]], expected)
+    assert df.height == height
+    assert df["timestamp"].diff().drop_nulls().unique().to_list() == [timedelta(minutes=5)]
+    assert df.null_count().sum_horizontal().item() == 0
+
+
+@pytest.mark.parametrize(
+    "csv_filename",
+    [
+        "abington-primary-transformer-flows.csv",
+        "albrighton-11kv-primary-transformer-flows.csv",
+        "regent-street.csv",
+    ],
+)
+def test_since_returns_only_new_rows(csv_filename: str):
+    csv_path = EXAMPLE_DATA_DIR / csv_filename
+    everything = process_live_primary_substation_flows(csv_path)
+    timestamps = everything["timestamp"]
+
+    for since in (timestamps[0], timestamps[timestamps.len() // 3], timestamps[-2]):
+        df = process_live_primary_substation_flows(csv_path, since=since)
+        assert_frame_equal(df, everything.filter(pl.col("timestamp") > since))
+
+    before_everything = process_live_primary_substation_flows(
+        csv_path.read_bytes(), since=datetime(2000, 1, 1, tzinfo=UTC)
+    )
+    assert_frame_equal(before_everything, everything)
+    assert process_live_primary_substation_flows(csv_path, since=timestamps[-1]).is_empty()
+
+
+def test_since_parses_the_whole_csv_if_rows_near_the_cut_are_out_of_order():
+    rows = [
+        f"2026-01-14T00:{minute:02d}:00+00:00,{minute / 10},11.2\n"
+        for minute in (5, 10, 30, 15, 20, 25)  # The 00:30 row is out of order.
+    ]
+    csv = ("ValueDate,MVA,Volts\n" + "".join(rows)).encode()
+
+    df = process_live_primary_substation_flows(csv, since=datetime(2026, 1, 14, 0, 20, tzinfo=UTC))
+
+    assert df["timestamp"].dt.minute().to_list() == [25, 30]
+
+
+def test_since_must_be_timezone_aware():
+    csv_path = EXAMPLE_DATA_DIR / "abington-primary-transformer-flows.csv"
+
+    with pytest.raises(ValueError, match="timezone-aware"):
+        process_live_primary_substation_flows(csv_path, since=datetime(2026, 1, 1))
+
+
+def test_unknown_layout_falls_back_to_type_inference():
+    csv = b"Timestamp,MW\n2026-01-14T00:10:00+00:00,1.5\n2026-01-14T00:05:00+00:00,1.0\n"
+
+    df = process_live_primary_substation_flows(csv)
+
+    assert df.columns == ["timestamp", "MW"]
+    assert df["MW"].to_list() == [1.0, 1.5]
+
+
+@pytest.fixture
+def layout_registry(monkeypatch):
+    """Let a test register layouts without affecting other tests."""
+    monkeypatch.setattr(process_flows, "_LAYOUTS_BY_HEADER", dict(process_flows._LAYOUTS_BY_HEADER))
+    monkeypatch.setattr(process_flows, "_READ_PLANS", dict(process_flows._READ_PLANS))
+
+
+def test_register_layout(layout_registry):
+    layout = CsvLayout(
+        name="Hypothetical",
+        header=("Date Time", "Active Power", "Reactive Power"),
+        timestamp_column="Date Time",
+        timestamp_format="%d/%m/%Y %H:%M",
+        flow_columns={"Active Power": "MW", "Reactive Power": "MVAr"},
+    )
+    csv = (
+        b"Date Time,Active Power,Reactive Power\n"
+        b"14/01/2026 00:10,1.5,0.2\n"
+        b"14/01/2026 00:05,1.0,0.1\n"
+    )
+    register_layout(layout)
+
+    df = process_live_primary_substation_flows(csv)
+
+    assert get_layout(layout.header) == layout
+    assert df.columns == ["timestamp", "MW", "MVAr"]
+    assert df["timestamp"].to_list() == [
+        datetime(2026, 1, 14, 0, 5, tzinfo=UTC),
+        datetime(2026, 1, 14, 0, 10, tzinfo=UTC),
+    ]
+    assert df["MW"].to_list() == [1.0, 1.5]
+
+
+def test_register_layout_rejects_conflicting_and_invalid_layouts(layout_registry):
+    register_layout(LAYOUTS[0])  # Re-registering the same layout is fine.
+    with pytest.raises(ValueError, match="same header"):
+        register_layout(LAYOUTS[0].model_copy(update={"name": "Imposter"}))
+    with pytest.raises(ValueError, match="aren't in its header"):
+        CsvLayout(name="Typo", header=("ValueDate", "MW"), timestamp_column="ValueDat")
+    with pytest.raises(ValueError, match="unknown flow columns"):
+        CsvLayout(
+            name="Amps",
+            header=("ValueDate", "Amps"),
+            timestamp_column="ValueDate",
+            flow_columns={"Amps": "Amps"},
+        )
+
+
+def test_long_layout_with_mixed_units_raises():
+    csv = (
+        b"site,time,unit,value\n"
+        b"Regent Street,2025-11-11T00:05:00+00:00,MVA,0.035\n"
+        b"Regent Street,2025-11-11T00:10:00+00:00,MW,0.033\n"
+    )
+
+    with pytest.raises(ValueError, match="Unexpected unit"):
+        process_live_primary_substation_flows(csv)
+
+
+def test_timestamps_with_non_utc_offsets():
+    csv = (
+        b"ValueDate,MVA,Volts\n"
+        b"2026-06-14T01:05:00+01:00,1.0,11.0\n"
+        b"2026-06-14T00:10:00+00:00,2.0,11.0\n"
+    )
+
+    df = process_live_primary_substation_flows(csv)
+
+    assert df["timestamp"].dt.strftime("%H:%M").to_list() == ["00:05", "00:10"]
+
+
+def test_process_many_live_primary_substation_flows():
+    csv_filenames = [
+        "aberaeron-primary-transformer-flows.csv",
+        "abington-primary-transformer-flows.csv",
+        "regent-street.csv",
+    ]
+
+    df = process_many_live_primary_substation_flows(
+        {name: (EXAMPLE_DATA_DIR / name).read_bytes() for name in csv_filenames}
+    )
+
+    assert df.columns == ["resource_id", "timestamp", "MW", "MVA", "MVAr"]
+    for name in csv_filenames:
+        single = process_live_primary_substation_flows(EXAMPLE_DATA_DIR / name)
+        from_many = df.filter(pl.col("resource_id") == name).select(single.columns)
+        assert_frame_equal(from_many, single)
+
+
+def test_process_many_reports_which_csv_failed():
+    bad_csv = b"site,time,unit,value\nX,2025-11-11T00:05:00+00:00,kW,1.0\n"
+
+    with pytest.raises(ValueError, match="bad.csv: Unexpected unit"):
+        process_many_live_primary_substation_flows(
+            {
+                "good.csv": EXAMPLE_DATA_DIR / "abington-primary-transformer-flows.csv",
+                "bad.csv": bad_csv,
+            }
+        )
+
+
+@pytest.mark.parametrize(
+    "csv_filename",
+    [
+        "aberaeron-primary-transformer-flows.csv",
+        "abington-primary-transformer-flows.csv",
+        "albrighton-11kv-primary-transformer-flows.csv",
+        "filton-dc-primary-transformer-flows.csv",
+        "regent-street.csv",
+        "milford-haven-grid.csv",
+    ],
+)
+def test_scan_matches_eager_processing(csv_filename: str, tmp_path):
+    csv_path = EXAMPLE_DATA_DIR / csv_filename
+    parquet_path = tmp_path / "flows.parquet"
+
+    sink_substation_flows(scan_live_primary_substation_flows(csv_path), parquet_path)
+
+    eager = process_live_primary_substation_flows(csv_path)
+    assert_frame_equal(pl.read_parquet(parquet_path).sort("timestamp"), eager)
+
+
+def test_scan_many_matches_eager_processing():
+    csv_data = {
+        name: EXAMPLE_DATA_DIR / name
+        for name in ["abington-primary-transformer-flows.csv", "regent-street.csv"]
+    }
+
+    lazy = scan_many_live_primary_substation_flows(csv_data)
+
+    eager = process_many_live_primary_substation_flows(csv_data).drop("MW", "MVAr")
+    assert_frame_equal(lazy.collect().sort("resource_id", "timestamp"), eager)
+
+
+def test_sink_substation_flows_rejects_out_of_range_values(tmp_path):
+    csv = (
+        b"ValueDate,MVA,Volts\n"
+        b"2026-01-14T00:05:00+00:00,1.0,11.0\n"
+        b"2026-01-14T00:10:00+00:00,1001.0,11.0\n"
+    )
+    parquet_path = tmp_path / "flows.parquet"
+
+    with pytest.raises(ValueError, match="MVA\n  1 row with out of bound values"):
+        sink_substation_flows(scan_live_primary_substation_flows(csv), parquet_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_scan_many_checks_units_of_long_csvs():
+    csv = (
+        b"site,time,unit,value\n"
+        b"Regent Street,2025-11-11T00:05:00+00:00,MVA,0.035\n"
+        b"Regent Street,2025-11-11T00:10:00+00:00,MW,0.033\n"
+    )
+
+    with pytest.raises(ValueError, match="regent: Unexpected unit"):
+        scan_many_live_primary_substation_flows({"regent": csv})
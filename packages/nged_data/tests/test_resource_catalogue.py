@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from nged_data import ckan
+from nged_data.resource_catalogue import ResourceCatalogue
+from nged_data.schemas import CkanResource
+
+QUERY = 'title:"live primary"'
+
+
+def refresh(catalogue: ResourceCatalogue, **kwargs):
+    return ckan.refresh_resource_catalogue(catalogue, QUERY, ttl=timedelta(0), **kwargs)
+
+
+def test_first_refresh_is_full(fake_ckan, tmp_path):
+    catalogue = ResourceCatalogue(tmp_path / "catalogue.parquet")
+
+    resources = refresh(catalogue)
+
+    assert {r.id for r in resources} == {r["id"] for r in fake_ckan.resources}
+    assert catalogue.get("resource-0003") == next(r for r in resources if r.id == "resource-0003")
+    assert [r.id for r in catalogue.find_by_name("Substation 0003 Primary Transformer Flows")] == [
+        "resource-0003"
+    ]
+    assert catalogue.get("no-such-resource") is None
+
+    # Another process can read the same catalogue without touching CKAN.
+    n_requests = fake_ckan.n_requests
+    other_process_catalogue = ResourceCatalogue(tmp_path / "catalogue.parquet")
+    assert ckan.refresh_resource_catalogue(other_process_catalogue, QUERY) == resources
+    assert fake_ckan.n_requests == n_requests
+
+
+def test_incremental_refresh_only_updates_modified_resources(fake_ckan, tmp_path):
+    catalogue = ResourceCatalogue(tmp_path / "catalogue.parquet")
+    refresh(catalogue)
+    fetched_at_before = dict(catalogue.table().select("id", "fetched_at").iter_rows())
+
+    fake_ckan.modify_resource("resource-0003")
+    fake_ckan.delete_resource("resource-0004")
+    refresh(catalogue)
+
+    fetched_at_after = dict(catalogue.table().select("id", "fetched_at").iter_rows())
+    changed = {id for id, t in fetched_at_after.items() if t != fetched_at_before[id]}
+    assert changed == {"resource-0003"}
+    # An incremental refresh can't see deletions...
+    assert catalogue.get("resource-0004") is not None
+
+    # ...but a full refresh can.
+    refresh(catalogue, full_refresh_interval=timedelta(0))
+    assert catalogue.get("resource-0004") is None
+    assert len(catalogue.resources(QUERY)) == fake_ckan.n_resources - 1
+
+
+def test_incremental_update_requires_previous_full_refresh(tmp_path):
+    catalogue = ResourceCatalogue(tmp_path / "catalogue.parquet")
+
+    with pytest.raises(ValueError, match="must be a full refresh"):
+        catalogue.update(QUERY, [], is_full_refresh=False, now=datetime.now(UTC))
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    path = tmp_path / "catalogue.parquet"
+    now = datetime(2026, 1, 2, tzinfo=UTC)
+    ResourceCatalogue(path).update(QUERY, [], is_full_refresh=True, now=now)
+
+    def add_resource(i: int) -> None:
+        resource = CkanResource.model_validate(
+            {
+                "created": "2026-01-01T00:00:00",
+                "description": None,
+                "format": "CSV",
+                "id": f"resource-{i:04d}",
+                "last_modified": "2026-01-01T00:00:00",
+                "metadata_modified": "2026-01-01T00:00:00",
+                "mimetype": "text/csv",
+                "name": f"Substation {i:04d}",
+                "package_id": "package-id",
+                "size": 1_000,
+                "state": "active",
+                "url": f"https://ckan.example.com/{i}.csv",
+            }
+        )
+        # Each "process" has its own catalogue object.
+        ResourceCatalogue(path).update(QUERY, [resource], is_full_refresh=False, now=now)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_resource, range(32)))
+
+    assert len(ResourceCatalogue(path).resources(QUERY)) == 32
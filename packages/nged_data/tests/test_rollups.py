@@ -0,0 +1,65 @@
+from datetime import UTC, date, datetime
+
+import polars as pl
+import pyarrow.parquet as pq
+from nged_data.rollups import daily_peaks, rollup_half_hourly, update_rollups
+from polars.testing import assert_frame_equal
+
+
+def test_rollup_half_hourly_and_daily_peaks(make_flows):
+    flows = make_flows(9, datetime(2026, 1, 1, 23, 30, tzinfo=UTC), MW=range(1, 10)).with_columns(
+        substation=pl.lit("a"), MVA=pl.lit(None, dtype=pl.Float32), MVAr=pl.lit(None)
+    )
+
+    half_hourly = rollup_half_hourly(flows.lazy()).collect()
+    peaks = daily_peaks(flows.lazy()).collect()
+
+    assert half_hourly["timestamp"].dt.strftime("%H:%M").to_list() == ["23:30", "00:00"]
+    assert half_hourly["n_samples"].to_list() == [6, 3]
+    assert half_hourly["MW_mean"].to_list() == [3.5, 8.0]
+    assert half_hourly["MW_min"].to_list() == [1.0, 7.0]
+    assert half_hourly["MW_last"].to_list() == [6.0, 9.0]
+    assert half_hourly["MVA_max"].to_list() == [None, None]
+    assert peaks["date"].to_list() == [date(2026, 1, 1), date(2026, 1, 2)]
+    assert peaks["MW_peak"].to_list() == [6.0, 9.0]
+    assert peaks["MW_peak_timestamp"].to_list() == [
+        datetime(2026, 1, 1, 23, 55, tzinfo=UTC),
+        datetime(2026, 1, 2, 0, 10, tzinfo=UTC),
+    ]
+    assert peaks["MVA_peak_timestamp"].to_list() == [None, None]
+
+
+def test_update_rollups_incrementally_matches_a_full_rollup(make_flows, tmp_path):
+    start = datetime(2026, 1, 1, 22, tzinfo=UTC)
+    flows = {
+        "a": make_flows(60, start, MW=range(1, 61), MVA=range(2, 62)),
+        "b": make_flows(60, start, MVA=range(10, 70)),
+    }
+    half_hourly_path = tmp_path / "half_hourly.parquet"
+    daily_peaks_path = tmp_path / "daily_peaks.parquet"
+
+    # The first update sees the first 20 rows of "a" only. The second sees everything.
+    update_rollups({"a": flows["a"].head(20).lazy()}, half_hourly_path, daily_peaks_path)
+    update_rollups(
+        {substation: df.lazy() for substation, df in flows.items()},
+        half_hourly_path,
+        daily_peaks_path,
+    )
+
+    update_rollups(
+        {substation: df.lazy() for substation, df in flows.items()},
+        tmp_path / "full_half_hourly.parquet",
+        tmp_path / "full_daily_peaks.parquet",
+    )
+    assert_frame_equal(
+        pl.read_parquet(half_hourly_path), pl.read_parquet(tmp_path / "full_half_hourly.parquet")
+    )
+    assert_frame_equal(
+        pl.read_parquet(daily_peaks_path), pl.read_parquet(tmp_path / "full_daily_peaks.parquet")
+    )
+    assert pl.read_parquet(half_hourly_path).height == 20
+    assert pl.read_parquet(daily_peaks_path)["substation"].to_list() == ["a", "a", "b", "b"]
+    # Written by the contracts' parquet writer, which records the sort order.
+    for path in (half_hourly_path, daily_peaks_path):
+        row_group = pq.ParquetFile(path).metadata.row_group(0)
+        assert row_group.sorting_columns == (pq.SortingColumn(0), pq.SortingColumn(1))
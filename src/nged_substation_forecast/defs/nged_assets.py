@@ -1,27 +1,49 @@
 """Dagster assets for NGED data."""
 
+from collections.abc import Iterator
 from pathlib import Path, PurePosixPath
 from typing import Final
 
 import polars as pl
 from dagster import (
     AddDynamicPartitionsRequest,
+    AssetCheckResult,
+    AssetCheckSeverity,
     AssetExecutionContext,
     Config,
+    DefaultScheduleStatus,
     DefaultSensorStatus,
     DynamicPartitionsDefinition,
+    MaterializeResult,
     MultiPartitionKey,
     MultiPartitionsDefinition,
+    Output,
     RunConfig,
     RunRequest,
+    ScheduleDefinition,
     SensorEvaluationContext,
     SensorResult,
     asset,
+    asset_check,
     define_asset_job,
     sensor,
 )
+from contracts.data_schemas import FLOW_COLUMNS, SubstationDailyQuality, SubstationFlows
+from contracts.incremental_validation import read_watermark, validate_appended
+from contracts.parquet import write_parquet
 from nged_data import ckan
+from nged_data.backfill import BackfillProgress, backfill, dataset_keys_for_historical_resources
+from nged_data.compact_flows import scan_substation_flows, write_substation_flows
+from nged_data.content_store import ContentAddressedStore
+from nged_data.data_quality import quality_report
+from nged_data.download_manifest import DownloadManifest
+from nged_data.file_lock import file_lock
+from nged_data.merge_flows import merge_sorted_flows
 from nged_data.process_flows import process_live_primary_substation_flows
+from nged_data.resource_catalogue import ResourceCatalogue
+from nged_data.rollups import concat_substation_flows, update_rollups
+from obstore.store import LocalStore
+from pydantic import BaseModel
 
 # Define Partitions
 # We use Multi-Partitions so every day's download is saved uniquely by (Date, Name)
@@ -32,12 +54,61 @@ composite_def = MultiPartitionsDefinition(
 )
 
 
+RAW_LIVE_PRIMARY_FLOWS_PATH: Final[Path] = Path("data") / "NGED" / "raw" / "live_primary_flows"
+RAW_HISTORICAL_PRIMARY_FLOWS_PATH: Final[Path] = (
+    Path("data") / "NGED" / "raw" / "historical_primary_flows"
+)
+CKAN_CACHE_PATH: Final[Path] = Path("data") / "NGED" / "ckan_cache"
+LIVE_PRIMARY_PARQUET_PATH: Final[Path] = Path("data") / "NGED" / "parquet" / "live_primary_flows"
+# Set to True to write the live primary parquet files in the compact encoding (see
+# `nged_data.compact_flows`). Either encoding can be read, so existing files can be left as is.
+COMPACT_LIVE_PRIMARY_PARQUET: Final[bool] = False
+LIVE_PRIMARY_HALF_HOURLY_PATH: Final[Path] = (
+    Path("data") / "NGED" / "parquet" / "live_primary_flows_half_hourly.parquet"
+)
+LIVE_PRIMARY_DAILY_PEAKS_PATH: Final[Path] = (
+    Path("data") / "NGED" / "parquet" / "live_primary_daily_peaks.parquet"
+)
+LIVE_PRIMARY_QUALITY_PATH: Final[Path] = (
+    Path("data") / "NGED" / "parquet" / "live_primary_daily_quality.parquet"
+)
+
+
+def get_download_manifest() -> DownloadManifest:
+    return DownloadManifest(RAW_LIVE_PRIMARY_FLOWS_PATH / ckan.DOWNLOAD_MANIFEST_FILENAME)
+
+
+def get_resource_catalogue() -> ResourceCatalogue:
+    return ResourceCatalogue(CKAN_CACHE_PATH / ckan.RESOURCE_CATALOGUE_FILENAME)
+
+
+def get_historical_download_manifest() -> DownloadManifest:
+    return DownloadManifest(RAW_HISTORICAL_PRIMARY_FLOWS_PATH / ckan.DOWNLOAD_MANIFEST_FILENAME)
+
+
+def get_raw_csv_store() -> ContentAddressedStore:
+    """Raw CSVs are stored by content hash, so identical downloads are only stored once."""
+    store = LocalStore(prefix=RAW_LIVE_PRIMARY_FLOWS_PATH / "sha256", mkdir=True)
+    return ContentAddressedStore(store, suffix=".csv")
+
+
 class CkanCsvConfig(Config):
     url: str
+    resource_id: str
 
 
-@asset(partitions_def=composite_def)
-def live_primary_csv(context: AssetExecutionContext, config: CkanCsvConfig) -> Path:
+class RawCsv(BaseModel):
+    """A reference to a CSV in the raw content-addressed store."""
+
+    resource_id: str
+    csv_filename: str
+    sha256: str
+
+
+@asset(partitions_def=composite_def, output_required=False)
+def live_primary_csv(
+    context: AssetExecutionContext, config: CkanCsvConfig
+) -> Iterator[Output[RawCsv]]:
     # Retrieve the keys
     partition = composite_def.get_partition_key_from_str(context.partition_key).keys_by_dimension
     last_modified_date_str = partition["last_modified_date"]
@@ -46,40 +117,80 @@ def live_primary_csv(context: AssetExecutionContext, config: CkanCsvConfig) -> P
 
     context.log.info(f"Downloading {substation_name} from {config.url}")
 
-    # Get CSV from CKAN
-    response = ckan.httpx_get_with_auth(config.url)
-    response.raise_for_status()
-
-    # Save CSV file to disk
+    # Get CSV from CKAN and save it to the content-addressed store, unless its latest content has
+    # already been processed. If so, we don't yield an Output, so Dagster won't run
+    # `live_primary_parquet` for this partition. Content whose processing failed last time is
+    # yielded again, even if it hasn't changed on CKAN since.
     # TODO(Jack): Don't save here? Instead, return the CSV file and let an IO manager save it??
-    dst_full_path = Path(
-        Path("data") / "NGED" / "raw" / "live_primary_flows" / last_modified_date_str / csv_filename
+    manifest = get_download_manifest()
+    sha256 = ckan.download_unprocessed_resource(
+        config.resource_id, config.url, manifest, get_raw_csv_store()
     )
-    dst_full_path.parent.mkdir(exist_ok=True, parents=True)
-    dst_full_path.write_bytes(response.content)
+    if sha256 is None:
+        context.log.info(f"{substation_name} has already been downloaded and processed.")
+        return
+    manifest.put_content_hash(config.resource_id, last_modified_date_str, sha256)
 
-    return dst_full_path
+    yield Output(RawCsv(resource_id=config.resource_id, csv_filename=csv_filename, sha256=sha256))
 
 
 @asset(partitions_def=composite_def)
-def live_primary_parquet(context: AssetExecutionContext, live_primary_csv: Path) -> None:
-    df_of_new_data = process_live_primary_substation_flows(live_primary_csv)
+def live_primary_parquet(context: AssetExecutionContext, live_primary_csv: RawCsv) -> None:
+    csv_content = get_raw_csv_store().get(live_primary_csv.sha256)
     parquet_path = (
-        Path("data")
-        / "NGED"
-        / "parquet"
-        / "live_primary_flows"
-        / live_primary_csv.with_suffix(".parquet").name
+        LIVE_PRIMARY_PARQUET_PATH
+        / PurePosixPath(live_primary_csv.csv_filename).with_suffix(".parquet").name
     )
-    if parquet_path.exists():
-        df_of_old_data = pl.read_parquet(parquet_path)
-        merged_df = pl.concat((df_of_old_data, df_of_new_data), how="vertical")
-    else:
-        parquet_path.parent.mkdir(exist_ok=True, parents=True)
-        merged_df = df_of_new_data
-    merged_df = merged_df.unique(subset="timestamp")
-    merged_df = merged_df.sort(by="timestamp")
-    merged_df.write_parquet(parquet_path, compression="zstd")
+    # Hold the lock from reading the old data to writing the merged data, so that a concurrent
+    # backfill (`historical_primary_parquet`) can't update the file in between.
+    with file_lock(parquet_path):
+        # Only parse the rows that are newer than the data we already have. (The validation
+        # watermark in the parquet metadata, or else the parquet statistics, give us the latest
+        # timestamp without reading the data.)
+        watermark = read_watermark(parquet_path) if parquet_path.exists() else None
+        if watermark is not None:
+            since = watermark.validated_up_to
+        elif parquet_path.exists():
+            since = (
+                scan_substation_flows(parquet_path)
+                .select(pl.col("timestamp").max())
+                .collect()
+                .item()
+            )
+        else:
+            since = None
+        df_of_new_data = process_live_primary_substation_flows(csv_content, since=since)
+        if since is not None and df_of_new_data.is_empty():
+            context.log.info(f"No rows after {since} in {live_primary_csv.csv_filename}.")
+            get_download_manifest().mark_processed(
+                live_primary_csv.resource_id, live_primary_csv.sha256
+            )
+            return
+        if parquet_path.exists():
+            df_of_old_data = scan_substation_flows(parquet_path).collect()
+            merged_df = merge_sorted_flows(df_of_old_data, df_of_new_data)
+        else:
+            parquet_path.parent.mkdir(exist_ok=True, parents=True)
+            merged_df = merge_sorted_flows(df_of_new_data.clear(), df_of_new_data)
+        # The parser has already validated the new rows, so (as long as the watermark is still
+        # valid) only their order across the boundary with the old rows needs checking.
+        watermark = validate_appended(
+            SubstationFlows,
+            merged_df,
+            watermark,
+            sort_column="timestamp",
+            rows_already_validated=True,
+            allow_missing_columns=True,
+        )
+        write_substation_flows(
+            merged_df,
+            parquet_path,
+            compact=COMPACT_LIVE_PRIMARY_PARQUET,
+            metadata=watermark.to_parquet_metadata() if watermark else None,
+        )
+        get_download_manifest().mark_processed(
+            live_primary_csv.resource_id, live_primary_csv.sha256
+        )
 
 
 update_live_primary_flows = define_asset_job(
@@ -87,6 +198,118 @@ update_live_primary_flows = define_asset_job(
 )
 
 
+@asset(deps=[live_primary_parquet])
+def live_primary_rollups(context: AssetExecutionContext) -> None:
+    """Half-hourly rollups and daily peaks of all the live primary flows, updated incrementally."""
+    flows = {
+        path.stem: scan_substation_flows(path)
+        for path in sorted(LIVE_PRIMARY_PARQUET_PATH.glob("*.parquet"))
+    }
+    context.log.info(f"Updating the rollups of {len(flows)} substations.")
+    update_rollups(flows, LIVE_PRIMARY_HALF_HOURLY_PATH, LIVE_PRIMARY_DAILY_PEAKS_PATH)
+
+
+@asset(deps=[live_primary_parquet])
+def live_primary_quality_report(context: AssetExecutionContext) -> None:
+    """Daily data-quality indicators (gaps, duplicates, stuck values, sign flips) per substation."""
+    flows = {
+        path.stem: scan_substation_flows(path)
+        for path in sorted(LIVE_PRIMARY_PARQUET_PATH.glob("*.parquet"))
+    }
+    report = SubstationDailyQuality.validate(
+        quality_report(concat_substation_flows(flows)).collect()
+    )
+    context.log.info(f"Data-quality report of {len(flows)} substations: {report.height} rows.")
+    LIVE_PRIMARY_QUALITY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_parquet(SubstationDailyQuality, report, LIVE_PRIMARY_QUALITY_PATH)
+
+
+@asset_check(asset=live_primary_quality_report)
+def latest_day_has_no_data_quality_issues() -> AssetCheckResult:
+    """Warn about the substations with data-quality issues on the latest day of the report."""
+    if not LIVE_PRIMARY_QUALITY_PATH.exists():
+        return AssetCheckResult(
+            passed=False,
+            severity=AssetCheckSeverity.WARN,
+            description=f"The report hasn't been materialized yet: {LIVE_PRIMARY_QUALITY_PATH}",
+        )
+    report = pl.read_parquet(LIVE_PRIMARY_QUALITY_PATH)
+    latest_day = report.filter(pl.col("date") == pl.col("date").max())
+    n_substations_with = {
+        "duplicate timestamps": (latest_day["n_duplicate_timestamps"] > 0).sum(),
+        "missing intervals": (latest_day["n_missing_intervals"] > 0).sum(),
+        "stuck values": latest_day.select(
+            pl.any_horizontal(pl.col(f"{c}_n_stuck") > 0 for c in FLOW_COLUMNS).sum()
+        ).item(),
+        "sign flips": latest_day.select(
+            pl.any_horizontal(pl.col(f"{c}_n_sign_flips") > 0 for c in FLOW_COLUMNS).sum()
+        ).item(),
+    }
+    return AssetCheckResult(
+        passed=not any(n_substations_with.values()),
+        severity=AssetCheckSeverity.WARN,
+        metadata={
+            "date": str(latest_day["date"].max()),
+            "n_substations": latest_day.height,
+            **{f"n_substations_with_{issue}": n for issue, n in n_substations_with.items()},
+        },
+    )
+
+
+update_live_primary_rollups = define_asset_job(
+    name="update_live_primary_rollups",
+    selection=[live_primary_rollups, live_primary_quality_report],
+)
+
+# Every 6 hours, like `live_primaries_sensor`.
+live_primary_rollups_schedule = ScheduleDefinition(
+    job=update_live_primary_rollups,
+    cron_schedule="0 1-23/6 * * *",
+    default_status=DefaultScheduleStatus.RUNNING,
+)
+
+
+class HistoricalBackfillConfig(Config):
+    max_workers: int | None = None  # Defaults to the number of CPUs.
+
+
+@asset
+def historical_primary_parquet(
+    context: AssetExecutionContext, config: HistoricalBackfillConfig
+) -> MaterializeResult:
+    """Backfill the historical primary flows into the same parquet files as the live primary flows.
+
+    Checkpointed per CSV, so re-materializing resumes an interrupted backfill. Can run alongside
+    `live_primary_parquet`, because both hold each parquet file's `file_lock` while updating it.
+    """
+    catalogue = get_resource_catalogue()
+    historical = ckan.get_csv_resources_for_historical_primary_substation_flows(catalogue=catalogue)
+    live = ckan.get_csv_resources_for_live_primary_substation_flows(catalogue=catalogue)
+
+    def log_progress(progress: BackfillProgress) -> None:
+        context.log.info(str(progress))
+
+    progress = backfill(
+        historical,
+        dataset_keys_for_historical_resources(historical, live),
+        LIVE_PRIMARY_PARQUET_PATH,
+        RAW_HISTORICAL_PRIMARY_FLOWS_PATH / "sha256",
+        get_historical_download_manifest(),
+        max_workers=config.max_workers,
+        compact=COMPACT_LIVE_PRIMARY_PARQUET,
+        on_progress=log_progress,
+    )
+    return MaterializeResult(
+        metadata={
+            "n_resources": progress.n_resources,
+            "n_skipped": progress.n_skipped,
+            "n_rows": progress.n_rows,
+            "rows_per_second": progress.rows_per_second,
+            "megabytes_per_second": progress.megabytes_per_second,
+        }
+    )
+
+
 _SECONDS_IN_AN_HOUR: Final[int] = 60 * 60
 
 
@@ -97,7 +320,9 @@ _SECONDS_IN_AN_HOUR: Final[int] = 60 * 60
 )
 def live_primaries_sensor(context: SensorEvaluationContext) -> SensorResult:
     # Retrieve the full list of primary substation_names and URLs of CSVs
-    ckan_resources = ckan.get_csv_resources_for_live_primary_substation_flows()
+    ckan_resources = ckan.get_csv_resources_for_live_primary_substation_flows(
+        catalogue=get_resource_catalogue()
+    )
 
     # selected_for_testing = [  # TODO(Jack): Remove these after testing!
     #     "Albrighton 11Kv Primary Transformer Flows",
@@ -126,7 +351,9 @@ def live_primaries_sensor(context: SensorEvaluationContext) -> SensorResult:
                 # runs for the same data on every tick.
                 run_key=f"{last_modified_date_str}|{substation_name}",
                 partition_key=partition_key,
-                run_config=RunConfig(ops={"live_primary_csv": CkanCsvConfig(url=csv_url)}),
+                run_config=RunConfig(
+                    ops={"live_primary_csv": CkanCsvConfig(url=csv_url, resource_id=resource.id)}
+                ),
                 tags={
                     "nged/substation_name": substation_name,
                     "nged/substation_type": "primary",